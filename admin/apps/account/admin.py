@@ -1,8 +1,124 @@
-from django.contrib import admin
-from apps.account.models import UserStatus, UserDepartment, UserProfile
+import json
+
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.options import get_content_type_for_model
+from django.contrib.admin.widgets import RelatedFieldWidgetWrapper
+from django.forms import CharField, ModelChoiceField
+from apps.account.bulk import update_profiles
+from apps.account.cache import lookup_for_model
+from apps.account.export import export_response
+from apps.account.models import (
+    DirectoryEntry,
+    OrgUnit,
+    UserDepartment,
+    UserProfile,
+    UserStatus,
+)
+from apps.account.pagination import KeysetChangeList
+from apps.account.search import find_profiles
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.urls import reverse
-from django.utils.translation import gettext_lazy as _
+from django.utils.translation import gettext_lazy as _, ngettext
+
+
+class LookupListFilter(admin.RelatedFieldListFilter):
+    """
+        Related filter that takes its choices from the lookup cache instead
+        of querying the related table on every changelist render.
+    """
+    def field_choices(self, field, request, model_admin):
+        return lookup_for_model(field.related_model).choices()
+
+
+class OrgUnitListFilter(admin.SimpleListFilter):
+    """
+        Profiles of a structure unit and of all units below it, a prefix
+        match on the materialized path.
+    """
+    title = _("Company structure")
+    parameter_name = "org_unit"
+    path_lookup = "department__org_unit__path__startswith"
+
+    def lookups(self, request, model_admin):
+        return [
+            (
+                unit.path,
+                f"{'— ' * (unit.path.count('/') - 2)}{unit.name} "
+                f"({unit.headcount})",
+            )
+            for unit in OrgUnit.objects.only("path", "name", "headcount")
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.path_lookup: self.value()})
+        return queryset
+
+
+class EntryOrgUnitListFilter(OrgUnitListFilter):
+    path_lookup = "org_unit_path__startswith"
+
+
+class EntryLookupListFilter(admin.SimpleListFilter):
+    """
+        Filter on a copied foreign key id, with choices from the lookup
+        cache of the related model.
+    """
+    model = None
+
+    def lookups(self, request, model_admin):
+        return lookup_for_model(self.model).choices()
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class EntryStatusListFilter(EntryLookupListFilter):
+    title = _("The user's status in the system")
+    parameter_name = "status_id"
+    model = UserStatus
+
+
+class EntryDepartmentListFilter(EntryLookupListFilter):
+    title = _("User department in the company")
+    parameter_name = "department_id"
+    model = UserDepartment
+
+
+class OrgUnitAdmin(admin.ModelAdmin):
+    """
+        The structure is derived from the departments, it is only shown.
+    """
+    list_display = (
+        "indented_name",
+        "level",
+        "headcount",
+    )
+    list_filter = (
+        "level",
+    )
+    search_fields = (
+        "name",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description=_("Name"), ordering="path")
+    def indented_name(self, obj):
+        return f"{'— ' * (obj.path.count('/') - 2)}{obj.name}"
 
 
 class UserStatusAdmin(admin.ModelAdmin):
@@ -47,6 +163,44 @@ class UserDepartmentAdmin(admin.ModelAdmin):
     empty_value_display = _("-not filled-")
 
 
+def warn_search_limit(model_admin: admin.ModelAdmin, request) -> None:
+    model_admin.message_user(
+        request,
+        _(
+            "Only the best %(limit)d matches are shown, refine the search "
+            "to see the others.",
+        ) % {"limit": settings.PROFILE_SEARCH_LIMIT},
+        messages.WARNING,
+    )
+
+
+class ProfileActionForm(ActionForm):
+    """
+        Values for the bulk actions, shown next to the action select. The
+        choices come from the lookup cache.
+    """
+    department = ModelChoiceField(
+        UserDepartment.objects.all(),
+        required=False,
+        label=_("Department"),
+    )
+    status = ModelChoiceField(
+        UserStatus.objects.all(),
+        required=False,
+        label=_("Status"),
+    )
+    post = CharField(max_length=150, required=False, label=_("Post"))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in ("department", "status"):
+            field = self.fields[name]
+            field.choices = [
+                ("", field.empty_label),
+                *lookup_for_model(field.queryset.model).choices(),
+            ]
+
+
 class UserAdmin(admin.ModelAdmin):
     list_display = (
         "user",
@@ -66,28 +220,146 @@ class UserAdmin(admin.ModelAdmin):
         "status",
         "department",
     )
+    list_select_related = (
+        "user",
+        "status",
+        "department",
+    )
     ordering = (
         "last_name",
         "first_name",
     )
     search_fields = (
-        "user",
         "last_name",
         "first_name",
         "middle_name",
-        "status",
-        "department",
+        "post",
+        "status__title",
+        "department__title",
     )
     readonly_fields = (
         "user_link",
     )
     list_filter = (
-        "status",
+        ("status", LookupListFilter),
         "post",
-        "department",
+        ("department", LookupListFilter),
+        OrgUnitListFilter,
+    )
+    actions = (
+        "export_csv",
+        "export_xlsx",
+        "change_department",
+        "change_status",
+        "set_post",
     )
+    action_form = ProfileActionForm
     empty_value_display = _("-not filled-")
 
+    @admin.action(description=_("Export selected profiles to CSV"))
+    def export_csv(self, request, queryset):
+        return export_response(queryset, "csv")
+
+    @admin.action(description=_("Export selected profiles to XLSX"))
+    def export_xlsx(self, request, queryset):
+        return export_response(queryset, "xlsx")
+
+    @admin.action(
+        description=_("Move selected profiles to the department"),
+        permissions=["change"],
+    )
+    def change_department(self, request, queryset):
+        self.bulk_update(request, queryset, "department")
+
+    @admin.action(
+        description=_("Set the status of selected profiles"),
+        permissions=["change"],
+    )
+    def change_status(self, request, queryset):
+        self.bulk_update(request, queryset, "status")
+
+    @admin.action(
+        description=_("Set the post of selected profiles"),
+        permissions=["change"],
+    )
+    def set_post(self, request, queryset):
+        self.bulk_update(request, queryset, "post")
+
+    def bulk_update(self, request, queryset, field: str) -> None:
+        """
+            Set the value chosen in the action form on all selected
+            profiles with `update_profiles`, and log the change of every
+            profile with one `INSERT`.
+        """
+        form = self.action_form(request.POST)
+        form.fields["action"].choices = self.get_action_choices(request)
+        value = form.cleaned_data.get(field) if form.is_valid() else None
+        if not value:
+            self.message_user(
+                request,
+                _("Choose the value to set first."),
+                messages.WARNING,
+            )
+            return
+        profiles = update_profiles(queryset, **{field: value})
+        label = str(form.fields[field].label)
+        content_type = get_content_type_for_model(self.model)
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                user_id=request.user.pk,
+                content_type=content_type,
+                object_id=str(pk),
+                object_repr=name[:200],
+                action_flag=CHANGE,
+                change_message=json.dumps(
+                    [{"changed": {"fields": [label]}}],
+                ),
+            )
+            for pk, name in profiles
+        ])
+        self.message_user(
+            request,
+            ngettext(
+                "%(count)d profile updated.",
+                "%(count)d profiles updated.",
+                len(profiles),
+            ) % {"count": len(profiles)},
+            messages.SUCCESS,
+        )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+            Search with `find_profiles` instead of the `ILIKE` scans
+            `search_fields` would produce.
+        """
+        if not search_term:
+            return queryset, False
+        queryset, limited = find_profiles(queryset, search_term)
+        if limited:
+            warn_search_limit(self, request)
+        return queryset, False
+
+    def get_changelist_formset(self, request, **kwargs):
+        """
+            Take the choices of editable foreign keys from the lookup cache
+            once per request. Every row form copies the field, so without
+            this each `<select>` runs its own query.
+        """
+        formset = super().get_changelist_formset(request, **kwargs)
+        for field in formset.form.base_fields.values():
+            if isinstance(field, ModelChoiceField):
+                lookup = lookup_for_model(field.queryset.model)
+                field.choices = [
+                    ("", field.empty_label),
+                    *lookup.choices(),
+                ]
+                if isinstance(field.widget, RelatedFieldWidgetWrapper):
+                    field.widget.widget.choices = field.choices
+        return formset
+
     def user_link(self, obj):
         return mark_safe("<a href='{}'>{}</a>".format(
             reverse("admin:auth_user_change", args=(obj.user.pk,)),
@@ -97,6 +369,80 @@ class UserAdmin(admin.ModelAdmin):
     user_link.short_description = "user"
 
 
+class DirectoryEntryAdmin(admin.ModelAdmin):
+    """
+        Read-only directory over the `directory_entry` read model. Every
+        page is one query on a single table, names link to the profile
+        form.
+    """
+    list_display = (
+        "profile_link",
+        "post",
+        "status_title",
+        "department_title",
+        "mobile_phone_national",
+        "phone_national",
+    )
+    list_filter = (
+        EntryStatusListFilter,
+        EntryDepartmentListFilter,
+        EntryOrgUnitListFilter,
+    )
+    search_fields = (
+        "last_name",
+    )
+    ordering = (
+        "last_name",
+        "first_name",
+    )
+    show_full_result_count = False
+    empty_value_display = _("-not filled-")
+    # Keyset pages have no page numbers to render.
+    change_list_template = "admin/account/userprofile/change_list.html"
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+            Same search as the profiles, matched by UUID. The matching UUIDs
+            are fetched first, at most `PROFILE_SEARCH_LIMIT` of them as for
+            the profiles index, because the raw search conditions name the
+            profile table and can not be nested in another query.
+        """
+        if not search_term:
+            return queryset, False
+        profiles, limited = find_profiles(
+            UserProfile.objects.all(), search_term,
+        )
+        profile_ids = list(
+            profiles.values_list("uuid", flat=True)
+            [:settings.PROFILE_SEARCH_LIMIT],
+        )
+        if limited or len(profile_ids) == settings.PROFILE_SEARCH_LIMIT:
+            warn_search_limit(self, request)
+        return queryset.filter(uuid__in=profile_ids), False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description=_("Full name"), ordering="last_name")
+    def profile_link(self, obj):
+        return format_html(
+            "<a href='{}'>{}</a>",
+            reverse("admin:account_userprofile_change", args=(obj.uuid,)),
+            obj.full_name,
+        )
+
+
 admin.site.register(UserStatus, UserStatusAdmin)
 admin.site.register(UserDepartment, UserDepartmentAdmin)
+admin.site.register(OrgUnit, OrgUnitAdmin)
+admin.site.register(DirectoryEntry, DirectoryEntryAdmin)
 admin.site.register(UserProfile, UserAdmin)
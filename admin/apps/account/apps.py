@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished, request_started
 from django.utils.translation import gettext_lazy as _
 
 
@@ -6,3 +7,12 @@ class AccountConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.account"
     verbose_name = _("User Account Management")
+
+    def ready(self):
+        from apps.account.database import (
+            check_connections,
+            release_connections,
+        )
+
+        request_started.connect(check_connections)
+        request_finished.connect(release_connections)
@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+AVATAR_DIR = "avatars"
+HASH_CHUNK_SIZE = 64 * 1024
+THUMBNAIL_FORMATS = {
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+}
+
+
+def content_hash(content) -> str:
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+        Media storage that names files by the SHA-256 of their content,
+        `avatars/<2 hex digits>/<digest>.<ext>`. A file is written once, so
+        the same image uploaded again is not stored twice and a name never
+        changes its content, which lets nginx cache it forever.
+    """
+    def save(self, name, content, max_length=None) -> str:
+        if not hasattr(content, "chunks"):
+            content = ContentFile(content.read())
+        digest = content_hash(content)
+        ext = os.path.splitext(name)[1].lower()
+        name = os.path.join(AVATAR_DIR, digest[:2], f"{digest}{ext}")
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+
+avatar_storage = ContentAddressedStorage()
+thumbnail_storage = FileSystemStorage()
+
+
+def thumbnail_name(name: str, size: int, ext: str) -> str:
+    return f"{os.path.splitext(name)[0]}/{size}.{ext}"
+
+
+def render_thumbnail(image: Image.Image, size: int, image_format: str,
+                     quality: int) -> bytes:
+    thumbnail = ImageOps.fit(
+        image, (size, size), method=Image.Resampling.LANCZOS,
+    )
+    if image_format == "JPEG" and thumbnail.mode != "RGB":
+        background = Image.new("RGB", thumbnail.size, "white")
+        background.paste(thumbnail, mask=thumbnail.getchannel("A"))
+        thumbnail = background
+    output = BytesIO()
+    thumbnail.save(output, image_format, quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def make_thumbnails(name: str) -> dict:
+    """
+        Square WebP and JPEG thumbnails of `AVATAR_SIZES` next to the
+        original, `<original without ext>/<size>.<ext>`. Thumbnails that
+        already exist are not rendered again. JPEG originals are decoded at
+        a reduced scale with `draft`, the full size image is never built.
+    """
+    sizes = settings.AVATAR_SIZES
+    thumbnails = {}
+    with avatar_storage.open(name) as file:
+        image = Image.open(file)
+        image.draft("RGB", (max(sizes) * 2, max(sizes) * 2))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for size in sizes:
+            thumbnails[str(size)] = {}
+            for ext, image_format in THUMBNAIL_FORMATS.items():
+                thumbnail = thumbnail_name(name, size, ext)
+                if not thumbnail_storage.exists(thumbnail):
+                    thumbnail_storage.save(
+                        thumbnail,
+                        ContentFile(render_thumbnail(
+                            image, size, image_format,
+                            settings.AVATAR_QUALITY,
+                        )),
+                    )
+                thumbnails[str(size)][ext] = thumbnail
+    return thumbnails
+
+
+def process_avatar(model, pk, name: str) -> None:
+    """
+        Render the thumbnails and store them on the profile unless the
+        avatar has been replaced in the meantime.
+    """
+    try:
+        thumbnails = make_thumbnails(name)
+        model.objects.filter(pk=pk, avatar=name).update(
+            avatar_thumbnails=thumbnails,
+            updated_time=timezone.now(),
+        )
+    except (OSError, ValueError, Image.DecompressionBombError,
+            DatabaseError):
+        logger.exception("Avatar %s of profile %s failed", name, pk)
+
+
+def avatar_job(model, pk, name: str) -> None:
+    try:
+        process_avatar(model, pk, name)
+    finally:
+        close_old_connections()
+
+
+@lru_cache()
+def get_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=settings.AVATAR_WORKERS,
+        thread_name_prefix="avatar",
+    )
+
+
+def schedule_thumbnails(profile) -> None:
+    """
+        Hand the avatar to the worker pool once the transaction is
+        committed, the request does not wait for resizing.
+    """
+    transaction.on_commit(
+        lambda: get_executor().submit(
+            avatar_job, type(profile), profile.pk, profile.avatar.name,
+        ),
+    )
@@ -0,0 +1,283 @@
+import asyncio
+import importlib
+import json
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.account import factories
+from apps.account.models import OrgUnit, UserDepartment, UserStatus
+from apps.account.seeding import clear
+
+SEARCH_TERM = "kar"
+ADMIN_USERNAME = "benchmark-admin"
+# A case regresses when its median grows by more than the tolerance and by
+# at least this many milliseconds, or when it runs more queries.
+MIN_REGRESSION_MS = 1.0
+# Nothing listens there, the API search falls back to Postgres at once.
+UNREACHABLE_ELASTIC = "http://127.0.0.1:1"
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def measure(func: Callable, rounds: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+        "min_ms": round(timings[0], 3),
+        "rounds": rounds,
+    }
+
+
+def count_queries(func: Callable) -> int:
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context.captured_queries)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+        Cases of `results` that got slower or run more queries than in
+        `baseline`. Cases missing from either side are not compared.
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        before, after = previous["median_ms"], result["median_ms"]
+        if (
+            after - before >= MIN_REGRESSION_MS
+            and after > before * (1 + tolerance)
+        ):
+            regressions.append(
+                f"{key}: median {before:.2f} ms -> {after:.2f} ms",
+            )
+        if result.get("queries", 0) > previous.get("queries", float("inf")):
+            regressions.append(
+                f"{key}: {previous['queries']} -> {result['queries']} "
+                f"queries",
+            )
+    return regressions
+
+
+def load_results(path: Path) -> dict:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def save_results(path: Path, results: dict, **details) -> None:
+    with open(path, "w") as file:
+        json.dump(
+            {**details, "results": results}, file, indent=2, sort_keys=True,
+        )
+        file.write("\n")
+
+
+def cleanup() -> None:
+    clear()
+    User.objects.filter(username=ADMIN_USERNAME).delete()
+
+
+def admin_client() -> Client:
+    user, _ = User.objects.get_or_create(
+        username=ADMIN_USERNAME,
+        defaults={"is_staff": True, "is_superuser": True},
+    )
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def admin_get(client: Client, url: str, params: dict) -> None:
+    response = client.get(url, params)
+    if response.status_code != 200:
+        raise BenchmarkError(f"{url} answered {response.status_code}")
+
+
+def create_profile() -> None:
+    """
+        A user with the profile made by the signal, rolled back so that
+        the number of profiles stays the same.
+    """
+    with transaction.atomic():
+        User.objects.create(username=f"{factories.USERNAME_PREFIX}create")
+        transaction.set_rollback(True)
+
+
+def admin_cases(client: Client) -> dict[str, Callable]:
+    changelist = reverse("admin:account_userprofile_changelist")
+    status_id = UserStatus.objects.values_list("pk", flat=True).first()
+    department_id = UserDepartment.objects.filter(
+        title__startswith=factories.DEPARTMENT_PREFIX,
+    ).values_list("pk", flat=True).first()
+    pages = {
+        "admin changelist": (changelist, {}),
+        "admin search": (changelist, {"q": SEARCH_TERM}),
+        "admin filter status": (changelist, {"status__id__exact": status_id}),
+        "admin filter post": (changelist, {"post": factories.POSTS[0]}),
+        "admin filter department": (
+            changelist, {"department__id__exact": department_id},
+        ),
+        "admin directory": (
+            reverse("admin:account_directoryentry_changelist"), {},
+        ),
+    }
+    cases = {
+        name: partial(admin_get, client, url, params)
+        for name, (url, params) in pages.items()
+    }
+    cases["profile create"] = create_profile
+    return cases
+
+
+async def asgi_get(app, path: str, query: str = "") -> tuple[int, bytes]:
+    """
+        One GET request sent straight to an ASGI application.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query.encode(),
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    status = None
+    body = bytearray()
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, bytes(body)
+
+
+class NullRedis:
+    """
+        Stands in for Redis, so that the API runs without it. Nothing is
+        stored, every request takes the uncached path.
+    """
+    async def get(self, key: str) -> None:
+        return None
+
+    async def set(self, key: str, value, expire: Optional[int] = None):
+        return None
+
+    async def incr(self, key: str) -> int:
+        return 1
+
+
+class ApiBenchmark:
+    """
+        The FastAPI application of `backend/`, called in this process over
+        ASGI with its own event loop and a pool on the admin database. It
+        needs the backend requirements, `ImportError` tells they are
+        missing.
+    """
+    def __init__(self, path: Path):
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+        self.app = importlib.import_module("main").app
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def start(self) -> None:
+        import asyncpg
+        from db import elastic, postgres, redis
+        from elasticsearch import AsyncElasticsearch
+
+        database = connections["default"].settings_dict
+        postgres.pool = self.loop.run_until_complete(asyncpg.create_pool(
+            database=database["NAME"],
+            user=database["USER"],
+            password=database["PASSWORD"],
+            host=database["HOST"] or None,
+            port=database["PORT"] or None,
+            min_size=1,
+            max_size=4,
+            init=postgres.init_connection,
+            connection_class=postgres.InstrumentedConnection,
+        ))
+        redis.redis = NullRedis()
+        elastic.es = AsyncElasticsearch(
+            hosts=[UNREACHABLE_ELASTIC], max_retries=0,
+        )
+
+    def stop(self) -> None:
+        from db import elastic, postgres
+
+        self.loop.run_until_complete(postgres.pool.close())
+        self.loop.run_until_complete(elastic.es.close())
+        self.loop.close()
+
+    def get(self, path: str, query: str = "") -> bytes:
+        status, body = self.loop.run_until_complete(
+            asgi_get(self.app, path, query),
+        )
+        if status != 200:
+            raise BenchmarkError(f"{path} answered {status}")
+        return body
+
+    def cases(self) -> dict[str, Callable]:
+        first_page = json.loads(self.get("/api/v1/profiles/", "page_size=50"))
+        profile = next(
+            item for item in first_page["items"] if item["mobile_phone"]
+        )
+        unit_id = OrgUnit.objects.filter(
+            parent=None, name__startswith=factories.DEPARTMENT_PREFIX,
+        ).values_list("pk", flat=True).first()
+        requests = {
+            "api profile list": ("/api/v1/profiles/", {"page_size": 50}),
+            "api profile next page": (
+                "/api/v1/profiles/",
+                {"page_size": 50, "cursor": first_page["next_cursor"]},
+            ),
+            "api profile detail": (
+                f"/api/v1/profiles/{profile['uuid']}", {},
+            ),
+            "api profile by phone": (
+                f"/api/v1/profiles/phone/{profile['mobile_phone']}", {},
+            ),
+            "api search": ("/api/v1/profiles/search", {"query": SEARCH_TERM}),
+            "api org units": ("/api/v1/org-units/", {}),
+            "api org unit profiles": (
+                f"/api/v1/org-units/{unit_id}/profiles", {"page_size": 50},
+            ),
+        }
+        return {
+            name: partial(self.get, path, urlencode(params))
+            for name, (path, params) in requests.items()
+        }
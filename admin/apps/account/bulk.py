@@ -0,0 +1,48 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from apps.account.models import OrgUnit, UserProfile
+
+# Fields the bulk actions of `UserAdmin` may set.
+BULK_FIELDS = ("department", "status", "post")
+
+
+def update_profiles(queryset: QuerySet, **values) -> list:
+    """
+        Set `values` on the profiles of `queryset` with one `UPDATE ...
+        WHERE uuid IN (...)` in one transaction, instead of a `save` per
+        profile. The rows are locked first, so the headcounts of the
+        departments the profiles leave are known exactly and moved in one
+        more `UPDATE`. The statement triggers refresh the directory, bump
+        the table version and publish the change feed once for the whole
+        statement. Returns the `(uuid, full name)` of the updated profiles.
+    """
+    unknown = set(values) - set(BULK_FIELDS)
+    if unknown:
+        raise ValueError(f"Fields {sorted(unknown)} can not be bulk updated.")
+    with transaction.atomic():
+        rows = list(
+            UserProfile.objects.filter(
+                pk__in=queryset.order_by().values("pk"),
+            ).select_for_update().values_list(
+                "uuid", "department_id", "last_name", "first_name",
+                "middle_name",
+            ),
+        )
+        if not rows:
+            return []
+        UserProfile.objects.filter(
+            pk__in=[row[0] for row in rows],
+        ).update(**values, updated_time=timezone.now())
+        if "department" in values:
+            department = values["department"]
+            OrgUnit.move_departments(
+                Counter(row[1] for row in rows),
+                getattr(department, "pk", department),
+            )
+    return [
+        (row[0], " ".join(name for name in row[2:] if name))
+        for row in rows
+    ]
@@ -0,0 +1,180 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, transaction
+from apps.account.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "lookup"
+
+
+class LRUCache:
+    """
+        Small thread-safe LRU mapping used as the process-local layer in
+        front of Redis.
+    """
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LRUCache(settings.LOOKUP_CACHE_LOCAL_SIZE)
+lookups = {}
+# Lookups whose version bump failed in this process, bumped again by their
+# next read that reaches Redis.
+pending_bumps = set()
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    return redis.Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+
+
+class LookupCache:
+    """
+        Read-through cache of a small reference table shared with the API
+        service. Rows are stored in Redis under `lookup:<name>:<version>`,
+        the current version lives in `lookup:<name>:version` and is bumped
+        on every change. Each process keeps the rows in `local_cache` and
+        only checks the version again after `LOOKUP_CACHE_LOCAL_TTL`. A bump
+        that fails while Redis is down is made by the next read, otherwise
+        the other processes would keep the old rows under the old version.
+    """
+    def __init__(self, name: str, model, fields: tuple, label: str):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.label = label
+        self.version_key = f"{KEY_PREFIX}:{name}:version"
+        lookups[model] = self
+
+    def data_key(self, version: int) -> str:
+        return f"{KEY_PREFIX}:{self.name}:{version}"
+
+    def load(self) -> list:
+        """
+            Read from the primary, a lagging replica would store old rows
+            under the new version.
+        """
+        return list(
+            self.model.objects.using(DEFAULT_DB_ALIAS)
+            .order_by("pk").values(*self.fields),
+        )
+
+    def rows(self) -> dict:
+        entry = local_cache.get(self.name)
+        now = time.monotonic()
+        if entry and now - entry[2] < settings.LOOKUP_CACHE_LOCAL_TTL:
+            record_cache(KEY_PREFIX, True)
+            return entry[1]
+        try:
+            version, rows = self._fetch(entry)
+        except redis.RedisError as error:
+            logger.warning("Lookup cache %s unavailable: %s", self.name, error)
+            record_cache(KEY_PREFIX, False)
+            version, rows = None, self.load()
+        rows = {row["id"]: row for row in rows}
+        local_cache.set(self.name, (version, rows, now))
+        return rows
+
+    def _fetch(self, entry: Optional[tuple]) -> tuple:
+        client = get_redis()
+        if self.name in pending_bumps:
+            client.incr(self.version_key)
+            pending_bumps.discard(self.name)
+        version = int(client.get(self.version_key) or 0)
+        if entry and entry[0] == version:
+            record_cache(KEY_PREFIX, True)
+            return version, entry[1].values()
+        payload = client.get(self.data_key(version))
+        record_cache(KEY_PREFIX, payload is not None)
+        if payload is not None:
+            return version, json.loads(payload)
+        rows = self.load()
+        client.set(
+            self.data_key(version),
+            json.dumps(rows, cls=DjangoJSONEncoder),
+            ex=settings.LOOKUP_CACHE_TIMEOUT,
+        )
+        return version, rows
+
+    def all(self) -> list:
+        return list(self.rows().values())
+
+    def get(self, pk) -> Optional[dict]:
+        return self.rows().get(pk)
+
+    def choices(self) -> list:
+        return [(row["id"], row[self.label]) for row in self.all()]
+
+    def invalidate(self) -> None:
+        """
+            Drop the local copy right away and bump the shared version once
+            the transaction is committed, so other processes never cache
+            uncommitted rows under the new version.
+        """
+        local_cache.pop(self.name)
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self) -> None:
+        local_cache.pop(self.name)
+        try:
+            get_redis().incr(self.version_key)
+        except redis.RedisError as error:
+            logger.warning(
+                "Lookup cache %s version not bumped, retried on the next "
+                "read: %s", self.name, error,
+            )
+            pending_bumps.add(self.name)
+        else:
+            pending_bumps.discard(self.name)
+
+
+def lookup_for_model(model) -> Optional[LookupCache]:
+    return lookups.get(model)
+
+
+def reset_lookups() -> None:
+    """
+        Invalidate every lookup immediately, outside of any transaction.
+    """
+    local_cache.clear()
+    for lookup in lookups.values():
+        lookup._bump_version()
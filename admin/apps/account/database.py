@@ -0,0 +1,89 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Models read from the replicas, every other model stays on the primary.
+REPLICA_MODELS = {
+    "account.userprofile",
+    "account.userdepartment",
+    "account.userstatus",
+}
+
+state = threading.local()
+
+
+def pin_primary() -> None:
+    state.pinned = True
+    state.written = True
+
+
+def reset_pinning(pinned: bool = False) -> None:
+    state.pinned = pinned
+    state.written = False
+
+
+def is_pinned() -> bool:
+    return getattr(state, "pinned", False)
+
+
+def has_written() -> bool:
+    return getattr(state, "written", False)
+
+
+class ReplicaRouter:
+    """
+        Sends reads of the directory models to a random replica from
+        `DATABASE_REPLICAS` and everything else to the primary. Once the
+        thread writes, its reads stay on the primary so it sees its own
+        writes, `ReplicaPinningMiddleware` carries that over to the next
+        requests of the client. Reads inside a transaction on the primary
+        stay in the transaction.
+    """
+    def db_for_read(self, model, **hints):
+        if (settings.DATABASE_REPLICAS
+                and model._meta.label_lower in REPLICA_MODELS
+                and not is_pinned()
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def check_connections(**kwargs) -> None:
+    """
+        Django 3.2 reuses a persistent connection without checking it, so a
+        connection the server dropped while the worker was idle fails the
+        first query of the next request. Connections idle for longer than
+        `DATABASE_HEALTH_CHECK_INTERVAL` are checked when a request starts
+        and closed when unusable, the request then opens a new one.
+    """
+    now = time.monotonic()
+    released = getattr(state, "released", {})
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        idle = now - released.get(connection.alias, 0)
+        if (idle >= settings.DATABASE_HEALTH_CHECK_INTERVAL
+                and not connection.is_usable()):
+            connection.close()
+
+
+def release_connections(**kwargs) -> None:
+    state.released = {
+        connection.alias: time.monotonic()
+        for connection in connections.all()
+        if connection.connection is not None
+    }
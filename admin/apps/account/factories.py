@@ -0,0 +1,44 @@
+import random
+
+import factory
+from apps.account.models import UserDepartment
+
+USERNAME_PREFIX = "benchmark_"
+DEPARTMENT_PREFIX = "Benchmark"
+SYLLABLES = (
+    "ka", "ro", "vi", "le", "mi", "na", "to", "se", "do", "gu", "ba",
+    "zy", "pe", "tr", "sh", "ko", "lu", "ar", "ne", "va",
+)
+ENDINGS = ("ov", "ev", "in", "sky", "enko", "ich")
+FIRST_NAMES = (
+    "Ivan", "Petr", "Anna", "Maria", "Olga", "Sergey", "Dmitry", "Elena",
+    "Pavel", "Irina", "Nikolay", "Tatiana", "Andrey", "Natalia",
+)
+POSTS = (
+    "Software engineer", "Accountant", "Sales manager", "HR specialist",
+    "System administrator", "Designer", "Lawyer", "Analyst",
+)
+BLOCKS = ("Operations", "Finance", "Technology", "Sales")
+
+
+def surname(generator: random.Random) -> str:
+    syllables = generator.choices(SYLLABLES, k=generator.randint(2, 3))
+    return ("".join(syllables) + generator.choice(ENDINGS)).capitalize()
+
+
+class UserDepartmentFactory(factory.django.DjangoModelFactory):
+    """
+        Departments spread over the blocks, five units per block and a
+        group per department.
+    """
+    class Meta:
+        model = UserDepartment
+
+    title = factory.Sequence(
+        lambda number: f"{DEPARTMENT_PREFIX} department {number}",
+    )
+    block = factory.Sequence(
+        lambda number: f"{DEPARTMENT_PREFIX} {BLOCKS[number % len(BLOCKS)]}",
+    )
+    department = factory.Sequence(lambda number: f"Unit {number // 4 % 5}")
+    group = factory.Sequence(lambda number: f"Group {number}")
@@ -0,0 +1,272 @@
+import csv
+import json
+import time
+from collections import Counter
+from itertools import islice
+from typing import IO, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from phonenumber_field.modelfields import PhoneNumber
+from phonenumbers import NumberParseException
+from apps.account.models import (
+    PHONE_FIELDS,
+    OrgUnit,
+    UserDepartment,
+    UserProfile,
+    UserStatus,
+)
+
+PROFILE_FIELDS = (
+    "last_name",
+    "first_name",
+    "middle_name",
+    "post",
+    "description",
+)
+
+
+class RowError(Exception):
+    pass
+
+
+def read_csv(file: IO) -> Iterator[tuple[int, dict]]:
+    """
+        Rows keyed by the header, each with the file line it starts on.
+        Blank lines are skipped.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    line = reader.line_num
+    for values in reader:
+        start, line = line + 1, reader.line_num
+        if values:
+            yield start, dict(zip(header, values))
+
+
+def read_json(file: IO,
+              buffer_size: int = 65536) -> Iterator[tuple[int, object]]:
+    """
+        Items of a JSON array or of JSON lines, each with the file line it
+        starts on, decoded one by one while the file is read in
+        `buffer_size` pieces.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    line = 1
+    eof = False
+    while True:
+        stripped = buffer.lstrip().lstrip("[,").lstrip()
+        line += buffer.count("\n", 0, len(buffer) - len(stripped))
+        buffer = stripped
+        if buffer.startswith("]"):
+            return
+        if buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield line, obj
+                line += buffer.count("\n", 0, end)
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            return
+        data = file.read(buffer_size)
+        eof = not data
+        buffer += data
+
+
+READERS = {
+    "csv": read_csv,
+    "json": read_json,
+}
+
+
+def chunked(rows: Iterable, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class UserImporter:
+    """
+        Imports users with their profiles in chunks. Each chunk is one
+        transaction with a query for already taken usernames and two
+        `bulk_create` calls. `bulk_create` sends no `post_save`, so the
+        `create_user_profile` and `save_user_profile` receivers never run.
+        The profiles are built here instead, and the structure headcounts
+        are raised once per department and chunk. Statuses and departments
+        are resolved by name through maps loaded once.
+    """
+    def __init__(self, chunk_size: int = 1000,
+                 create_departments: bool = False):
+        self.chunk_size = chunk_size
+        self.create_departments = create_departments
+        self.password = make_password(None)
+        self.statuses = {}
+        for pk, status, title in UserStatus.objects.values_list(
+            "pk", "status", "title",
+        ):
+            self.statuses[status.casefold()] = pk
+            self.statuses[title.casefold()] = pk
+        self.departments = {
+            title.casefold(): pk
+            for pk, title in UserDepartment.objects.values_list("pk", "title")
+        }
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.seen = set()
+        self.chunk_departments = []
+        self.chunk_usernames = []
+
+    def run(self, rows: Iterable[tuple[int, dict]], progress=None) -> None:
+        """
+            Import `(line, row)` pairs as the `READERS` yield them, errors
+            are kept with the line of the row.
+        """
+        started = time.monotonic()
+        for chunk in chunked(rows, self.chunk_size):
+            self.import_chunk(chunk)
+            if progress:
+                elapsed = time.monotonic() - started
+                progress(self.imported, self.skipped, elapsed)
+
+    def import_chunk(self, chunk: list[tuple]) -> None:
+        """
+            If the chunk fails, the departments it created and the
+            usernames it claimed are forgotten along with the rolled back
+            rows, so that the maps only name rows that exist.
+        """
+        rows = []
+        for number, row in chunk:
+            if isinstance(row, dict):
+                rows.append((number, row))
+            else:
+                self.errors.append((number, "not an object"))
+        self.chunk_departments = []
+        self.chunk_usernames = []
+        try:
+            with transaction.atomic():
+                imported, skipped = self.save_chunk(rows)
+        except Exception:
+            for key in self.chunk_departments:
+                del self.departments[key]
+            self.seen.difference_update(self.chunk_usernames)
+            raise
+        self.imported += imported
+        self.skipped += skipped
+
+    def save_chunk(self, chunk: list[tuple]) -> tuple[int, int]:
+        taken = set(
+            User.objects.filter(
+                username__in=[clean(row.get("username")) for _, row in chunk],
+            ).values_list("username", flat=True),
+        )
+        users = []
+        profiles = []
+        skipped = 0
+        for number, row in chunk:
+            username = clean(row.get("username"))
+            if username in taken or username in self.seen:
+                skipped += 1
+                continue
+            try:
+                user, profile = self.build(row)
+            except RowError as error:
+                self.errors.append((number, str(error)))
+                continue
+            self.seen.add(username)
+            self.chunk_usernames.append(username)
+            users.append(user)
+            profiles.append(profile)
+        User.objects.bulk_create(users)
+        for user, profile in zip(users, profiles):
+            profile.user = user
+        UserProfile.objects.bulk_create(profiles)
+        for department_id, count in Counter(
+            profile.department_id for profile in profiles
+            if profile.department_id is not None
+        ).items():
+            OrgUnit.move_profiles(None, department_id, count)
+        return len(users), skipped
+
+    def build(self, row: dict) -> tuple[User, UserProfile]:
+        username = clean(row.get("username"))
+        if not username:
+            raise RowError("username is required")
+        values = {field: clean(row.get(field)) for field in PROFILE_FIELDS}
+        user = User(
+            username=username,
+            email=clean(row.get("email")) or "",
+            first_name=values["first_name"] or "",
+            last_name=values["last_name"] or "",
+            password=self.password,
+        )
+        profile = UserProfile(
+            **values,
+            status_id=self.resolve_status(clean(row.get("status"))),
+            department_id=self.resolve_department(
+                clean(row.get("department")),
+            ),
+        )
+        for field in PHONE_FIELDS:
+            setattr(profile, field, self.parse_phone(clean(row.get(field))))
+        profile.format_phones()
+        try:
+            user.clean_fields(exclude=["password"])
+            profile.clean_fields(exclude=["user", "status", "department"])
+        except ValidationError as error:
+            raise RowError(error.message_dict)
+        return user, profile
+
+    def resolve_status(self, name: Optional[str]) -> Optional[int]:
+        if name is None:
+            return UserProfile._meta.get_field("status").get_default()
+        try:
+            return self.statuses[name.casefold()]
+        except KeyError:
+            raise RowError(f"unknown status {name!r}")
+
+    def resolve_department(self, name: Optional[str]) -> Optional[int]:
+        if name is None:
+            return None
+        key = name.casefold()
+        if key not in self.departments:
+            if not self.create_departments:
+                raise RowError(f"unknown department {name!r}")
+            self.departments[key] = UserDepartment.objects.create(
+                title=name,
+            ).pk
+            self.chunk_departments.append(key)
+        return self.departments[key]
+
+    @staticmethod
+    def parse_phone(value: Optional[str]) -> Optional[PhoneNumber]:
+        if value is None:
+            return None
+        try:
+            return PhoneNumber.from_string(
+                phone_number=value,
+                region=settings.PHONE_NUMBERS_REGION,
+            )
+        except NumberParseException:
+            raise RowError(f"invalid phone number {value!r}")
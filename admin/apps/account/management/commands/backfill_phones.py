@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from apps.account.models import PHONE_FIELDS, UserProfile
+
+FORMAT_FIELDS = [
+    f"{field}_{suffix}"
+    for field in PHONE_FIELDS
+    for suffix in ("e164", "national")
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the E.164 and national forms of profile phone numbers saved "
+        "before they were stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Format every number again, not only the missing ones.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        profiles = UserProfile.objects.all()
+        if not options["all"]:
+            profiles = profiles.filter(
+                Q(mobile_phone__isnull=False, mobile_phone_e164__isnull=True)
+                | Q(phone__isnull=False, phone_e164__isnull=True),
+            )
+        profiles = profiles.order_by("pk").only(
+            "pk", *PHONE_FIELDS, *FORMAT_FIELDS,
+        )
+        updated = 0
+        last_pk = None
+        while True:
+            chunk = profiles
+            if last_pk is not None:
+                chunk = chunk.filter(pk__gt=last_pk)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            changed = [profile for profile in chunk if profile.format_phones()]
+            with transaction.atomic():
+                UserProfile.objects.bulk_update(changed, FORMAT_FIELDS)
+            updated += len(changed)
+        self.stdout.write(f"Updated {updated} profiles.")
@@ -0,0 +1,139 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from apps.account.benchmarks import (
+    ApiBenchmark,
+    admin_cases,
+    admin_client,
+    cleanup,
+    compare,
+    count_queries,
+    load_results,
+    measure,
+    save_results,
+)
+from apps.account.models import UserProfile
+from apps.account.seeding import DirectorySeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the admin and API hot paths on synthetic profiles added to "
+        "the database and compare the results with a baseline from an "
+        "earlier run. Meant for an otherwise empty database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[1000, 10000, 100000],
+            help="Numbers of synthetic profiles to measure with.",
+        )
+        parser.add_argument("--rounds", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Write the results to this JSON file.",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            help="Fail if a case got slower than in this results file.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed share of slowdown against the baseline.",
+        )
+        parser.add_argument(
+            "--api-path",
+            type=Path,
+            default=settings.BASE_DIR.parent / "backend",
+            help="Directory of the FastAPI application.",
+        )
+        parser.add_argument(
+            "--no-api",
+            action="store_true",
+            help="Measure the admin only.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the synthetic profiles after the run.",
+        )
+
+    def handle(self, *args, **options):
+        seeder = DirectorySeeder(seed=options["seed"])
+        baseline = (
+            load_results(options["baseline"]) if options["baseline"] else None
+        )
+        api = None if options["no_api"] else self.start_api(options)
+        results = {}
+        # Request and slow request log lines would drown the report.
+        logging.disable(logging.WARNING)
+        try:
+            with override_settings(
+                PROFILE_SEARCH_ENGINE="database",
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            ):
+                client = admin_client()
+                for size in sorted(options["sizes"]):
+                    seeder.run(size)
+                    total = UserProfile.objects.count()
+                    self.stdout.write(
+                        f"{size} synthetic profiles, {total} in total",
+                    )
+                    cases = admin_cases(client)
+                    if api:
+                        cases.update(api.cases())
+                    for name, case in cases.items():
+                        result = measure(case, options["rounds"])
+                        result["profiles"] = total
+                        if not name.startswith("api"):
+                            result["queries"] = count_queries(case)
+                        results[f"{size}/{name}"] = result
+                        self.report(name, result)
+        finally:
+            logging.disable(logging.NOTSET)
+            if api:
+                api.stop()
+            if not options["keep"]:
+                cleanup()
+        if options["output"]:
+            save_results(
+                options["output"],
+                results,
+                seed=options["seed"],
+                rounds=options["rounds"],
+            )
+        if baseline is not None:
+            regressions = compare(results, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError(
+                    "Slower than the baseline:\n" + "\n".join(regressions),
+                )
+            self.stdout.write("No regressions against the baseline.")
+
+    def start_api(self, options) -> ApiBenchmark:
+        try:
+            api = ApiBenchmark(options["api_path"])
+            api.start()
+        except ImportError as error:
+            self.stderr.write(f"API is not measured: {error}")
+            return None
+        return api
+
+    def report(self, name: str, result: dict) -> None:
+        queries = result.get("queries")
+        self.stdout.write(
+            f"  {name:24} median={result['median_ms']:8.2f} ms "
+            f"p95={result['p95_ms']:8.2f} ms"
+            + (f" queries={queries}" if queries is not None else ""),
+        )
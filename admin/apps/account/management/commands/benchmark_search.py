@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from apps.account.models import UserProfile
+from apps.account.search import search_profiles
+from apps.account.seeding import DirectorySeeder, clear
+
+TERMS = ("kar", "ovich", "engineer", "petr ko", "accountant sergey", "zzzq")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure admin profile search latency on synthetic profiles: the "
+        "indexed database search against the plain search_fields ILIKE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[10000, 100000],
+            help="Numbers of profiles to measure with.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the synthetic profiles after the run.",
+        )
+
+    def handle(self, *args, **options):
+        seeder = DirectorySeeder(seed=options["seed"])
+        model_admin = admin.site._registry[UserProfile]
+        engines = {
+            "indexed": lambda queryset, term: search_profiles(
+                queryset, term,
+            ),
+            "ilike": lambda queryset, term: admin.ModelAdmin
+            .get_search_results(model_admin, None, queryset, term)[0],
+        }
+        try:
+            for size in sorted(options["sizes"]):
+                seeder.run(size)
+                self.stdout.write(f"{size} profiles")
+                for term in TERMS:
+                    for name, engine in engines.items():
+                        self.measure(engine, term, name, options["repeat"])
+        finally:
+            if not options["keep"]:
+                clear()
+
+    def measure(self, engine, term: str, name: str, repeat: int):
+        queryset = UserProfile.objects.all()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results = engine(queryset, term)
+            count = results.count()
+            list(results.values_list("pk", flat=True)[:100])
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"  {term!r:22} {name:8} rows={count:<7} "
+            f"median={statistics.median(timings):8.2f} ms "
+            f"p95={p95:8.2f} ms",
+        )
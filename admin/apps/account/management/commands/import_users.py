@@ -0,0 +1,63 @@
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.account.importer import READERS, UserImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Import users with their profiles from a CSV file or a JSON array "
+        "or JSON lines. Columns: username, email, last_name, first_name, "
+        "middle_name, post, mobile_phone, phone, description, department, "
+        "status."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, '-' for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format, guessed from the file extension by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--create-departments",
+            action="store_true",
+            help="Create departments missing in the database.",
+        )
+        parser.add_argument("--encoding", default="utf-8-sig")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        input_format = options["format"]
+        if input_format is None:
+            extension = os.path.splitext(path)[1].lstrip(".").lower()
+            input_format = "json" if extension == "jsonl" else extension
+        if input_format not in READERS:
+            raise CommandError("Unknown input format, use --format.")
+
+        importer = UserImporter(
+            chunk_size=options["chunk_size"],
+            create_departments=options["create_departments"],
+        )
+        reader = READERS[input_format]
+        if path == "-":
+            importer.run(reader(sys.stdin), self.progress)
+        else:
+            with open(path, encoding=options["encoding"], newline="") as file:
+                importer.run(reader(file), self.progress)
+
+        for number, error in importer.errors:
+            self.stderr.write(f"Line {number}: {error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.imported} users, skipped "
+            f"{importer.skipped} existing, {len(importer.errors)} errors.",
+        ))
+
+    def progress(self, imported: int, skipped: int, elapsed: float):
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{imported} imported, {skipped} skipped, "
+            f"{elapsed:.1f} s, {rate:.0f} users/s",
+        )
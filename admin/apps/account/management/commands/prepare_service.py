@@ -0,0 +1,85 @@
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from apps.account import startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Prepare the admin to serve: apply migrations, add the profile "
+        "history partitions, collect static files, load the fixtures, "
+        "compile the messages and create the superuser. Every step is "
+        "skipped when its work is already done, so a restart only pays "
+        "for the checks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Run every step even when it looks done.",
+        )
+
+    def handle(self, *args, **options):
+        self.force = options["force"]
+        steps = [
+            ("migrate", self.migrate),
+            ("partitions", startup.add_history_partitions),
+            ("collectstatic", self.collect_static),
+            ("loaddata", self.load_fixtures),
+            ("compilemessages", self.compile_messages),
+            ("superuser", self.create_superuser),
+        ]
+        for name, step in steps:
+            started = time.monotonic()
+            done = step()
+            self.stdout.write(
+                f"{name}: {'done' if done else 'up to date'}, "
+                f"{time.monotonic() - started:.2f} s",
+            )
+
+    def migrate(self) -> bool:
+        if not self.force and not startup.pending_migrations():
+            return False
+        call_command("migrate", interactive=False, verbosity=0)
+        return True
+
+    def collect_static(self) -> bool:
+        digest = startup.static_digest()
+        if not self.force and startup.static_collected(digest):
+            return False
+        startup.collect_static(digest)
+        return True
+
+    def load_fixtures(self) -> bool:
+        fixtures = [
+            fixture for fixture in settings.STARTUP_FIXTURES
+            if self.force or not startup.fixture_loaded(fixture)
+        ]
+        if fixtures:
+            call_command("loaddata", *fixtures, verbosity=0)
+        return bool(fixtures)
+
+    def compile_messages(self) -> bool:
+        if not self.force and not startup.stale_messages(
+            settings.STARTUP_LOCALES,
+        ):
+            return False
+        try:
+            call_command(
+                "compilemessages", locale=settings.STARTUP_LOCALES,
+                verbosity=0,
+            )
+        except CommandError as error:
+            # Without gettext the admin still serves, untranslated.
+            self.stderr.write(f"compilemessages: {error}")
+            return False
+        return True
+
+    def create_superuser(self) -> bool:
+        return startup.ensure_superuser(
+            settings.STARTUP_SUPERUSER,
+            settings.STARTUP_SUPERUSER_PASSWORD,
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from apps.account.avatars import process_avatar
+from apps.account.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the thumbnails of avatars that have none, for example "
+        "after a restart dropped queued jobs or `AVATAR_SIZES` changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Process every uploaded avatar, not only the missing ones.",
+        )
+
+    def handle(self, *args, **options):
+        default = UserProfile._meta.get_field("avatar").default
+        profiles = UserProfile.objects.exclude(avatar=default).exclude(
+            avatar="",
+        )
+        if not options["all"]:
+            profiles = profiles.filter(avatar_thumbnails={})
+        processed = 0
+        for pk, name in profiles.values_list("pk", "avatar").iterator():
+            process_avatar(UserProfile, pk, name)
+            processed += 1
+        self.stdout.write(f"Processed {processed} avatars.")
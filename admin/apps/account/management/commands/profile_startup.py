@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from apps.account.startup import profile_imports, summarize_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the admin in a fresh interpreter with `-X importtime` and "
+        "report how long settings, applications and URLs took and which "
+        "imports and packages dominate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Write the report to this JSON file.",
+        )
+
+    def handle(self, *args, **options):
+        profile = profile_imports()
+        report = {
+            "phases": profile["phases"],
+            **summarize_imports(profile["imports"], options["limit"]),
+        }
+        self.stdout.write("Phases, ms:")
+        for name, elapsed in report["phases"].items():
+            self.stdout.write(f"  {name:<40} {elapsed:>9.1f}")
+        self.stdout.write(f"Imports, {report['total']:.1f} ms in total:")
+        for row in report["imports"]:
+            self.stdout.write(
+                f"  {row['name']:<40} {row['cumulative']:>9.1f}",
+            )
+        self.stdout.write("Packages by own import time, ms:")
+        for row in report["packages"]:
+            self.stdout.write(f"  {row['name']:<40} {row['self']:>9.1f}")
+        if options["output"]:
+            options["output"].write_text(json.dumps(report, indent=2))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.account.models import OrgUnit, UserDepartment
+
+
+class Command(BaseCommand):
+    help = (
+        "Place every department in the structure tree again, delete the "
+        "units left without departments and count the headcounts from "
+        "scratch, for example after raw SQL changes."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for department in UserDepartment.objects.order_by("pk"):
+                unit = OrgUnit.for_department(department)
+                if unit != department.org_unit:
+                    UserDepartment.objects.filter(pk=department.pk).update(
+                        org_unit=unit,
+                    )
+            pruned = OrgUnit.prune()
+            OrgUnit.recount()
+        self.stdout.write(
+            f"Rebuilt {OrgUnit.objects.count()} structure units, deleted "
+            f"{pruned} empty ones.",
+        )
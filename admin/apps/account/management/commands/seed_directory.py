@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from apps.account.seeding import DirectorySeeder, clear
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, profiles and departments "
+        "for benchmarks and load tests. The same seed gives the same "
+        "directory, users already seeded are kept and topped up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=1000,
+            help=(
+                "Number of synthetic users to have in the database, 0 to "
+                "only clear with --clear."
+            ),
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--departments",
+            type=int,
+            help="Number of departments, one per 250 users by default.",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete the synthetic data seeded before seeding again.",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            clear()
+        if not options["users"]:
+            self.stdout.write(self.style.SUCCESS("Nothing seeded."))
+            return
+        seeder = DirectorySeeder(
+            seed=options["seed"],
+            chunk_size=options["chunk_size"],
+            departments=options["departments"],
+        )
+        seeder.run(options["users"], self.progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {seeder.created} users.",
+        ))
+
+    def progress(self, created: int, elapsed: float):
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{created} seeded, {elapsed:.1f} s, {rate:.0f} users/s",
+        )
@@ -0,0 +1,203 @@
+import threading
+from bisect import bisect_left
+from typing import Optional
+
+from django.http import HttpResponse
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+registry = []
+
+
+def escape_label(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+class Metric:
+    """
+        Named metric with a fixed set of label names, kept in the memory of
+        the process. The admin runs a single gunicorn worker, so whatever
+        `/metrics` of that process shows is the whole service.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def label_string(self, values: tuple, extra: tuple = ()) -> str:
+        pairs = [*zip(self.labels, values), *extra]
+        if not pairs:
+            return ""
+        labels = ",".join(
+            f'{name}="{escape_label(value)}"' for name, value in pairs
+        )
+        return f"{{{labels}}}"
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{self.label_string(labels)} {value}"
+            for labels, value in values
+        ]
+
+
+class Histogram(Metric):
+    """
+        Observations are counted in the first bucket they fit in, buckets
+        are made cumulative when rendered.
+    """
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (),
+                 buckets: tuple = DURATION_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(
+                labels, ([0] * (len(self.buckets) + 1), 0),
+            )
+            counts[index] += 1
+            self._values[labels] = (counts, total + value)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._values.items()
+            ]
+        lines = []
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = self.label_string(labels, (("le", bound),))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_string = self.label_string(labels)
+            lines.append(f"{self.name}_sum{label_string} {total}")
+            lines.append(f"{self.name}_count{label_string} {cumulative}")
+        return lines
+
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Handled requests.",
+    ("method", "view", "status"),
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling a request.",
+    ("method", "view"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries run by a request.",
+    ("method", "view"),
+    QUERY_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent waiting for the database.",
+    ("method", "view"),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Size of response bodies, streamed responses are not counted.",
+    ("method", "view"),
+    SIZE_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by result.",
+    ("cache", "result"),
+)
+
+
+class RequestStats:
+    """
+        What one request did so far. The middleware keeps the instance of
+        the current request in `local`, queries and cache lookups made by
+        the same thread are added to it.
+    """
+    def __init__(self, statement_limit: int = 0):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.statement_limit = statement_limit
+        self.statements = []
+
+    def add_query(self, sql: str, duration: float) -> None:
+        self.queries += 1
+        self.db_time += duration
+        if len(self.statements) < self.statement_limit:
+            self.statements.append((duration, sql))
+
+
+local = threading.local()
+
+
+def current_stats() -> Optional[RequestStats]:
+    return getattr(local, "stats", None)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+    stats = current_stats()
+    if stats is None:
+        return
+    if hit:
+        stats.cache_hits += 1
+    else:
+        stats.cache_misses += 1
+
+
+def render() -> str:
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_view(request) -> HttpResponse:
+    """
+        Prometheus text exposition of every metric of this process. nginx
+        does not proxy the path, it is scraped on the internal network.
+    """
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,129 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from apps.account.database import has_written, reset_pinning
+from apps.account.metrics import (
+    REQUEST_DB_DURATION,
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUESTS,
+    RESPONSE_SIZE,
+    RequestStats,
+    local,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+        Measures every request: duration, number and time of the database
+        queries, lookup cache hits and misses, and the response size. The
+        numbers go to the Prometheus metrics and to one `key=value` log
+        line, also passed as the `request_metrics` record attribute.
+        Requests slower than `REQUEST_SLOW_THRESHOLD` seconds are logged
+        again as a warning with their SQL, slowest statement first.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats(settings.REQUEST_SQL_CAPTURE_LIMIT)
+        local.stats = stats
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(self.track_query),
+                    )
+                response = self.get_response(request)
+        finally:
+            local.stats = None
+        self.record(request, response, stats, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def track_query(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats = local.stats
+            if stats is not None:
+                stats.add_query(sql, time.perf_counter() - started)
+
+    @staticmethod
+    def record(request, response, stats: RequestStats,
+               duration: float) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        method = request.method
+        size = None if response.streaming else len(response.content)
+        REQUESTS.inc(method, view, response.status_code)
+        REQUEST_DURATION.observe(duration, method, view)
+        REQUEST_QUERIES.observe(stats.queries, method, view)
+        REQUEST_DB_DURATION.observe(stats.db_time, method, view)
+        if size is not None:
+            RESPONSE_SIZE.observe(size, method, view)
+        fields = {
+            "method": method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 1),
+            "queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 1),
+            "cache_hits": stats.cache_hits,
+            "cache_misses": stats.cache_misses,
+            "size": size,
+        }
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"request_metrics": fields},
+        )
+        if duration < settings.REQUEST_SLOW_THRESHOLD:
+            return
+        statements = "\n".join(
+            f"{elapsed * 1000:.1f}ms {sql}"
+            for elapsed, sql in sorted(stats.statements, reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s took %.1fms with %d queries:\n%s",
+            method, request.path, duration * 1000, stats.queries,
+            statements,
+            extra={"request_metrics": fields},
+        )
+
+
+class ReplicaPinningMiddleware:
+    """
+        Read-your-writes for clients of the replica router: a request that
+        changes data sets a cookie, and reads of the requests carrying it
+        go to the primary until the replicas have caught up.
+    """
+    cookie_name = "primary_pinned"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset_pinning(self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            written = has_written()
+        finally:
+            reset_pinning()
+        if (settings.DATABASE_REPLICAS and written
+                and request.method not in ("GET", "HEAD", "OPTIONS")):
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 08:34
+
+from django.db import migrations, models
+import django.db.models.expressions
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('last_name', django.db.models.expressions.Value('')), django.db.models.functions.comparison.Coalesce('first_name', django.db.models.expressions.Value('')), django.db.models.expressions.F('uuid'), name='user_profile_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = """
+    ALTER TABLE content.user_profile
+    ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple',
+            coalesce(last_name, '') || ' ' ||
+            coalesce(first_name, '') || ' ' ||
+            coalesce(middle_name, '')
+        ), 'A') ||
+        setweight(to_tsvector('simple', coalesce(post, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED;
+    CREATE INDEX user_profile_search_idx
+    ON content.user_profile USING gin (search_vector);
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+    DROP INDEX content.user_profile_search_idx;
+    ALTER TABLE content.user_profile DROP COLUMN search_vector;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0003_user_profile_updated_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['last_name'], name='user_profile_last_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['first_name'], name='user_profile_first_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['middle_name'], name='user_profile_middle_name_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['post'], name='user_profile_post_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+    ]
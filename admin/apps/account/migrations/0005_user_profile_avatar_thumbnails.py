@@ -0,0 +1,23 @@
+import apps.account.avatars
+import apps.account.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_user_profile_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar',
+            field=models.ImageField(default='system/user-dummy-img.jpg', storage=apps.account.avatars.ContentAddressedStorage(), upload_to=apps.account.models.generate_avatar_path),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Filled in automatically by the system', verbose_name='Avatar thumbnails'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0005_user_profile_avatar_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='mobile_phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='Mobile phone in E.164'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='mobile_phone_national',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, verbose_name='Mobile phone in national format'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='Phone in E.164'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='phone_national',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, verbose_name='Phone in national format'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('mobile_phone_e164__isnull', False)), fields=['mobile_phone_e164'], name='user_profile_mobile_e164_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('phone_e164__isnull', False)), fields=['phone_e164'], name='user_profile_phone_e164_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+LEVELS = ("block", "department", "group", "branch")
+
+RECOUNT_SQL = """
+    UPDATE content.org_unit u
+    SET headcount = counts.headcount
+    FROM (
+        SELECT a.id, count(p.uuid) AS headcount
+        FROM content.org_unit a
+        LEFT JOIN content.org_unit l ON l.path LIKE a.path || '%'
+        LEFT JOIN content.user_department d ON d.org_unit_id = l.id
+        LEFT JOIN content.user_profile p ON p.department_id = d.id
+        GROUP BY a.id
+    ) counts
+    WHERE counts.id = u.id
+"""
+
+
+def build_tree(apps, schema_editor):
+    OrgUnit = apps.get_model("account", "OrgUnit")
+    UserDepartment = apps.get_model("account", "UserDepartment")
+    units = {}
+    for department in UserDepartment.objects.order_by("pk"):
+        key = ()
+        unit = None
+        for level in LEVELS:
+            name = (getattr(department, level) or "").strip()
+            if not name:
+                continue
+            key += ((level, name),)
+            if key not in units:
+                parent_path = unit.path if unit else "/"
+                units[key] = OrgUnit.objects.create(
+                    parent=unit, level=level, name=name,
+                )
+                units[key].path = f"{parent_path}{units[key].pk}/"
+                units[key].save(update_fields=["path"])
+            unit = units[key]
+        if unit is not None:
+            department.org_unit = unit
+            department.save(update_fields=["org_unit"])
+    schema_editor.execute(RECOUNT_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0006_user_profile_phone_formats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrgUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('block', 'Block'), ('department', 'Departament'), ('group', 'Group'), ('branch', 'Branch')], max_length=20, verbose_name='Level')),
+                ('name', models.CharField(max_length=250, verbose_name='Name')),
+                ('path', models.CharField(blank=True, editable=False, max_length=100, verbose_name='Path')),
+                ('headcount', models.PositiveIntegerField(default=0, editable=False, verbose_name='Headcount')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='children', to='account.orgunit', verbose_name='Parent unit')),
+            ],
+            options={
+                'verbose_name': 'Structure unit',
+                'verbose_name_plural': 'Company structure',
+                'db_table': 'content"."org_unit',
+                'ordering': ['path'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='orgunit',
+            index=models.Index(fields=['path'], name='org_unit_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddConstraint(
+            model_name='orgunit',
+            constraint=models.UniqueConstraint(fields=('parent', 'level', 'name'), name='org_unit_node_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='orgunit',
+            constraint=models.UniqueConstraint(condition=models.Q(('parent__isnull', True)), fields=('level', 'name'), name='org_unit_root_uniq'),
+        ),
+        migrations.AddField(
+            model_name='userdepartment',
+            name='org_unit',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='departments', to='account.orgunit', verbose_name='Structure unit'),
+        ),
+        migrations.RunPython(build_tree, migrations.RunPython.noop),
+    ]
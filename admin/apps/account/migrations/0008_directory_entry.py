@@ -0,0 +1,232 @@
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+COLUMNS = (
+    "uuid", "user_id", "username", "last_name", "first_name", "middle_name",
+    "full_name", "abbreviation", "post", "mobile_phone_e164",
+    "mobile_phone_national", "phone_e164", "phone_national", "avatar",
+    "avatar_thumbnails", "status_id", "status_title", "department_id",
+    "department_title", "department_path", "org_unit_path", "updated_time",
+)
+
+# Function bodies are not tracked as dependencies, unlike a view, so
+# later migrations can still alter the joined columns.
+DIRECTORY_SQL = f"""
+    CREATE FUNCTION content.directory_entry_refresh(profile_ids uuid[])
+    RETURNS void LANGUAGE sql AS $$
+        INSERT INTO content.directory_entry ({", ".join(COLUMNS)})
+        SELECT
+            p.uuid,
+            p.user_id,
+            u.username,
+            p.last_name,
+            p.first_name,
+            p.middle_name,
+            concat_ws(' ', p.last_name, p.first_name, p.middle_name)
+                AS full_name,
+            concat_ws(' ', p.last_name, concat(
+                left(p.first_name, 1), '.', left(p.middle_name, 1), '.'
+            )) AS abbreviation,
+            p.post,
+            p.mobile_phone_e164,
+            p.mobile_phone_national,
+            p.phone_e164,
+            p.phone_national,
+            p.avatar,
+            p.avatar_thumbnails,
+            p.status_id,
+            s.title AS status_title,
+            p.department_id,
+            d.title AS department_title,
+            nullif(
+                concat_ws(' / ', d.block, d.department, d."group", d.branch), ''
+            ) AS department_path,
+            o.path AS org_unit_path,
+            p.updated_time
+        FROM content.user_profile p
+        JOIN public.auth_user u ON u.id = p.user_id
+        LEFT JOIN content.user_status s ON s.id = p.status_id
+        LEFT JOIN content.user_department d ON d.id = p.department_id
+        LEFT JOIN content.org_unit o ON o.id = d.org_unit_id
+        WHERE p.uuid = ANY(profile_ids)
+        ON CONFLICT (uuid) DO UPDATE SET {", ".join(
+            f"{column} = EXCLUDED.{column}" for column in COLUMNS[1:]
+        )};
+    $$;
+
+    CREATE FUNCTION content.directory_profiles_changed()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM content.directory_entry_refresh(
+            ARRAY(SELECT uuid FROM changed)
+        );
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE FUNCTION content.directory_profiles_deleted()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        DELETE FROM content.directory_entry
+        WHERE uuid IN (SELECT uuid FROM removed);
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE FUNCTION content.directory_users_changed()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM content.directory_entry_refresh(ARRAY(
+            SELECT e.uuid
+            FROM changed c
+            JOIN previous o ON o.id = c.id
+            JOIN content.directory_entry e ON e.user_id = c.id
+            WHERE c.username IS DISTINCT FROM o.username
+        ));
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE FUNCTION content.directory_statuses_changed()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM content.directory_entry_refresh(ARRAY(
+            SELECT e.uuid
+            FROM changed c
+            JOIN previous o ON o.id = c.id
+            JOIN content.directory_entry e ON e.status_id = c.id
+            WHERE c.title IS DISTINCT FROM o.title
+        ));
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE FUNCTION content.directory_departments_changed()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM content.directory_entry_refresh(ARRAY(
+            SELECT e.uuid
+            FROM changed c
+            JOIN previous o ON o.id = c.id
+            JOIN content.directory_entry e ON e.department_id = c.id
+            WHERE (c.title, c.block, c.department, c."group", c.branch,
+                   c.org_unit_id)
+                IS DISTINCT FROM (o.title, o.block, o.department, o."group",
+                                  o.branch, o.org_unit_id)
+        ));
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE TRIGGER directory_profiles_inserted
+    AFTER INSERT ON content.user_profile
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.directory_profiles_changed();
+
+    CREATE TRIGGER directory_profiles_updated
+    AFTER UPDATE ON content.user_profile
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.directory_profiles_changed();
+
+    CREATE TRIGGER directory_profiles_deleted
+    AFTER DELETE ON content.user_profile
+    REFERENCING OLD TABLE AS removed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.directory_profiles_deleted();
+
+    CREATE TRIGGER directory_users_updated
+    AFTER UPDATE ON public.auth_user
+    REFERENCING OLD TABLE AS previous NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.directory_users_changed();
+
+    CREATE TRIGGER directory_statuses_updated
+    AFTER UPDATE ON content.user_status
+    REFERENCING OLD TABLE AS previous NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.directory_statuses_changed();
+
+    CREATE TRIGGER directory_departments_updated
+    AFTER UPDATE ON content.user_department
+    REFERENCING OLD TABLE AS previous NEW TABLE AS changed
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION content.directory_departments_changed();
+
+    SELECT content.directory_entry_refresh(
+        ARRAY(SELECT uuid FROM content.user_profile)
+    );
+"""
+
+DROP_DIRECTORY_SQL = """
+    DROP TRIGGER directory_departments_updated ON content.user_department;
+    DROP TRIGGER directory_statuses_updated ON content.user_status;
+    DROP TRIGGER directory_users_updated ON public.auth_user;
+    DROP TRIGGER directory_profiles_deleted ON content.user_profile;
+    DROP TRIGGER directory_profiles_updated ON content.user_profile;
+    DROP TRIGGER directory_profiles_inserted ON content.user_profile;
+    DROP FUNCTION content.directory_departments_changed();
+    DROP FUNCTION content.directory_statuses_changed();
+    DROP FUNCTION content.directory_users_changed();
+    DROP FUNCTION content.directory_profiles_deleted();
+    DROP FUNCTION content.directory_profiles_changed();
+    DROP FUNCTION content.directory_entry_refresh(uuid[]);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_org_unit'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectoryEntry',
+            fields=[
+                ('uuid', models.UUIDField(primary_key=True, serialize=False, verbose_name='User UUID')),
+                ('user_id', models.IntegerField(unique=True)),
+                ('username', models.CharField(max_length=150, verbose_name='Username')),
+                ('last_name', models.CharField(max_length=50, null=True, verbose_name='User last name')),
+                ('first_name', models.CharField(max_length=50, null=True, verbose_name='User first name')),
+                ('middle_name', models.CharField(max_length=50, null=True, verbose_name='User middle name')),
+                ('full_name', models.CharField(max_length=152, verbose_name='Full name')),
+                ('abbreviation', models.CharField(max_length=56, verbose_name='Abbreviation')),
+                ('post', models.CharField(max_length=150, null=True, verbose_name='User post')),
+                ('mobile_phone_e164', models.CharField(max_length=20, null=True)),
+                ('mobile_phone_national', models.CharField(max_length=32, null=True, verbose_name='User mobile phone number')),
+                ('phone_e164', models.CharField(max_length=20, null=True)),
+                ('phone_national', models.CharField(max_length=32, null=True, verbose_name='User phone number')),
+                ('avatar', models.CharField(max_length=100)),
+                ('avatar_thumbnails', models.JSONField(default=dict)),
+                ('status_id', models.BigIntegerField(db_index=True, null=True)),
+                ('status_title', models.CharField(max_length=50, null=True, verbose_name="The user's status in the system")),
+                ('department_id', models.BigIntegerField(db_index=True, null=True)),
+                ('department_title', models.CharField(max_length=150, null=True, verbose_name='User department in the company')),
+                ('department_path', models.CharField(max_length=1003, null=True, verbose_name='Company structure')),
+                ('org_unit_path', models.CharField(max_length=100, null=True)),
+                ('updated_time', models.DateTimeField(verbose_name='User info updated time')),
+            ],
+            options={
+                'verbose_name': 'Directory entry',
+                'verbose_name_plural': 'Directory',
+                'db_table': 'content"."directory_entry',
+                'ordering': ['last_name', 'first_name'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='directoryentry',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('last_name', django.db.models.expressions.Value('')), django.db.models.functions.comparison.Coalesce('first_name', django.db.models.expressions.Value('')), django.db.models.expressions.F('uuid'), name='directory_entry_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='directoryentry',
+            index=models.Index(fields=['org_unit_path'], name='directory_entry_org_unit_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='directoryentry',
+            index=models.Index(condition=models.Q(('mobile_phone_e164__isnull', False)), fields=['mobile_phone_e164'], name='directory_entry_mobile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='directoryentry',
+            index=models.Index(condition=models.Q(('phone_e164__isnull', False)), fields=['phone_e164'], name='directory_entry_phone_idx'),
+        ),
+        migrations.RunSQL(DIRECTORY_SQL, DROP_DIRECTORY_SQL),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+TABLES = ("directory_entry", "org_unit", "user_department", "user_status")
+
+TRIGGER_SQL = """
+    CREATE TRIGGER table_version_bumped
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON content.{table}
+    FOR EACH STATEMENT EXECUTE FUNCTION content.table_version_bump();
+"""
+
+# A statement that changes nothing still bumps the version, clients then
+# download an unchanged response once more.
+VERSION_SQL = f"""
+    CREATE FUNCTION content.table_version_bump()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO content.table_version AS v (name, version, updated_time)
+        VALUES (TG_TABLE_NAME, 1, now())
+        ON CONFLICT (name) DO UPDATE
+        SET version = v.version + 1,
+            updated_time = greatest(v.updated_time, now());
+        RETURN NULL;
+    END;
+    $$;
+
+    INSERT INTO content.table_version (name, version, updated_time)
+    SELECT name, 1, coalesce(
+        (SELECT max(updated_time) FROM content.directory_entry), now()
+    )
+    FROM unnest(ARRAY[{", ".join(f"'{table}'" for table in TABLES)}]) AS name;
+    {"".join(TRIGGER_SQL.format(table=table) for table in TABLES)}
+"""
+
+DROP_VERSION_SQL = "".join(
+    f"DROP TRIGGER table_version_bumped ON content.{table};\n"
+    for table in TABLES
+) + "DROP FUNCTION content.table_version_bump();\n"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_directory_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('name', models.CharField(max_length=63, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_time', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Table version',
+                'verbose_name_plural': 'Table versions',
+                'db_table': 'content"."table_version',
+            },
+        ),
+        migrations.RunSQL(VERSION_SQL, DROP_VERSION_SQL),
+    ]
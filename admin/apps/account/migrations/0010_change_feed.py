@@ -0,0 +1,155 @@
+from django.db import migrations
+
+CHANNEL = "directory_changes"
+# Statements changing more rows send one event with the count instead, a
+# client then reloads rather than replaying thousands of events.
+ROW_LIMIT = 1000
+
+TRIGGER_SQL = """
+    CREATE TRIGGER change_feed_inserted
+    AFTER INSERT ON content.{table}
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.{function};
+
+    CREATE TRIGGER change_feed_updated
+    AFTER UPDATE ON content.{table}
+    REFERENCING OLD TABLE AS previous NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.{function};
+
+    CREATE TRIGGER change_feed_deleted
+    AFTER DELETE ON content.{table}
+    REFERENCING OLD TABLE AS previous
+    FOR EACH STATEMENT EXECUTE FUNCTION content.{function};
+"""
+
+TABLES = (
+    ("user_profile", "change_feed_profiles()"),
+    ("user_status", "change_feed_lookups('status')"),
+    ("user_department", "change_feed_lookups('department')"),
+)
+
+# Notifications are delivered when the transaction commits, in commit
+# order, and not at all when it rolls back.
+CHANGE_FEED_SQL = f"""
+    CREATE FUNCTION content.change_feed_publish(
+        kind text, op text, events jsonb[]
+    )
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        IF cardinality(events) > {ROW_LIMIT} THEN
+            PERFORM pg_notify('{CHANNEL}', jsonb_build_object(
+                'type', kind, 'op', op, 'count', cardinality(events)
+            )::text);
+        ELSE
+            PERFORM pg_notify('{CHANNEL}', jsonb_strip_nulls(
+                event || jsonb_build_object('type', kind, 'op', op)
+            )::text)
+            FROM unnest(events) AS event;
+        END IF;
+    END;
+    $$;
+
+    CREATE FUNCTION content.change_feed_profiles()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        events jsonb[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            events := ARRAY(
+                SELECT jsonb_build_object(
+                    'id', c.uuid,
+                    'department', c.department_id,
+                    'status', c.status_id
+                )
+                FROM changed c
+            );
+        ELSIF TG_OP = 'UPDATE' THEN
+            events := ARRAY(
+                SELECT jsonb_build_object(
+                    'id', c.uuid,
+                    'department', c.department_id,
+                    'previous_department',
+                    nullif(o.department_id, c.department_id),
+                    'status', c.status_id
+                )
+                FROM changed c
+                JOIN previous o ON o.uuid = c.uuid
+                WHERE (c.status_id, c.department_id, c.last_name,
+                       c.first_name, c.middle_name, c.post,
+                       c.mobile_phone_e164, c.phone_e164, c.avatar,
+                       c.description)
+                    IS DISTINCT FROM (o.status_id, o.department_id,
+                                      o.last_name, o.first_name,
+                                      o.middle_name, o.post,
+                                      o.mobile_phone_e164, o.phone_e164,
+                                      o.avatar, o.description)
+            );
+        ELSE
+            events := ARRAY(
+                SELECT jsonb_build_object(
+                    'id', o.uuid, 'department', o.department_id
+                )
+                FROM previous o
+            );
+        END IF;
+        PERFORM content.change_feed_publish(
+            'profile', lower(TG_OP), events
+        );
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE FUNCTION content.change_feed_lookups()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+        events jsonb[];
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            events := ARRAY(
+                SELECT jsonb_build_object('id', c.id) FROM changed c
+            );
+        ELSIF TG_OP = 'UPDATE' THEN
+            events := ARRAY(
+                SELECT jsonb_build_object('id', c.id)
+                FROM changed c
+                JOIN previous o ON o.id = c.id
+                WHERE c IS DISTINCT FROM o
+            );
+        ELSE
+            events := ARRAY(
+                SELECT jsonb_build_object('id', o.id) FROM previous o
+            );
+        END IF;
+        PERFORM content.change_feed_publish(
+            TG_ARGV[0], lower(TG_OP), events
+        );
+        RETURN NULL;
+    END;
+    $$;
+
+    {"".join(
+        TRIGGER_SQL.format(table=table, function=function)
+        for table, function in TABLES
+    )}
+"""
+
+DROP_CHANGE_FEED_SQL = "".join(
+    f"DROP TRIGGER change_feed_{op} ON content.{table};\n"
+    for table, _ in TABLES
+    for op in ("inserted", "updated", "deleted")
+) + """
+    DROP FUNCTION content.change_feed_lookups();
+    DROP FUNCTION content.change_feed_profiles();
+    DROP FUNCTION content.change_feed_publish(text, text, jsonb[]);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_table_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CHANGE_FEED_SQL, DROP_CHANGE_FEED_SQL),
+    ]
@@ -0,0 +1,254 @@
+from django.db import migrations, models
+
+# Profile fields kept in the history, the derived phone formats, avatar
+# thumbnails and timestamps are left out.
+FIELDS = (
+    "status_id", "department_id", "post", "last_name", "first_name",
+    "middle_name", "mobile_phone", "phone", "description", "avatar",
+    "experience_start", "experience_now", "experience_description",
+)
+# Partitions are created this many months ahead of the current one.
+MONTHS_AHEAD = 3
+
+
+def snapshot(alias: str) -> str:
+    return "jsonb_build_object({})".format(
+        ", ".join(f"'{field}', {alias}.{field}" for field in FIELDS),
+    )
+
+
+HISTORY_SQL = f"""
+    CREATE TABLE content.profile_history (
+        id bigserial,
+        profile_id uuid NOT NULL,
+        changed_time timestamptz NOT NULL DEFAULT clock_timestamp(),
+        operation char(1) NOT NULL,
+        changes jsonb NOT NULL,
+        PRIMARY KEY (id, changed_time)
+    ) PARTITION BY RANGE (changed_time);
+
+    CREATE TABLE content.profile_history_default
+    PARTITION OF content.profile_history DEFAULT;
+
+    CREATE INDEX profile_history_profile_idx
+    ON content.profile_history (profile_id, changed_time);
+
+    CREATE INDEX profile_history_department_idx
+    ON content.profile_history (
+        ((changes ->> 'department_id')::bigint), changed_time
+    )
+    WHERE changes ? 'department_id';
+
+    -- Rows that landed in the default partition before the partition of
+    -- their month existed are moved into it.
+    CREATE FUNCTION content.profile_history_add_partition(month date)
+    RETURNS void LANGUAGE plpgsql AS $$
+    DECLARE
+        start_time timestamptz :=
+            date_trunc('month', month)::timestamp AT TIME ZONE 'UTC';
+        end_time timestamptz := start_time + interval '1 month';
+        partition text := 'profile_history_' || to_char(month, 'YYYYMM');
+    BEGIN
+        IF to_regclass('content.' || partition) IS NOT NULL THEN
+            RETURN;
+        END IF;
+        EXECUTE format(
+            'CREATE TABLE content.%I (LIKE content.profile_history '
+            'INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition
+        );
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM content.profile_history_default '
+            'WHERE changed_time >= %L AND changed_time < %L RETURNING *) '
+            'INSERT INTO content.%I SELECT * FROM moved',
+            start_time, end_time, partition
+        );
+        EXECUTE format(
+            'ALTER TABLE content.profile_history ATTACH PARTITION '
+            'content.%I FOR VALUES FROM (%L) TO (%L)',
+            partition, start_time, end_time
+        );
+    END;
+    $$;
+
+    CREATE FUNCTION content.profile_history_add_partitions(since date)
+    RETURNS void LANGUAGE sql AS $$
+        SELECT content.profile_history_add_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', least(since, current_date)),
+            date_trunc('month', current_date)
+                + interval '{MONTHS_AHEAD} month',
+            interval '1 month'
+        ) AS month;
+    $$;
+
+    CREATE FUNCTION content.profile_history_append_only()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        RAISE EXCEPTION 'profile_history is append-only';
+    END;
+    $$;
+
+    CREATE TRIGGER profile_history_append_only
+    BEFORE UPDATE OR DELETE ON content.profile_history
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION content.profile_history_append_only();
+
+    -- One INSERT per statement on user_profile. Inserts keep the filled
+    -- fields, updates only the fields that changed.
+    CREATE FUNCTION content.profile_history_record()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO content.profile_history
+                (profile_id, operation, changes)
+            SELECT c.uuid, 'I', jsonb_strip_nulls({snapshot("c")})
+            FROM changed c;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO content.profile_history
+                (profile_id, operation, changes)
+            SELECT s.uuid, 'U', (
+                SELECT jsonb_object_agg(n.key, n.value)
+                FROM jsonb_each(s.new) n
+                WHERE n.value IS DISTINCT FROM s.old -> n.key
+            )
+            FROM (
+                SELECT c.uuid, {snapshot("c")} AS new, {snapshot("o")} AS old
+                FROM changed c
+                JOIN previous o ON o.uuid = c.uuid
+            ) s
+            WHERE s.new IS DISTINCT FROM s.old;
+        ELSE
+            INSERT INTO content.profile_history
+                (profile_id, operation, changes)
+            SELECT o.uuid, 'D', '{{}}'::jsonb
+            FROM previous o;
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE TRIGGER profile_history_inserted
+    AFTER INSERT ON content.user_profile
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.profile_history_record();
+
+    CREATE TRIGGER profile_history_updated
+    AFTER UPDATE ON content.user_profile
+    REFERENCING OLD TABLE AS previous NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.profile_history_record();
+
+    CREATE TRIGGER profile_history_deleted
+    AFTER DELETE ON content.user_profile
+    REFERENCING OLD TABLE AS previous
+    FOR EACH STATEMENT EXECUTE FUNCTION content.profile_history_record();
+
+    -- Fields of the profile as they were at `at`, NULL when the profile
+    -- did not exist then.
+    CREATE FUNCTION content.profile_as_of(profile uuid, at timestamptz)
+    RETURNS jsonb LANGUAGE sql STABLE AS $$
+        SELECT coalesce(jsonb_object_agg(key, value), '{{}}'::jsonb)
+        FROM (
+            SELECT DISTINCT ON (e.key) e.key, e.value
+            FROM content.profile_history h,
+                 jsonb_each(h.changes) e
+            WHERE h.profile_id = profile AND h.changed_time <= at
+            ORDER BY e.key, h.changed_time DESC, h.id DESC
+        ) latest
+        HAVING EXISTS (
+            SELECT 1 FROM content.profile_history h
+            WHERE h.profile_id = profile AND h.changed_time <= at
+        ) AND NOT EXISTS (
+            SELECT 1 FROM content.profile_history h
+            WHERE h.profile_id = profile AND h.changed_time <= at
+              AND h.operation = 'D'
+        );
+    $$;
+
+    -- Profiles that were in the department at `at`. Candidates are the
+    -- profiles that ever joined it before, found on the department index,
+    -- each is checked against its own latest department change.
+    CREATE FUNCTION content.department_profiles_as_of(
+        department bigint, at timestamptz
+    )
+    RETURNS TABLE (profile_id uuid) LANGUAGE sql STABLE AS $$
+        SELECT candidate.profile_id
+        FROM (
+            SELECT DISTINCT h.profile_id
+            FROM content.profile_history h
+            WHERE h.changes ? 'department_id'
+              AND (h.changes ->> 'department_id')::bigint = department
+              AND h.changed_time <= at
+        ) candidate
+        CROSS JOIN LATERAL (
+            SELECT h.operation,
+                   (h.changes ->> 'department_id')::bigint AS department_id
+            FROM content.profile_history h
+            WHERE h.profile_id = candidate.profile_id
+              AND h.changed_time <= at
+              AND (h.changes ? 'department_id' OR h.operation = 'D')
+            ORDER BY h.changed_time DESC, h.id DESC
+            LIMIT 1
+        ) latest
+        WHERE latest.operation <> 'D'
+          AND latest.department_id = department;
+    $$;
+
+    SELECT content.profile_history_add_partitions(
+        coalesce(
+            (SELECT min(created_time) FROM content.user_profile)::date,
+            current_date
+        )
+    );
+
+    -- What is known about the existing profiles, dated at their creation.
+    INSERT INTO content.profile_history
+        (profile_id, changed_time, operation, changes)
+    SELECT p.uuid, p.created_time, 'I', jsonb_strip_nulls({snapshot("p")})
+    FROM content.user_profile p;
+"""
+
+DROP_HISTORY_SQL = """
+    DROP TRIGGER profile_history_deleted ON content.user_profile;
+    DROP TRIGGER profile_history_updated ON content.user_profile;
+    DROP TRIGGER profile_history_inserted ON content.user_profile;
+    DROP FUNCTION content.department_profiles_as_of(bigint, timestamptz);
+    DROP FUNCTION content.profile_as_of(uuid, timestamptz);
+    DROP FUNCTION content.profile_history_record();
+    DROP TABLE content.profile_history;
+    DROP FUNCTION content.profile_history_append_only();
+    DROP FUNCTION content.profile_history_add_partitions(date);
+    DROP FUNCTION content.profile_history_add_partition(date);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0010_change_feed'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            HISTORY_SQL,
+            DROP_HISTORY_SQL,
+            state_operations=[
+                migrations.CreateModel(
+                    name='ProfileHistory',
+                    fields=[
+                        ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                        ('profile_id', models.UUIDField(verbose_name='User UUID')),
+                        ('changed_time', models.DateTimeField(verbose_name='Changed time')),
+                        ('operation', models.CharField(choices=[('I', 'Created'), ('U', 'Changed'), ('D', 'Deleted')], max_length=1, verbose_name='Operation')),
+                        ('changes', models.JSONField(verbose_name='Changed fields')),
+                    ],
+                    options={
+                        'verbose_name': 'Profile history entry',
+                        'verbose_name_plural': 'Profile history',
+                        'db_table': 'content"."profile_history',
+                        'ordering': ['changed_time', 'id'],
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
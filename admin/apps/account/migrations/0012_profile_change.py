@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# The search ETL reads profile changes in the order of the transactions
+# that made them: a change row carries the id of the last transaction that
+# inserted, updated or deleted the profile. Every transaction id below the
+# `xmin` of a snapshot has finished, so rows under it are final and can be
+# read once, whatever the clocks of the writers said.
+CHANGE_SQL = """
+    CREATE TABLE content.profile_change (
+        profile_id uuid PRIMARY KEY,
+        xid xid8 NOT NULL
+    );
+
+    CREATE INDEX profile_change_xid_idx
+    ON content.profile_change (xid, profile_id);
+
+    CREATE FUNCTION content.profile_change_record()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO content.profile_change (profile_id, xid)
+            SELECT o.uuid, pg_current_xact_id() FROM previous o
+            ON CONFLICT (profile_id) DO UPDATE SET xid = excluded.xid;
+        ELSE
+            INSERT INTO content.profile_change (profile_id, xid)
+            SELECT c.uuid, pg_current_xact_id() FROM changed c
+            ON CONFLICT (profile_id) DO UPDATE SET xid = excluded.xid;
+        END IF;
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE TRIGGER profile_change_inserted
+    AFTER INSERT ON content.user_profile
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.profile_change_record();
+
+    CREATE TRIGGER profile_change_updated
+    AFTER UPDATE ON content.user_profile
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION content.profile_change_record();
+
+    CREATE TRIGGER profile_change_deleted
+    AFTER DELETE ON content.user_profile
+    REFERENCING OLD TABLE AS previous
+    FOR EACH STATEMENT EXECUTE FUNCTION content.profile_change_record();
+
+    INSERT INTO content.profile_change (profile_id, xid)
+    SELECT uuid, pg_current_xact_id() FROM content.user_profile;
+"""
+
+DROP_CHANGE_SQL = """
+    DROP TRIGGER profile_change_deleted ON content.user_profile;
+    DROP TRIGGER profile_change_updated ON content.user_profile;
+    DROP TRIGGER profile_change_inserted ON content.user_profile;
+    DROP FUNCTION content.profile_change_record();
+    DROP TABLE content.profile_change;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0011_profile_history'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CHANGE_SQL, DROP_CHANGE_SQL),
+    ]
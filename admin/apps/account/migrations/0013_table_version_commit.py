@@ -0,0 +1,103 @@
+from django.db import migrations
+
+TABLES = ("directory_entry", "org_unit", "user_department", "user_status")
+
+# The version used to be bumped by the statement itself: the row of the
+# table stayed locked until the writer committed, so concurrent writers of
+# a table queued behind each other, and `now()` stamped the change with
+# the start of its transaction, possibly long before readers could see it.
+#
+# A statement now only marks its table as changed in the transaction. The
+# bump is a deferred constraint trigger, it runs while the transaction
+# commits, once per table, and takes the time at that moment. The row is
+# locked from there to the end of the commit. Constraint triggers are per
+# row, a row event is queued for every row written, the bump skips all but
+# the first. `TRUNCATE` has no row triggers and still bumps at once, it
+# locks the whole table anyway.
+TRIGGER_SQL = """
+    CREATE TRIGGER table_version_marked
+    BEFORE INSERT OR UPDATE OR DELETE ON content.{table}
+    FOR EACH STATEMENT EXECUTE FUNCTION content.table_version_mark();
+
+    CREATE CONSTRAINT TRIGGER table_version_bumped
+    AFTER INSERT OR UPDATE OR DELETE ON content.{table}
+    DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION content.table_version_bump();
+
+    CREATE TRIGGER table_version_truncated
+    AFTER TRUNCATE ON content.{table}
+    FOR EACH STATEMENT EXECUTE FUNCTION content.table_version_bump();
+"""
+
+VERSION_SQL = "".join(
+    f"DROP TRIGGER table_version_bumped ON content.{table};\n"
+    for table in TABLES
+) + """
+    CREATE FUNCTION content.table_version_mark()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM set_config(
+            'table_version.' || TG_TABLE_NAME, 'changed', true
+        );
+        RETURN NULL;
+    END;
+    $$;
+
+    CREATE OR REPLACE FUNCTION content.table_version_bump()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_LEVEL = 'ROW' AND current_setting(
+            'table_version.' || TG_TABLE_NAME, true
+        ) IS DISTINCT FROM 'changed' THEN
+            RETURN NULL;
+        END IF;
+        PERFORM set_config(
+            'table_version.' || TG_TABLE_NAME, 'bumped', true
+        );
+        INSERT INTO content.table_version AS v (name, version, updated_time)
+        VALUES (TG_TABLE_NAME, 1, clock_timestamp())
+        ON CONFLICT (name) DO UPDATE
+        SET version = v.version + 1,
+            updated_time = greatest(v.updated_time, clock_timestamp());
+        RETURN NULL;
+    END;
+    $$;
+""" + "".join(TRIGGER_SQL.format(table=table) for table in TABLES)
+
+STATEMENT_TRIGGER_SQL = """
+    CREATE TRIGGER table_version_bumped
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON content.{table}
+    FOR EACH STATEMENT EXECUTE FUNCTION content.table_version_bump();
+"""
+
+DROP_VERSION_SQL = "".join(
+    f"DROP TRIGGER table_version_marked ON content.{table};\n"
+    f"DROP TRIGGER table_version_bumped ON content.{table};\n"
+    f"DROP TRIGGER table_version_truncated ON content.{table};\n"
+    for table in TABLES
+) + """
+    DROP FUNCTION content.table_version_mark();
+
+    CREATE OR REPLACE FUNCTION content.table_version_bump()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        INSERT INTO content.table_version AS v (name, version, updated_time)
+        VALUES (TG_TABLE_NAME, 1, now())
+        ON CONFLICT (name) DO UPDATE
+        SET version = v.version + 1,
+            updated_time = greatest(v.updated_time, now());
+        RETURN NULL;
+    END;
+    $$;
+""" + "".join(STATEMENT_TRIGGER_SQL.format(table=table) for table in TABLES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0012_profile_change'),
+    ]
+
+    operations = [
+        migrations.RunSQL(VERSION_SQL, DROP_VERSION_SQL),
+    ]
@@ -1,20 +1,55 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.contrib.auth.models import User
-from django.db.models import CharField
-from django.db.models.signals import post_save
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from phonenumber_field.modelfields import PhoneNumber, PhoneNumberField
+from phonenumbers import NumberParseException
+from apps.account.avatars import avatar_storage, schedule_thumbnails
+from apps.account.cache import LookupCache
+import json
 import os
 import uuid
+from collections import Counter
+from typing import Optional
+
+
+PHONE_FIELDS = ("mobile_phone", "phone")
+
+
+def format_phone(number) -> tuple[Optional[str], Optional[str]]:
+    """
+        E.164 and national forms of a phone number, None for empty or
+        invalid numbers. Numbers without a country code are read in
+        `PHONE_NUMBERS_REGION`.
+    """
+    if not number:
+        return None, None
+    if not isinstance(number, PhoneNumber) or not number.is_valid():
+        try:
+            number = PhoneNumber.from_string(
+                phone_number=getattr(number, "raw_input", None) or str(number),
+                region=settings.PHONE_NUMBERS_REGION,
+            )
+        except NumberParseException:
+            return None, None
+    if not number.is_valid():
+        return None, None
+    return number.as_e164, number.as_national
 
 
 def generate_avatar_path(instance, filename: str) -> str:
+    """
+        Only the extension is kept, `avatar_storage` names the file by the
+        hash of its content.
+    """
     ext = filename.split(".")[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    avatar_dir = f"users/{instance.user.username}/avatars"
-    return os.path.join(avatar_dir, filename)
+    return os.path.join("avatars", f"{uuid.uuid4()}.{ext}")
 
 
 class UserStatus(models.Model):
@@ -49,6 +84,213 @@ class UserStatus(models.Model):
         return self.title
 
 
+ORG_LEVELS = ("block", "department", "group", "branch")
+
+
+class OrgUnit(models.Model):
+    """
+        Node of the company structure built from the block, department,
+        group and branch of :model:`account.UserDepartment`. `path` is the
+        materialized path of node ids, `/<root id>/.../<id>/`, so a subtree
+        is a prefix match on `org_unit_path_idx`. `headcount` is the number
+        of profiles in the whole subtree, kept up to date as profiles move.
+    """
+    class Meta:
+        db_table = "content\".\"org_unit"
+        verbose_name = _("Structure unit")
+        verbose_name_plural = _("Company structure")
+        ordering = ["path"]
+        indexes = [
+            models.Index(
+                fields=["path"],
+                name="org_unit_path_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["parent", "level", "name"],
+                name="org_unit_node_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["level", "name"],
+                condition=Q(parent__isnull=True),
+                name="org_unit_root_uniq",
+            ),
+        ]
+
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="children",
+        verbose_name=_("Parent unit"),
+    )
+    level = models.CharField(
+        max_length=20,
+        choices=[
+            ("block", _("Block")),
+            ("department", _("Departament")),
+            ("group", _("Group")),
+            ("branch", _("Branch")),
+        ],
+        verbose_name=_("Level"),
+    )
+    name = models.CharField(
+        max_length=250,
+        verbose_name=_("Name"),
+    )
+    path = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        verbose_name=_("Path"),
+    )
+    headcount = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Headcount"),
+    )
+
+    def __str__(self) -> str:
+        return self.name
+
+    @classmethod
+    def for_department(cls, department) -> Optional["OrgUnit"]:
+        """
+            Leaf node of the department, missing nodes are created. None if
+            no level is filled.
+        """
+        unit = None
+        for level in ORG_LEVELS:
+            name = (getattr(department, level) or "").strip()
+            if not name:
+                continue
+            parent_path = unit.path if unit else "/"
+            unit, created = cls.objects.get_or_create(
+                parent=unit, level=level, name=name,
+            )
+            if created:
+                unit.path = f"{parent_path}{unit.pk}/"
+                unit.save(update_fields=["path"])
+        return unit
+
+    @classmethod
+    def move_profiles(cls, from_department: Optional[int],
+                      to_department: Optional[int], count: int = 1) -> None:
+        """
+            Update the headcounts after `count` profiles left one department
+            for another, None stands for no department. Common ancestors of
+            both departments keep their counts.
+        """
+        paths = dict(
+            UserDepartment.objects.filter(
+                pk__in=[from_department, to_department],
+                org_unit__isnull=False,
+            ).values_list("pk", "org_unit__path"),
+        )
+        cls.move_headcount(
+            paths.get(from_department), paths.get(to_department), count,
+        )
+
+    @classmethod
+    def move_headcount(cls, from_path: Optional[str],
+                       to_path: Optional[str], count: int) -> None:
+        left = set(cls.path_ids(from_path))
+        joined = set(cls.path_ids(to_path))
+        for ids, delta in ((left - joined, -count), (joined - left, count)):
+            if ids:
+                cls.objects.filter(pk__in=ids).update(
+                    headcount=F("headcount") + delta,
+                )
+
+    @classmethod
+    def move_departments(cls, counts: dict,
+                         to_department: Optional[int]) -> None:
+        """
+            Update the headcounts after profiles of several departments
+            moved to one, `counts` maps a department to the number of its
+            profiles that moved. Every unit is changed by one `UPDATE`.
+        """
+        paths = dict(
+            UserDepartment.objects.filter(
+                pk__in=[*counts, to_department],
+                org_unit__isnull=False,
+            ).values_list("pk", "org_unit__path"),
+        )
+        deltas = Counter()
+        for department, count in counts.items():
+            if department == to_department:
+                continue
+            for pk in cls.path_ids(paths.get(department)):
+                deltas[pk] -= count
+            for pk in cls.path_ids(paths.get(to_department)):
+                deltas[pk] += count
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+        if deltas:
+            cls.objects.filter(pk__in=deltas).update(
+                headcount=F("headcount") + Case(
+                    *(When(pk=pk, then=Value(delta))
+                      for pk, delta in deltas.items()),
+                    output_field=models.IntegerField(),
+                ),
+            )
+
+    @staticmethod
+    def path_ids(path: Optional[str]) -> list:
+        if not path:
+            return []
+        return [int(pk) for pk in path.strip("/").split("/")]
+
+    @classmethod
+    def recount(cls) -> None:
+        """
+            Count the profiles of every subtree from scratch.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(RECOUNT_SQL)
+
+    @classmethod
+    def prune(cls, path: Optional[str] = None) -> int:
+        """
+            Delete the units with no department in their subtree, within
+            the tree `path` belongs to or everywhere. Their headcount is 0,
+            the remaining units keep theirs. Returns the number of deleted
+            units.
+        """
+        ids = cls.path_ids(path)
+        with connection.cursor() as cursor:
+            cursor.execute(PRUNE_SQL, [f"/{ids[0]}/%" if ids else "/%"])
+            return cursor.rowcount
+
+
+RECOUNT_SQL = """
+    UPDATE content.org_unit u
+    SET headcount = counts.headcount
+    FROM (
+        SELECT a.id, count(p.uuid) AS headcount
+        FROM content.org_unit a
+        LEFT JOIN content.org_unit l ON l.path LIKE a.path || '%'
+        LEFT JOIN content.user_department d ON d.org_unit_id = l.id
+        LEFT JOIN content.user_profile p ON p.department_id = d.id
+        GROUP BY a.id
+    ) counts
+    WHERE counts.id = u.id
+"""
+
+PRUNE_SQL = """
+    DELETE FROM content.org_unit u
+    WHERE u.path LIKE %s
+      AND NOT EXISTS (
+          SELECT 1
+          FROM content.org_unit l
+          JOIN content.user_department d ON d.org_unit_id = l.id
+          WHERE l.path LIKE u.path || '%%'
+      )
+"""
+
+
 class UserDepartment(models.Model):
     """
         Data model of departments in the company. Filled in automatically when
@@ -101,16 +343,57 @@ class UserDepartment(models.Model):
         verbose_name=_("Description"),
         help_text=_("Description name in the company"),
     )
+    org_unit = models.ForeignKey(
+        OrgUnit,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="departments",
+        verbose_name=_("Structure unit"),
+    )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+            Place the department in the structure tree. When it moves, its
+            profiles are moved in the headcounts as well, and the units it
+            leaves empty are deleted.
+        """
+        with transaction.atomic():
+            previous = None
+            if self.pk is not None:
+                previous = UserDepartment.objects.filter(
+                    pk=self.pk,
+                ).values_list("org_unit__path", flat=True).first()
+            self.org_unit = OrgUnit.for_department(self)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = [
+                    *kwargs["update_fields"], "org_unit",
+                ]
+            super().save(*args, **kwargs)
+            current = self.org_unit.path if self.org_unit else None
+            if previous != current:
+                count = UserProfile.objects.filter(department=self).count()
+                if count:
+                    OrgUnit.move_headcount(previous, current, count)
+                if previous:
+                    OrgUnit.prune(previous)
+
+
+TRIGRAM_FIELDS = ("last_name", "first_name", "middle_name", "post")
+
 
 class UserProfile(models.Model):
     """
         The user profile data model. Profile is created automatically when
         creating a new user in the system. Communication with the User model
-        :model: `auth.User`.
+        :model: `auth.User`. The table also has a `search_vector` column
+        generated by the database, see `apps.account.search`. Phone numbers
+        are stored parsed in E.164 and national format on save, so they are
+        shown and looked up without running libphonenumber again.
     """
     class Meta:
         db_table = "content\".\"user_profile"
@@ -121,6 +404,36 @@ class UserProfile(models.Model):
             ("user", "last_name"),
             ("user", "uuid"),
         )
+        indexes = [
+            models.Index(
+                Coalesce("last_name", Value("")),
+                Coalesce("first_name", Value("")),
+                F("uuid"),
+                name="user_profile_keyset_idx",
+            ),
+            models.Index(
+                fields=["updated_time", "uuid"],
+                name="user_profile_updated_idx",
+            ),
+            *(
+                GinIndex(
+                    fields=[field],
+                    name=f"user_profile_{field}_trgm",
+                    opclasses=["gin_trgm_ops"],
+                )
+                for field in TRIGRAM_FIELDS
+            ),
+            models.Index(
+                fields=["mobile_phone_e164"],
+                name="user_profile_mobile_e164_idx",
+                condition=Q(mobile_phone_e164__isnull=False),
+            ),
+            models.Index(
+                fields=["phone_e164"],
+                name="user_profile_phone_e164_idx",
+                condition=Q(phone_e164__isnull=False),
+            ),
+        ]
         get_latest_by = "created_time"
 
     user = models.OneToOneField(
@@ -149,6 +462,14 @@ class UserProfile(models.Model):
     avatar = models.ImageField(
         default="system/user-dummy-img.jpg",
         upload_to=generate_avatar_path,
+        storage=avatar_storage,
+    )
+    avatar_thumbnails = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_("Avatar thumbnails"),
+        help_text=_("Filled in automatically by the system"),
     )
     last_name = models.CharField(
         max_length=50,
@@ -183,6 +504,34 @@ class UserProfile(models.Model):
         verbose_name=_("User phone number"),
         help_text=_("Any phone number"),
     )
+    mobile_phone_e164 = models.CharField(
+        max_length=20,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Mobile phone in E.164"),
+    )
+    mobile_phone_national = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Mobile phone in national format"),
+    )
+    phone_e164 = models.CharField(
+        max_length=20,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Phone in E.164"),
+    )
+    phone_national = models.CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Phone in national format"),
+    )
     description = models.TextField(
         null=True,
         blank=True,
@@ -230,6 +579,89 @@ class UserProfile(models.Model):
         verbose_name=_("User info updated time"),
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        derived = self.format_phones()
+        avatar_changed = self.avatar_changed()
+        if avatar_changed:
+            self.avatar_thumbnails = {}
+            derived.append("avatar_thumbnails")
+        if derived and kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = [*kwargs["update_fields"], *derived]
+        previous_department = self.previous_department()
+        if previous_department == self.department_id:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                OrgUnit.move_profiles(previous_department, self.department_id)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+        }
+        if avatar_changed:
+            schedule_thumbnails(self)
+
+    def format_phones(self) -> list:
+        """
+            Fill the E.164 and national forms of both phone numbers and
+            return the names of the fields that changed.
+        """
+        changed = []
+        for field in PHONE_FIELDS:
+            e164, national = format_phone(getattr(self, field))
+            for name, value in (
+                (f"{field}_e164", e164),
+                (f"{field}_national", national),
+            ):
+                if getattr(self, name) != value:
+                    setattr(self, name, value)
+                    changed.append(name)
+        return changed
+
+    def previous_department(self) -> Optional[int]:
+        """
+            Department the profile is saved in now, as far as the structure
+            headcounts know it.
+        """
+        if self._state.adding:
+            return None
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None or "department_id" not in loaded:
+            return self.department_id
+        return loaded["department_id"]
+
+    def avatar_changed(self) -> bool:
+        """
+            Whether a new avatar is about to be saved, the default one is
+            never resized.
+        """
+        name = self.avatar.name
+        if not name or name == self._meta.get_field("avatar").default:
+            return False
+        loaded = getattr(self, "_loaded_values", None)
+        return loaded is None or loaded.get("avatar") != name
+
+    def changed_fields(self) -> Optional[list]:
+        """
+            Names of the fields changed since the profile was loaded or
+            saved, None if it is unknown.
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return None
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in loaded
+            and getattr(self, field.attname) != loaded[field.attname]
+        ]
+
     def shot_name(self) -> str:
         return f"{self.last_name} {self.first_name}"
 
@@ -246,21 +678,275 @@ class UserProfile(models.Model):
         return f"{self.last_name} {name}.{patronymic}."
 
     def show_mobile_phone(self) -> str:
-        return PhoneNumber.from_string(
-            phone_number=self.mobile_phone,
-            region=settings.PHONE_NUMBERS_REGION,
-        ).as_e164
+        return self.mobile_phone_e164 or str(self.mobile_phone or "")
 
     def show_phone(self) -> str:
-        return PhoneNumber.from_string(
-            phone_number=self.phone,
-            region=settings.PHONE_NUMBERS_REGION,
-        ).as_e164
+        return self.phone_e164 or str(self.phone or "")
 
     def __str__(self) -> str:
         return self.full_name()
 
 
+class DirectoryEntry(models.Model):
+    """
+        Flat, read-only copy of a profile with its user, status and
+        department, the directory read model. Rows are written by the
+        statement triggers of migration 0008 on `user_profile`, `auth_user`,
+        `user_status` and `user_department`, so bulk inserts and queryset
+        updates are reflected as well. Names and phones are stored
+        formatted, a directory page is a scan of `directory_entry_keyset_idx`
+        without joins.
+    """
+    class Meta:
+        db_table = "content\".\"directory_entry"
+        verbose_name = _("Directory entry")
+        verbose_name_plural = _("Directory")
+        ordering = ["last_name", "first_name"]
+        indexes = [
+            models.Index(
+                Coalesce("last_name", Value("")),
+                Coalesce("first_name", Value("")),
+                F("uuid"),
+                name="directory_entry_keyset_idx",
+            ),
+            models.Index(
+                fields=["org_unit_path"],
+                name="directory_entry_org_unit_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+            models.Index(
+                fields=["mobile_phone_e164"],
+                name="directory_entry_mobile_idx",
+                condition=Q(mobile_phone_e164__isnull=False),
+            ),
+            models.Index(
+                fields=["phone_e164"],
+                name="directory_entry_phone_idx",
+                condition=Q(phone_e164__isnull=False),
+            ),
+        ]
+
+    uuid = models.UUIDField(primary_key=True, verbose_name=_("User UUID"))
+    user_id = models.IntegerField(unique=True)
+    username = models.CharField(max_length=150, verbose_name=_("Username"))
+    last_name = models.CharField(
+        max_length=50,
+        null=True,
+        verbose_name=_("User last name"),
+    )
+    first_name = models.CharField(
+        max_length=50,
+        null=True,
+        verbose_name=_("User first name"),
+    )
+    middle_name = models.CharField(
+        max_length=50,
+        null=True,
+        verbose_name=_("User middle name"),
+    )
+    full_name = models.CharField(max_length=152, verbose_name=_("Full name"))
+    abbreviation = models.CharField(
+        max_length=56,
+        verbose_name=_("Abbreviation"),
+    )
+    post = models.CharField(
+        max_length=150,
+        null=True,
+        verbose_name=_("User post"),
+    )
+    mobile_phone_e164 = models.CharField(max_length=20, null=True)
+    mobile_phone_national = models.CharField(
+        max_length=32,
+        null=True,
+        verbose_name=_("User mobile phone number"),
+    )
+    phone_e164 = models.CharField(max_length=20, null=True)
+    phone_national = models.CharField(
+        max_length=32,
+        null=True,
+        verbose_name=_("User phone number"),
+    )
+    avatar = models.CharField(max_length=100)
+    avatar_thumbnails = models.JSONField(default=dict)
+    status_id = models.BigIntegerField(null=True, db_index=True)
+    status_title = models.CharField(
+        max_length=50,
+        null=True,
+        verbose_name=_("The user's status in the system"),
+    )
+    department_id = models.BigIntegerField(null=True, db_index=True)
+    department_title = models.CharField(
+        max_length=150,
+        null=True,
+        verbose_name=_("User department in the company"),
+    )
+    department_path = models.CharField(
+        max_length=1003,
+        null=True,
+        verbose_name=_("Company structure"),
+    )
+    org_unit_path = models.CharField(max_length=100, null=True)
+    updated_time = models.DateTimeField(
+        verbose_name=_("User info updated time"),
+    )
+
+    def __str__(self) -> str:
+        return self.full_name
+
+
+class TableVersion(models.Model):
+    """
+        Change counter of a table the API serves. Triggers of migration
+        0013 bump `version` and `updated_time` when a transaction writing
+        to `directory_entry`, `org_unit`, `user_department` or
+        `user_status` commits, the API builds its `ETag` and
+        `Last-Modified` headers from them.
+    """
+    class Meta:
+        db_table = "content\".\"table_version"
+        verbose_name = _("Table version")
+        verbose_name_plural = _("Table versions")
+
+    name = models.CharField(max_length=63, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    updated_time = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.name} {self.version}"
+
+
+class ProfileHistory(models.Model):
+    """
+        Append-only history of :model:`account.UserProfile`, written by the
+        statement triggers of migration 0011 in the same statement as the
+        change, queryset updates included. A creation stores the filled
+        fields, a change only the fields that changed, in `changes`. The
+        table is partitioned by month of `changed_time`, partitions are
+        added ahead by `prepare_service`.
+    """
+    class Meta:
+        db_table = "content\".\"profile_history"
+        managed = False
+        verbose_name = _("Profile history entry")
+        verbose_name_plural = _("Profile history")
+        ordering = ["changed_time", "id"]
+
+    id = models.BigAutoField(primary_key=True)
+    profile_id = models.UUIDField(verbose_name=_("User UUID"))
+    changed_time = models.DateTimeField(verbose_name=_("Changed time"))
+    operation = models.CharField(
+        max_length=1,
+        choices=[
+            ("I", _("Created")),
+            ("U", _("Changed")),
+            ("D", _("Deleted")),
+        ],
+        verbose_name=_("Operation"),
+    )
+    changes = models.JSONField(verbose_name=_("Changed fields"))
+
+    def __str__(self) -> str:
+        return f"{self.profile_id} {self.changed_time}"
+
+    @staticmethod
+    def profile_as_of(profile_id, at) -> Optional[dict]:
+        """
+            Fields of the profile at `at`, None if it did not exist then.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT content.profile_as_of(%s, %s)", [profile_id, at],
+            )
+            value = cursor.fetchone()[0]
+        return json.loads(value) if isinstance(value, str) else value
+
+    @staticmethod
+    def department_as_of(department_id: int, at) -> list:
+        """
+            UUIDs of the profiles that were in the department at `at`.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT profile_id "
+                "FROM content.department_profiles_as_of(%s, %s)",
+                [department_id, at],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def add_partitions() -> None:
+        """
+            Monthly partitions up to three months ahead.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT content.profile_history_add_partitions(current_date)",
+            )
+
+
+status_lookup = LookupCache(
+    "user_status",
+    UserStatus,
+    ("id", "status", "title", "description"),
+    label="title",
+)
+department_lookup = LookupCache(
+    "user_department",
+    UserDepartment,
+    ("id", "title", "block", "department", "group", "branch", "description"),
+    label="title",
+)
+
+
+@receiver(post_save, sender=UserStatus)
+@receiver(post_delete, sender=UserStatus)
+def invalidate_status_lookup(sender, **kwargs):
+    status_lookup.invalidate()
+
+
+@receiver(post_save, sender=UserDepartment)
+@receiver(post_delete, sender=UserDepartment)
+def invalidate_department_lookup(sender, **kwargs):
+    department_lookup.invalidate()
+
+
+@receiver(post_save, sender=UserStatus)
+def touch_status_profiles(sender, instance, created, **kwargs):
+    """
+        Profiles embed their status in the search index, bumping
+        `updated_time` lets the ETL pick the change up.
+    """
+    if not created:
+        UserProfile.objects.filter(status=instance).update(
+            updated_time=timezone.now(),
+        )
+
+
+@receiver(post_save, sender=UserDepartment)
+def touch_department_profiles(sender, instance, created, **kwargs):
+    if not created:
+        UserProfile.objects.filter(department=instance).update(
+            updated_time=timezone.now(),
+        )
+
+
+@receiver(post_delete, sender=UserProfile)
+def release_profile_headcount(sender, instance, **kwargs):
+    if instance.department_id is not None:
+        OrgUnit.move_profiles(instance.department_id, None)
+
+
+@receiver(pre_delete, sender=UserDepartment)
+def release_department_headcount(sender, instance, **kwargs):
+    """
+        Deleting a department sets its profiles' department to NULL with a
+        single UPDATE, their headcount is taken off here.
+    """
+    count = UserProfile.objects.filter(department=instance).count()
+    if count and instance.org_unit_id is not None:
+        OrgUnit.move_headcount(instance.org_unit.path, None, count)
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
@@ -268,5 +954,17 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.user_profile.save()
+def save_user_profile(sender, instance, created, **kwargs):
+    """
+        Save the profile along with its user only if it was loaded and
+        changed, and only the changed fields. Saving `last_login` on login
+        does not touch `user_profile` anymore.
+    """
+    if created or not User.user_profile.is_cached(instance):
+        return
+    profile = instance.user_profile
+    changed = profile.changed_fields()
+    if changed is None:
+        profile.save()
+    elif changed:
+        profile.save(update_fields=[*changed, "updated_time"])
@@ -0,0 +1,214 @@
+import base64
+import json
+from uuid import UUID
+from typing import Optional
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import InvalidPage
+from django.db.models import BooleanField, F, Func, QuerySet, Value
+from django.db.models.functions import Coalesce
+
+CURSOR_VAR = "cursor"
+CURSOR_NEXT = "n"
+CURSOR_PREVIOUS = "p"
+
+KEYSET_EXPRESSIONS = (
+    Coalesce("last_name", Value("")),
+    Coalesce("first_name", Value("")),
+    F("uuid"),
+)
+KEYSET_ORDERING = ("keyset_last_name", "keyset_first_name", "uuid")
+
+
+def encode_cursor(direction: str, last_name: str, first_name: str,
+                  uuid) -> str:
+    payload = json.dumps(
+        [direction, last_name, first_name, str(uuid)],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+        Cursors come from the query string, anything that does not decode
+        to a direction, two names and a UUID is an `InvalidPage` rather
+        than a query Postgres rejects.
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        direction, last_name, first_name, uuid = json.loads(
+            base64.urlsafe_b64decode(cursor + padding),
+        )
+        key = (last_name, first_name, UUID(uuid))
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidPage("Invalid cursor")
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or not all(
+        isinstance(name, str) for name in (last_name, first_name)
+    ):
+        raise InvalidPage("Invalid cursor")
+    return direction, key
+
+
+class RowCompare(Func):
+    """
+        Row value comparison `(a, b, c) > (x, y, z)`, so that Postgres can
+        walk the keyset index instead of expanding an OR chain.
+    """
+    output_field = BooleanField()
+
+    def __init__(self, columns, operator: str, values):
+        self.operator = operator
+        self.width = len(columns)
+        super().__init__(*columns, *(Value(value) for value in values))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql_parts = []
+        sql_params = []
+        for expression in self.source_expressions:
+            sql, params = compiler.compile(expression)
+            sql_parts.append(sql)
+            sql_params.extend(params)
+        left = ", ".join(sql_parts[:self.width])
+        right = ", ".join(sql_parts[self.width:])
+        return f"({left}) {self.operator} ({right})", sql_params
+
+
+def keyset_queryset(queryset: QuerySet) -> QuerySet:
+    last_name, first_name, _ = KEYSET_EXPRESSIONS
+    return queryset.alias(
+        keyset_last_name=last_name,
+        keyset_first_name=first_name,
+    )
+
+
+def keyset_key(obj) -> tuple:
+    return obj.last_name or "", obj.first_name or "", obj.uuid
+
+
+class KeysetPage:
+    """
+        One page of a keyset paginated queryset. The object list stays a
+        queryset, so admin formsets can be built on top of it.
+    """
+    def __init__(self, object_list: QuerySet, has_next: bool,
+                 has_previous: bool):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        rows = list(object_list)
+        self.next_cursor = None
+        self.previous_cursor = None
+        if rows and has_next:
+            self.next_cursor = encode_cursor(
+                CURSOR_NEXT, *keyset_key(rows[-1]),
+            )
+        if rows and has_previous:
+            self.previous_cursor = encode_cursor(
+                CURSOR_PREVIOUS, *keyset_key(rows[0]),
+            )
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+
+class KeysetPaginator:
+    """
+        Cursor paginator for user profiles ordered by
+        `(last_name, first_name, uuid)`. Every page is a range scan of the
+        `user_profile_keyset_idx` index, so the cost does not depend on how
+        deep the page is.
+    """
+    def __init__(self, queryset: QuerySet, per_page: int):
+        self.queryset = keyset_queryset(queryset)
+        self.per_page = per_page
+
+    def _compare(self, key: tuple, operator: str) -> RowCompare:
+        return RowCompare(KEYSET_EXPRESSIONS, operator, key)
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        forward = self.queryset.order_by(*KEYSET_ORDERING)
+        if not cursor:
+            object_list = forward[:self.per_page]
+            rows = list(object_list)
+            has_next = bool(rows) and forward.filter(
+                self._compare(keyset_key(rows[-1]), ">"),
+            ).exists()
+            return KeysetPage(object_list, has_next, False)
+
+        direction, key = decode_cursor(cursor)
+        if direction == CURSOR_NEXT:
+            object_list = forward.filter(self._compare(key, ">"))[
+                :self.per_page
+            ]
+            rows = list(object_list)
+            has_next = bool(rows) and forward.filter(
+                self._compare(keyset_key(rows[-1]), ">"),
+            ).exists()
+            return KeysetPage(object_list, has_next, True)
+
+        backward = self.queryset.order_by(
+            *(f"-{field}" for field in KEYSET_ORDERING),
+        ).filter(self._compare(key, "<"))
+        object_list = forward.filter(
+            pk__in=backward[:self.per_page].values("pk"),
+        )
+        rows = list(object_list)
+        if len(rows) < self.per_page:
+            return self.page()
+        has_previous = forward.filter(
+            self._compare(keyset_key(rows[0]), "<"),
+        ).exists()
+        return KeysetPage(object_list, True, has_previous)
+
+
+class KeysetChangeList(ChangeList):
+    """
+        Admin changelist paginated with `KeysetPaginator` while the default
+        ordering is used. Sorting by a column falls back to the regular
+        page number pagination.
+    """
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        cursor = self.params.pop(CURSOR_VAR, None)
+        self.keyset_page = None
+        if ORDER_VAR in self.params or self.show_all:
+            return super().get_results(request)
+
+        paginator = KeysetPaginator(self.queryset, self.list_per_page)
+        try:
+            page = paginator.page(cursor)
+        except InvalidPage:
+            raise IncorrectLookupParameters
+
+        result_count = self.queryset.count()
+        if self.model_admin.show_full_result_count:
+            full_result_count = self.root_queryset.count()
+        else:
+            full_result_count = None
+
+        self.result_count = result_count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.show_admin_actions = (
+            not self.show_full_result_count or bool(full_result_count)
+        )
+        self.full_result_count = full_result_count
+        self.result_list = page.object_list
+        self.can_show_all = result_count <= self.list_max_show_all
+        self.multi_page = result_count > self.list_per_page
+        self.paginator = paginator
+        self.keyset_page = page
+        self.next_page_url = page.next_cursor and self.get_query_string(
+            {CURSOR_VAR: page.next_cursor},
+        )
+        self.previous_page_url = page.previous_cursor and (
+            self.get_query_string({CURSOR_VAR: page.previous_cursor})
+        )
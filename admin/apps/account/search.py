@@ -0,0 +1,184 @@
+import logging
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from apps.account.models import (
+    TRIGRAM_FIELDS,
+    UserDepartment,
+    UserProfile,
+    UserStatus,
+    format_phone,
+)
+from apps.account.cache import lookup_for_model
+
+if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
+
+logger = logging.getLogger(__name__)
+
+PHONE_PATTERN = re.compile(r"^\+?[\d\s().-]{5,}$")
+SEARCH_FIELDS = [
+    "last_name^3",
+    "first_name^2",
+    "middle_name",
+    "full_name",
+    "post",
+    "department.title.text",
+]
+
+
+@lru_cache()
+def get_elastic() -> "Elasticsearch":
+    """
+        The client is imported on first use, so that the admin does not
+        load it with its dependencies when the database search is used.
+    """
+    from elasticsearch import Elasticsearch
+
+    return Elasticsearch(
+        hosts=[f"http://{settings.ELASTIC_HOST}:{settings.ELASTIC_PORT}"],
+        timeout=settings.ELASTIC_TIMEOUT,
+    )
+
+
+def search_profile_ids(term: str) -> Optional[list]:
+    """
+        UUIDs of profiles matching `term` in the profiles index, the same
+        prefix and fuzzy query as `/api/v1/profiles/search`. Returns None
+        when Elasticsearch can not answer.
+    """
+    body = {
+        "query": {
+            "bool": {
+                "should": [
+                    {
+                        "multi_match": {
+                            "query": term,
+                            "fields": SEARCH_FIELDS,
+                            "operator": "and",
+                        },
+                    },
+                    {
+                        "multi_match": {
+                            "query": term,
+                            "fields": SEARCH_FIELDS,
+                            "fuzziness": "AUTO",
+                            "prefix_length": 1,
+                        },
+                    },
+                ],
+                "minimum_should_match": 1,
+            },
+        },
+        "_source": False,
+        "size": settings.PROFILE_SEARCH_LIMIT,
+    }
+    from elasticsearch import TransportError
+
+    try:
+        response = get_elastic().search(
+            index=settings.ELASTIC_PROFILES_INDEX,
+            body=body,
+        )
+    except TransportError as error:
+        logger.warning("Profile search unavailable: %s", error)
+        return None
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+
+def escape_like(value: str) -> str:
+    return re.sub(r"([\\%_])", r"\\\1", value)
+
+
+def prefix_tsquery(word: str) -> str:
+    return " & ".join(f"{part}:*" for part in re.findall(r"\w+", word))
+
+
+def lookup_ids(model, word: str) -> list:
+    word = word.casefold()
+    return [
+        row["id"]
+        for row in lookup_for_model(model).all()
+        if word in (row["title"] or "").casefold()
+    ]
+
+
+def word_condition(word: str) -> Q:
+    """
+        A word matches the generated `search_vector` column by prefix, any
+        of the trigram indexed columns as a substring, or the title of the
+        status or the department. Postgres combines the GIN indexes with a
+        bitmap OR, titles are matched in the lookup cache.
+    """
+    table = connection.ops.quote_name(UserProfile._meta.db_table)
+    clauses = []
+    params = []
+    tsquery = prefix_tsquery(word)
+    if tsquery:
+        clauses.append(
+            f"{table}.search_vector @@ to_tsquery('simple', %s)",
+        )
+        params.append(tsquery)
+    for field in TRIGRAM_FIELDS:
+        clauses.append(f"{table}.{field} ILIKE %s")
+        params.append(f"%{escape_like(word)}%")
+    condition = Q(RawSQL(
+        f"({' OR '.join(clauses)})",
+        params,
+        output_field=BooleanField(),
+    ))
+    status_ids = lookup_ids(UserStatus, word)
+    if status_ids:
+        condition |= Q(status_id__in=status_ids)
+    department_ids = lookup_ids(UserDepartment, word)
+    if department_ids:
+        condition |= Q(department_id__in=department_ids)
+    return condition
+
+
+def phone_condition(term: str) -> Optional[Q]:
+    """
+        Equality on the indexed E.164 columns when the term is a valid phone
+        number in any format, None otherwise.
+    """
+    if not PHONE_PATTERN.match(term.strip()):
+        return None
+    e164, _ = format_phone(term.strip())
+    if e164 is None:
+        return None
+    return Q(mobile_phone_e164=e164) | Q(phone_e164=e164)
+
+
+def search_profiles(queryset: QuerySet, term: str) -> QuerySet:
+    """
+        Database profile search backed by the indexes of migration 0004.
+        Every word of the term has to match.
+    """
+    for word in term.split():
+        queryset = queryset.filter(word_condition(word))
+    return queryset
+
+
+def find_profiles(queryset: QuerySet, term: str) -> tuple[QuerySet, bool]:
+    """
+        Phone numbers are looked up on the E.164 indexes. Other terms go to
+        the profiles index when `PROFILE_SEARCH_ENGINE` is "elasticsearch".
+        Otherwise, or if the index can not answer, the database is searched
+        with the trigram and full-text indexes. The flag is set when the
+        index returned `PROFILE_SEARCH_LIMIT` profiles, more may match.
+    """
+    phone = phone_condition(term)
+    if phone is not None:
+        return queryset.filter(phone), False
+    if settings.PROFILE_SEARCH_ENGINE == "elasticsearch":
+        profile_ids = search_profile_ids(term)
+        if profile_ids is not None:
+            limited = len(profile_ids) >= settings.PROFILE_SEARCH_LIMIT
+            return queryset.filter(uuid__in=profile_ids), limited
+    return search_profiles(queryset, term), False
@@ -0,0 +1,233 @@
+import io
+import random
+import time
+import uuid
+from typing import Callable, Iterable, Optional
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.account import factories
+from apps.account.models import (
+    OrgUnit,
+    UserDepartment,
+    UserProfile,
+    UserStatus,
+    format_phone,
+)
+
+# At least this many departments, more for large directories.
+MIN_DEPARTMENTS = 40
+PROFILES_PER_DEPARTMENT = 250
+# Share of profiles with the first status, the rest is spread evenly.
+MAIN_STATUS_SHARE = 0.85
+OFFICE_PHONE_SHARE = 0.3
+STATUS_FIXTURE = "user_status_ru.json"
+
+USER_COLUMNS = (
+    "id", "password", "is_superuser", "username", "first_name",
+    "last_name", "email", "is_staff", "is_active", "date_joined",
+)
+PROFILE_COLUMNS = (
+    "user_id", "uuid", "status_id", "avatar", "avatar_thumbnails",
+    "last_name", "first_name", "middle_name", "mobile_phone", "phone",
+    "mobile_phone_e164", "mobile_phone_national", "phone_e164",
+    "phone_national", "description", "department_id", "post",
+    "created_time", "updated_time",
+)
+COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r",
+})
+
+
+def copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy_rows(table: str, columns: Iterable[str],
+              rows: Iterable[tuple]) -> None:
+    """
+        Write `rows` to `table` with one `COPY ... FROM STDIN`. Statement
+        triggers still run, with all the rows in their transition tables.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer,
+        )
+
+
+class DirectorySeeder:
+    """
+        Fills the database with synthetic users and profiles spread over a
+        structure of departments. Users and profiles are written with
+        `COPY`, one transaction per chunk, so no model signal runs: user
+        ids are taken from the sequence beforehand and the structure
+        headcounts are counted once at the end. The rows of every chunk
+        come from a generator seeded with `seed` and the number of the
+        first user of the chunk, the same seed always gives the same
+        directory.
+    """
+    def __init__(self, seed: int = 42,
+                 chunk_size: int = 5000,
+                 departments: Optional[int] = None):
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.department_count = departments
+        self.password = "!"
+        self.phones = {}
+        self.created = 0
+
+    def run(self, size: int, progress: Optional[Callable] = None) -> None:
+        """
+            Top the synthetic users up to `size`.
+        """
+        started = time.monotonic()
+        statuses = self.ensure_statuses()
+        departments = self.ensure_departments(
+            self.department_count
+            or max(MIN_DEPARTMENTS, size // PROFILES_PER_DEPARTMENT),
+        )
+        existing = User.objects.filter(
+            username__startswith=factories.USERNAME_PREFIX,
+        ).count()
+        for start in range(existing, size, self.chunk_size):
+            count = min(self.chunk_size, size - start)
+            with transaction.atomic():
+                self.seed_chunk(start, count, statuses, departments)
+            self.created += count
+            if progress:
+                progress(self.created, time.monotonic() - started)
+        if self.created:
+            OrgUnit.recount()
+            if not connection.in_atomic_block:
+                analyze()
+
+    def ensure_statuses(self) -> list:
+        if not UserStatus.objects.exists():
+            call_command("loaddata", STATUS_FIXTURE, verbosity=0)
+        return list(
+            UserStatus.objects.order_by("pk").values_list("pk", flat=True),
+        )
+
+    def ensure_departments(self, count: int) -> list:
+        """
+            Synthetic departments up to `count`, each placed in the
+            structure tree by its own `save`.
+        """
+        departments = list(
+            UserDepartment.objects.filter(
+                title__startswith=factories.DEPARTMENT_PREFIX,
+            ).order_by("pk").values_list("pk", flat=True),
+        )
+        if len(departments) < count:
+            factories.UserDepartmentFactory.reset_sequence(len(departments))
+            departments += [
+                department.pk for department in
+                factories.UserDepartmentFactory.create_batch(
+                    count - len(departments),
+                )
+            ]
+        return departments
+
+    def seed_chunk(self, start: int, count: int, statuses: list,
+                   departments: list) -> None:
+        rng = random.Random(f"{self.seed}:{start}")
+        weights = status_weights(len(statuses))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence('auth_user', 'id')) "
+                "FROM generate_series(1, %s)",
+                [count],
+            )
+            user_ids = [row[0] for row in cursor.fetchall()]
+        now = timezone.now()
+        avatar = UserProfile._meta.get_field("avatar").default
+        users = []
+        profiles = []
+        for number, user_id in enumerate(user_ids, start):
+            last_name = factories.surname(rng)
+            first_name = rng.choice(factories.FIRST_NAMES)
+            mobile_phone = f"+7900000{rng.randint(0, 9999):04d}"
+            phone = None
+            if rng.random() < OFFICE_PHONE_SHARE:
+                phone = f"+7495000{rng.randint(0, 9999):04d}"
+            users.append((
+                user_id, self.password, False,
+                f"{factories.USERNAME_PREFIX}{number}", first_name,
+                last_name, "", False, True, now,
+            ))
+            profiles.append((
+                user_id,
+                uuid.UUID(int=rng.getrandbits(128), version=4),
+                rng.choices(statuses, weights)[0] if statuses else None,
+                avatar,
+                "{}",
+                last_name,
+                first_name,
+                rng.choice(factories.FIRST_NAMES) + "ovich",
+                mobile_phone,
+                phone,
+                *self.format_phone(mobile_phone),
+                *self.format_phone(phone),
+                " ".join(rng.choices(factories.POSTS, k=2)),
+                rng.choice(departments),
+                rng.choice(factories.POSTS),
+                now,
+                now,
+            ))
+        copy_rows("auth_user", USER_COLUMNS, users)
+        copy_rows("content.user_profile", PROFILE_COLUMNS, profiles)
+
+    def format_phone(self, number: Optional[str]) -> tuple:
+        """
+            Numbers repeat among the profiles, each is parsed once.
+        """
+        if number not in self.phones:
+            self.phones[number] = format_phone(number)
+        return self.phones[number]
+
+
+def status_weights(count: int) -> list:
+    if count < 2:
+        return [1] * count
+    rest = (1 - MAIN_STATUS_SHARE) / (count - 1)
+    return [MAIN_STATUS_SHARE, *[rest] * (count - 1)]
+
+
+def analyze() -> None:
+    with connection.cursor() as cursor:
+        for table in ("auth_user", "content.user_profile",
+                      "content.directory_entry"):
+            cursor.execute(f"VACUUM ANALYZE {table}")
+
+
+def clear() -> None:
+    """
+        Delete the synthetic users, profiles and departments. The profiles
+        leave their departments with one `UPDATE` and the headcounts are
+        counted again once at the end, instead of being moved profile by
+        profile as they are deleted.
+    """
+    UserProfile.objects.filter(
+        user__username__startswith=factories.USERNAME_PREFIX,
+    ).update(department=None)
+    User.objects.filter(
+        username__startswith=factories.USERNAME_PREFIX,
+    ).delete()
+    UserDepartment.objects.filter(
+        title__startswith=factories.DEPARTMENT_PREFIX,
+    ).delete()
+    OrgUnit.objects.filter(
+        parent=None, name__startswith=factories.DEPARTMENT_PREFIX,
+    ).delete()
+    OrgUnit.recount()
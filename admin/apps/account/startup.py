@@ -0,0 +1,229 @@
+import hashlib
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.finders import get_finders
+from django.core import serializers
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from apps.account.models import ProfileHistory
+
+# Written to `STATIC_ROOT` after `collectstatic`, holds the digest of the
+# files that were collected.
+STATIC_MARKER = ".collectstatic"
+STATIC_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+
+# Run with `-X importtime` in a fresh interpreter, prints how long every
+# startup phase took as JSON on its last line.
+PROFILE_SCRIPT = """
+import json, time
+phases = {}
+started = time.perf_counter()
+def phase(name):
+    global started
+    now = time.perf_counter()
+    phases[name] = (now - started) * 1000
+    started = now
+from django.conf import settings
+phase("django")
+settings.INSTALLED_APPS
+phase("settings")
+import django
+django.setup()
+phase("apps")
+from django.urls import get_resolver
+get_resolver().url_patterns
+phase("urls")
+print(json.dumps(phases))
+"""
+
+
+def pending_migrations() -> list:
+    executor = MigrationExecutor(connection)
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def static_digest() -> str:
+    """
+        Digest of the names and contents of the files `collectstatic` would
+        copy, whichever finder they come from.
+    """
+    files = {}
+    for finder in get_finders():
+        for path, storage in finder.list(STATIC_IGNORE_PATTERNS):
+            prefix = getattr(storage, "prefix", None) or ""
+            # The first finder to list a path wins, as in `collectstatic`.
+            files.setdefault(str(Path(prefix, path)), storage.path(path))
+    digest = hashlib.blake2b(digest_size=16)
+    for name, source in sorted(files.items()):
+        digest.update(name.encode())
+        digest.update(Path(source).read_bytes())
+    return digest.hexdigest()
+
+
+def static_marker() -> Path:
+    return Path(settings.STATIC_ROOT) / STATIC_MARKER
+
+
+def static_collected(digest: str) -> bool:
+    try:
+        return static_marker().read_text().strip() == digest
+    except FileNotFoundError:
+        return False
+
+
+def collect_static(digest: str) -> None:
+    call_command("collectstatic", interactive=False, clear=True, verbosity=0)
+    static_marker().write_text(digest)
+
+
+def find_fixture(name: str) -> Path:
+    for directory in settings.FIXTURE_DIRS:
+        if (Path(directory) / name).exists():
+            return Path(directory) / name
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path) / "fixtures" / name
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No fixture named '{name}'.")
+
+
+def fixture_loaded(name: str) -> bool:
+    """
+        Whether every object of the fixture is in the database with the
+        field values the fixture has.
+    """
+    path = find_fixture(name)
+    for deserialized in serializers.deserialize(
+        path.suffix.lstrip("."), path.read_text(encoding="utf-8"),
+    ):
+        obj = deserialized.object
+        values = {
+            field.attname: field.value_from_object(obj)
+            for field in obj._meta.concrete_fields
+        }
+        if not obj._meta.default_manager.filter(**values).exists():
+            return False
+    return True
+
+
+def stale_messages(locales: list) -> list:
+    """
+        Catalogs of `locales` without a compiled file or with one older than
+        the catalog, the check `compilemessages` does per file.
+    """
+    directories = [
+        settings.BASE_DIR / "locale",
+        *map(Path, settings.LOCALE_PATHS),
+        *(
+            Path(app_config.path) / "locale"
+            for app_config in apps.get_app_configs()
+            if app_config.path.startswith(str(settings.BASE_DIR))
+        ),
+    ]
+    stale = []
+    for directory in directories:
+        for locale in locales:
+            for po_path in (directory / locale / "LC_MESSAGES").glob("*.po"):
+                mo_path = po_path.with_suffix(".mo")
+                if (not mo_path.exists()
+                        or mo_path.stat().st_mtime < po_path.stat().st_mtime):
+                    stale.append(po_path)
+    return stale
+
+
+def ensure_superuser(username: str, password: str) -> bool:
+    if User.objects.filter(username=username).exists():
+        return False
+    User.objects.create_superuser(username, f"{username}@admin.local",
+                                  password)
+    return True
+
+
+def history_partitions() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_inherits "
+            "WHERE inhparent = 'content.profile_history'::regclass",
+        )
+        return cursor.fetchone()[0]
+
+
+def add_history_partitions() -> bool:
+    """
+        Create the monthly partitions of the profile history up to three
+        months ahead, so rows do not pile up in the default partition.
+        Returns whether any was added.
+    """
+    before = history_partitions()
+    ProfileHistory.add_partitions()
+    return history_partitions() > before
+
+
+def profile_imports(python: Optional[str] = None) -> dict:
+    """
+        Start the admin in a fresh interpreter with `-X importtime` and
+        return the startup phases and the parsed import times.
+    """
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        "phases": json.loads(result.stdout.strip().splitlines()[-1]),
+        "imports": parse_importtime(result.stderr),
+    }
+
+
+def parse_importtime(output: str) -> list:
+    """
+        Rows of `-X importtime` as dicts with the self and cumulative times
+        in milliseconds and the nesting depth of the import.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue
+        imports.append({
+            "name": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self": int(own) / 1000,
+            "cumulative": int(cumulative) / 1000,
+        })
+    return imports
+
+
+def summarize_imports(imports: list, limit: int = 20) -> dict:
+    """
+        The slowest top level imports by cumulative time and the packages
+        by the time their own modules took.
+    """
+    packages = defaultdict(float)
+    for row in imports:
+        packages[row["name"].split(".")[0]] += row["self"]
+    top_level = [row for row in imports if row["depth"] == 0]
+    return {
+        "total": sum(row["cumulative"] for row in top_level),
+        "imports": sorted(
+            top_level, key=lambda row: row["cumulative"], reverse=True,
+        )[:limit],
+        "packages": sorted(
+            ({"name": name, "self": own} for name, own in packages.items()),
+            key=lambda row: row["self"],
+            reverse=True,
+        )[:limit],
+    }
@@ -7,13 +7,13 @@ class UserStatusModelTest(TestCase):
     def setUpClass(cls):
         super().setUpClass()
         cls.user_status = UserStatus.objects.create(
-            status="Q" * 100,
-            title="Z" * 100,
+            status="Q" * 50,
+            title="Z" * 50,
             description="User status description"
         )
 
     def test_status_max_length_not_exceed(self):
-        status = UserStatusModelTest.status
+        status = UserStatusModelTest.user_status
         max_length_status = status._meta.get_field("status").max_length
         length_slug = len(status.status)
         self.assertEqual(max_length_status, length_slug)
@@ -0,0 +1,64 @@
+import base64
+import json
+
+from django.contrib.auth.models import User
+from django.core.paginator import InvalidPage
+from django.test import TestCase
+from apps.account.models import UserProfile
+from apps.account.pagination import KeysetPaginator, decode_cursor
+
+
+def forge_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class KeysetPaginatorTest(TestCase):
+    fixtures = ["user_status_ru.json"]
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(12):
+            user = User.objects.create(username=f"user_{number}")
+            UserProfile.objects.filter(user=user).update(
+                last_name=f"Last {number % 4}",
+                first_name=None if number % 3 else f"First {number}",
+            )
+
+    def test_pages_cover_all_profiles_in_order(self):
+        paginator = KeysetPaginator(UserProfile.objects.all(), 5)
+        expected = sorted(
+            UserProfile.objects.all(),
+            key=lambda p: (p.last_name or "", p.first_name or "", p.uuid),
+        )
+        pages = [paginator.page()]
+        while pages[-1].has_next:
+            pages.append(paginator.page(pages[-1].next_cursor))
+        result = [profile for page in pages for profile in page]
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(result, expected)
+        previous = paginator.page(pages[2].previous_cursor)
+        self.assertEqual(list(previous), list(pages[1]))
+        self.assertTrue(previous.has_previous)
+
+    def test_page_queries_do_not_grow_with_depth(self):
+        paginator = KeysetPaginator(UserProfile.objects.all(), 5)
+        first_page = paginator.page()
+        with self.assertNumQueries(2):
+            list(paginator.page(first_page.next_cursor))
+
+    def test_tampered_cursor_is_invalid_page(self):
+        uuid = str(UserProfile.objects.first().uuid)
+        for payload in (
+            ["n", "Last", "First", "not-a-uuid"],
+            ["n", "Last", "First", 5],
+            ["n", 1, "First", uuid],
+            ["x", "Last", "First", uuid],
+            ["n", "Last", "First"],
+            {"n": 1},
+        ):
+            with self.assertRaises(InvalidPage):
+                decode_cursor(forge_cursor(payload))
+        self.assertEqual(
+            decode_cursor(forge_cursor(["p", "Last", "", uuid]))[1][2].hex,
+            uuid.replace("-", ""),
+        )
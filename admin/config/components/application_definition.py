@@ -11,6 +11,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.account.middleware.RequestMetricsMiddleware",
+    "apps.account.middleware.ReplicaPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -0,0 +1,11 @@
+import os
+
+# Square thumbnail sides in pixels, each one is written as WebP and JPEG.
+AVATAR_SIZES = tuple(
+    int(size)
+    for size in os.environ.get("AVATAR_SIZES", "64 256").split()
+)
+
+AVATAR_QUALITY = int(os.environ.get("AVATAR_QUALITY", 85))
+
+AVATAR_WORKERS = int(os.environ.get("AVATAR_WORKERS", 2))
@@ -0,0 +1,13 @@
+import os
+
+REDIS_HOST = os.environ.get("REDIS_HOST", "127.0.0.1")
+
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+
+REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", 0.5))
+
+LOOKUP_CACHE_TIMEOUT = int(os.environ.get("LOOKUP_CACHE_TIMEOUT", 86400))
+
+LOOKUP_CACHE_LOCAL_TTL = float(os.environ.get("LOOKUP_CACHE_LOCAL_TTL", 5))
+
+LOOKUP_CACHE_LOCAL_SIZE = int(os.environ.get("LOOKUP_CACHE_LOCAL_SIZE", 128))
@@ -12,6 +12,7 @@ DATABASES = {
         "HOST": os.environ.get("POSTGRES_HOST"),
         "PORT": os.environ.get("POSTGRES_PORT"),
         "OPTIONS": {"options": "-c search_path=public,content"},
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
     },
 }
 
@@ -26,3 +27,37 @@ if os.environ.get("GITHUB_WORKFLOW"):
             "PORT": "5432",
         },
     }
+
+# Space separated `host[:port][/name]`, the rest is taken from `default`.
+# Pointing a replica at the primary itself is enough to try the split
+# locally.
+DATABASE_REPLICAS = []
+
+for number, address in enumerate(
+    os.environ.get("POSTGRES_REPLICAS", "").split(), 1,
+):
+    server, _, name = address.partition("/")
+    host, _, port = server.partition(":")
+    alias = f"replica_{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "NAME": name or DATABASES["default"]["NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["apps.account.database.ReplicaRouter"]
+
+# Reads stay on the primary this long after a client wrote, longer than
+# the replication lag is expected to be.
+DATABASE_REPLICA_PIN_SECONDS = int(
+    os.environ.get("DATABASE_REPLICA_PIN_SECONDS", 15),
+)
+
+# Persistent connections idle for longer are checked before a request uses
+# them.
+DATABASE_HEALTH_CHECK_INTERVAL = float(
+    os.environ.get("DATABASE_HEALTH_CHECK_INTERVAL", 10),
+)
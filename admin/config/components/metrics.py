@@ -0,0 +1,32 @@
+import os
+
+# Requests taking at least this many seconds are logged with their SQL.
+REQUEST_SLOW_THRESHOLD = float(os.environ.get("REQUEST_SLOW_THRESHOLD", 1))
+
+# Statements kept per request for the slow request log.
+REQUEST_SQL_CAPTURE_LIMIT = int(
+    os.environ.get("REQUEST_SQL_CAPTURE_LIMIT", 100),
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "verbose": {
+            "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "verbose",
+        },
+    },
+    "loggers": {
+        "apps.account.middleware": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
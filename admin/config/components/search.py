@@ -0,0 +1,18 @@
+import os
+
+ELASTIC_HOST = os.environ.get("ELASTIC_HOST", "127.0.0.1")
+
+ELASTIC_PORT = int(os.environ.get("ELASTIC_PORT", 9200))
+
+ELASTIC_PROFILES_INDEX = os.environ.get("ELASTIC_PROFILES_INDEX", "profiles")
+
+ELASTIC_TIMEOUT = float(os.environ.get("ELASTIC_TIMEOUT", 1))
+
+# "database" searches with `find_profiles`, every word against the
+# `search_vector` and trigram indexes of the profile and the lookup titles.
+# "elasticsearch" asks the profiles index first and falls back to the
+# database when it is down.
+PROFILE_SEARCH_ENGINE = os.environ.get("PROFILE_SEARCH_ENGINE", "database")
+
+# Profiles taken from the index, the admin warns when a search reaches it.
+PROFILE_SEARCH_LIMIT = int(os.environ.get("PROFILE_SEARCH_LIMIT", 1000))
@@ -0,0 +1,13 @@
+import os
+
+# Loaded by `prepare_service` when the database lacks any of their rows.
+STARTUP_FIXTURES = ["user_status_ru.json"]
+
+STARTUP_LOCALES = ["en", "ru"]
+
+# Created by `prepare_service` when missing, for local and demo setups.
+STARTUP_SUPERUSER = os.environ.get("STARTUP_SUPERUSER", "admin")
+
+STARTUP_SUPERUSER_PASSWORD = os.environ.get(
+    "STARTUP_SUPERUSER_PASSWORD", "admin",
+)
@@ -21,6 +21,11 @@ include(
     "components/database.py",
     "components/password_validation.py",
     "components/internationalization.py",
+    "components/cache.py",
+    "components/search.py",
+    "components/avatars.py",
+    "components/metrics.py",
+    "components/startup.py",
 )
 
 STATIC_URL = "/static/"
@@ -2,12 +2,14 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
+from apps.account.metrics import metrics_view
 
 # flake8: noqa: W503
 urlpatterns = (
         [
             path("docs/", include("django.contrib.admindocs.urls")),
             path("admin/", admin.site.urls),
+            path("metrics", metrics_view, name="metrics"),
         ]
         + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
         + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -11,10 +11,6 @@ then
     echo "Postgres correctly started."
 fi
 
-python manage.py migrate
-python manage.py collectstatic --no-input --clear
-python manage.py loaddata apps/account/fixtures/user_status_ru.json
-python manage.py compilemessages -l en -l ru
-python manage.py shell -c "from django.contrib.auth.models import User; User.objects.filter(username='admin').exists() or User.objects.create_superuser('admin', 'admin@admin.local', 'admin')"
+python manage.py prepare_service
 
 exec "$@"
@@ -47,6 +47,14 @@ def django_db_setup():
     }
 
 
+@pytest.fixture(autouse=True)
+def lookup_cache():
+    from apps.account.cache import reset_lookups
+    reset_lookups()
+    yield
+    reset_lookups()
+
+
 pytest_plugins = [
     "tests.fixtures.fixture_user",
     "tests.fixtures.fixture_data",
@@ -1,8 +1,15 @@
 import tempfile
 
 import pytest
+from django.core.management import call_command
+from django.contrib.auth.models import User
 from mixer.backend.django import mixer as _mixer
-from apps.account.models import UserStatus
+from apps.account.models import (
+    OrgUnit,
+    UserDepartment,
+    UserProfile,
+    UserStatus,
+)
 
 
 @pytest.fixture()
@@ -24,3 +31,41 @@ def user_status(user):
         title="Test status title",
         imadescriptionge="Test status description"
     )
+
+
+@pytest.fixture()
+def user_statuses(db):
+    call_command("loaddata", "user_status_ru.json", verbosity=0)
+    return list(UserStatus.objects.all())
+
+
+@pytest.fixture()
+def user_departments(mixer):
+    return mixer.cycle(3).blend(UserDepartment)
+
+
+@pytest.fixture()
+def create_profile(db):
+    """
+        Creates a user, whose profile comes from the signals, then sets the
+        given profile fields with a `save` as the admin form would.
+    """
+    def create(username: str, **fields) -> UserProfile:
+        profile = User.objects.create(username=username).user_profile
+        for field, value in fields.items():
+            setattr(profile, field, value)
+        profile.save()
+        return profile
+
+    return create
+
+
+@pytest.fixture()
+def headcounts(db):
+    """
+        Returns the current headcounts of the structure by unit name.
+    """
+    def count() -> dict:
+        return dict(OrgUnit.objects.values_list("name", "headcount"))
+
+    return count
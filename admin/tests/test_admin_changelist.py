@@ -0,0 +1,40 @@
+import pytest
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.account.models import UserProfile
+
+
+def create_profiles(count, statuses, departments):
+    for number in range(count):
+        user = User.objects.create(username=f"changelist_user_{number}")
+        UserProfile.objects.filter(user=user).update(
+            last_name=f"Last name {number}",
+            status=statuses[number % len(statuses)],
+            department=departments[number % len(departments)],
+        )
+
+
+def changelist_queries(client, monkeypatch, page_size):
+    model_admin = admin.site._registry[UserProfile]
+    monkeypatch.setattr(model_admin, "list_per_page", page_size)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(
+            reverse("admin:account_userprofile_changelist"),
+        )
+    assert response.status_code == 200
+    assert len(response.context["cl"].result_list) == page_size
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db
+def test_changelist_query_count_does_not_depend_on_page_size(
+    admin_client, monkeypatch, user_statuses, user_departments,
+):
+    create_profiles(30, user_statuses, user_departments)
+    changelist_queries(admin_client, monkeypatch, 5)
+    small_page = changelist_queries(admin_client, monkeypatch, 5)
+    large_page = changelist_queries(admin_client, monkeypatch, 25)
+    assert small_page == large_page
@@ -0,0 +1,83 @@
+import csv
+import io
+import os
+import zipfile
+from xml.etree import ElementTree
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from apps.account import export_format
+from apps.account.export import HEADER
+from apps.account.models import UserProfile
+from tests.conftest import BASE_DIR
+
+SHEET_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+@pytest.fixture()
+def profiles(db, user_statuses, user_departments):
+    for number in range(3):
+        user = User.objects.create(username=f"export_user_{number}")
+        UserProfile.objects.filter(user=user).update(
+            last_name=f"Export <{number}> & Co",
+            status=user_statuses[number],
+            department=user_departments[number],
+        )
+    return UserProfile.objects.filter(
+        user__username__startswith="export_user_",
+    ).order_by("last_name")
+
+
+def export(client, action, profiles):
+    response = client.post(
+        reverse("admin:account_userprofile_changelist"),
+        {
+            "action": action,
+            "_selected_action": [str(profile.pk) for profile in profiles],
+        },
+    )
+    assert response.status_code == 200
+    assert response.streaming
+    assert "attachment" in response["Content-Disposition"]
+    return list(response.streaming_content)
+
+
+def test_export_csv(admin_client, profiles):
+    chunks = export(admin_client, "export_csv", profiles)
+    assert chunks[0].decode("utf-8-sig").startswith(",".join(HEADER[:3]))
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8-sig"))))
+    assert rows[0] == HEADER
+    assert [row[2] for row in rows[1:]] == [
+        profile.last_name for profile in profiles
+    ]
+    first = profiles[0]
+    assert rows[1][HEADER.index("Status")] == first.status.title
+    assert rows[1][HEADER.index("Department")] == first.department.title
+
+
+def test_export_xlsx(admin_client, profiles):
+    chunks = export(admin_client, "export_xlsx", profiles)
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = [
+        [text.text or "" for text in row.iter(f"{SHEET_NAMESPACE}t")]
+        for row in sheet.iter(f"{SHEET_NAMESPACE}row")
+    ]
+    assert rows[0] == HEADER
+    assert [row[2] for row in rows[1:]] == [
+        profile.last_name for profile in profiles
+    ]
+
+
+def test_export_format_matches_api():
+    api_path = os.path.join(BASE_DIR, "backend", "core", "export.py")
+    with open(export_format.__file__) as admin_file:
+        admin_source = admin_file.read()
+    with open(api_path) as api_file:
+        assert api_file.read() == admin_source, (
+            "apps/account/export_format.py and backend/core/export.py "
+            "must stay the same"
+        )
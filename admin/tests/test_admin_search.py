@@ -0,0 +1,112 @@
+import pytest
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.urls import reverse
+from apps.account import search as account_search
+from apps.account.models import UserProfile
+
+
+@pytest.fixture()
+def profiles(db, user_statuses):
+    for number, last_name in enumerate(("Ivanov", "Petrov", "Sidorov")):
+        user = User.objects.create(username=f"search_user_{number}")
+        UserProfile.objects.filter(user=user).update(
+            last_name=last_name,
+            first_name="Ivan" if number == 0 else "Petr",
+            description=f"Speaks {('English', 'French', 'German')[number]}",
+            status=user_statuses[number % len(user_statuses)],
+        )
+    return list(UserProfile.objects.order_by("last_name"))
+
+
+def search(client, term):
+    response = client.get(
+        reverse("admin:account_userprofile_changelist"),
+        {"q": term},
+    )
+    assert response.status_code == 200
+    return [
+        profile.last_name for profile in response.context["cl"].result_list
+    ]
+
+
+def test_database_search_by_related_fields(admin_client, profiles):
+    assert search(admin_client, "Petro") == ["Petrov"]
+    assert search(admin_client, profiles[1].status.title) == ["Petrov"]
+
+
+def test_database_search_uses_every_word(admin_client, profiles):
+    assert search(admin_client, "petr petro") == ["Petrov"]
+    assert search(admin_client, "sidorov ivan") == []
+    assert search(admin_client, "fren") == ["Petrov"]
+    assert search(admin_client, "%") == []
+
+
+def test_search_delegates_to_elasticsearch(admin_client, profiles,
+                                           settings, monkeypatch):
+    settings.PROFILE_SEARCH_ENGINE = "elasticsearch"
+    monkeypatch.setattr(
+        account_search,
+        "search_profile_ids",
+        lambda term: [str(profiles[2].uuid)],
+    )
+    assert search(admin_client, "Sidr") == ["Sidorov"]
+
+
+def test_search_falls_back_to_database(admin_client, profiles,
+                                       settings, monkeypatch):
+    settings.PROFILE_SEARCH_ENGINE = "elasticsearch"
+    monkeypatch.setattr(
+        account_search, "search_profile_ids", lambda term: None,
+    )
+    assert search(admin_client, "Ivan") == ["Ivanov"]
+
+
+def search_warnings(client, changelist, term):
+    response = client.get(reverse(changelist), {"q": term})
+    assert response.status_code == 200
+    return [
+        message.message for message in get_messages(response.wsgi_request)
+        if message.level_tag == "warning"
+    ]
+
+
+def test_search_warns_at_limit(admin_client, profiles, settings,
+                               monkeypatch):
+    settings.PROFILE_SEARCH_ENGINE = "elasticsearch"
+    settings.PROFILE_SEARCH_LIMIT = 2
+    monkeypatch.setattr(
+        account_search,
+        "search_profile_ids",
+        lambda term: [str(profile.uuid) for profile in profiles[:2]],
+    )
+    changelist = "admin:account_userprofile_changelist"
+    assert search_warnings(admin_client, changelist, "Iv") == [
+        "Only the best 2 matches are shown, refine the search to see the "
+        "others.",
+    ]
+
+    monkeypatch.setattr(
+        account_search,
+        "search_profile_ids",
+        lambda term: [str(profiles[0].uuid)],
+    )
+    assert search_warnings(admin_client, changelist, "Ivanov") == []
+
+
+def test_directory_search_warns_at_limit(admin_client, profiles, settings):
+    settings.PROFILE_SEARCH_LIMIT = 2
+    changelist = "admin:account_directoryentry_changelist"
+    assert len(search_warnings(admin_client, changelist, "Speaks")) == 1
+    assert search_warnings(admin_client, changelist, "Petrov") == []
+
+
+def test_directory_search(admin_client, profiles):
+    response = admin_client.get(
+        reverse("admin:account_directoryentry_changelist"),
+        {"q": "Petro"},
+    )
+    assert response.status_code == 200
+    assert [
+        entry.last_name for entry in response.context["cl"].result_list
+    ] == ["Petrov"]
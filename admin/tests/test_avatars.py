@@ -0,0 +1,55 @@
+import os
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+from apps.account.avatars import process_avatar
+from apps.account.models import UserProfile
+
+
+def png_upload(color: str) -> SimpleUploadedFile:
+    output = BytesIO()
+    Image.new("RGBA", (800, 600), color).save(output, "PNG")
+    return SimpleUploadedFile("photo.PNG", output.getvalue())
+
+
+def test_identical_avatars_are_stored_once(
+    db, mock_media, django_capture_on_commit_callbacks,
+):
+    profiles = []
+    for number in range(2):
+        profile = User.objects.create(
+            username=f"avatar_user_{number}",
+        ).user_profile
+        with django_capture_on_commit_callbacks() as callbacks:
+            profile.avatar = png_upload("red")
+            profile.save()
+        assert len(callbacks) == 1
+        profiles.append(profile)
+
+    name = profiles[0].avatar.name
+    assert name == profiles[1].avatar.name
+    assert name.startswith("avatars/") and name.endswith(".png")
+    assert len(os.listdir(os.path.dirname(profiles[0].avatar.path))) == 1
+
+
+def test_avatar_thumbnails(db, mock_media, settings):
+    settings.AVATAR_SIZES = (64, 256)
+    profile = User.objects.create(username="avatar_user").user_profile
+    profile.avatar = png_upload("blue")
+    profile.save()
+
+    process_avatar(UserProfile, profile.pk, profile.avatar.name)
+
+    profile.refresh_from_db()
+    assert set(profile.avatar_thumbnails) == {"64", "256"}
+    for size, formats in profile.avatar_thumbnails.items():
+        for ext, name in formats.items():
+            with Image.open(os.path.join(mock_media, name)) as image:
+                assert image.size == (int(size), int(size))
+                assert image.format == ext.upper()
+
+    profile.avatar = png_upload("green")
+    profile.save()
+    assert profile.avatar_thumbnails == {}
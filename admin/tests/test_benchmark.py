@@ -0,0 +1,50 @@
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from apps.account import factories
+from apps.account.benchmarks import compare
+
+
+def test_compare_reports_slower_cases_and_more_queries():
+    baseline = {
+        "1000/admin changelist": {"median_ms": 100.0, "queries": 8},
+        "1000/admin search": {"median_ms": 10.0, "queries": 8},
+        "1000/api search": {"median_ms": 2.0},
+    }
+    results = {
+        "1000/admin changelist": {"median_ms": 130.0, "queries": 9},
+        "1000/admin search": {"median_ms": 11.0, "queries": 8},
+        # Above the tolerance, but by less than a millisecond.
+        "1000/api search": {"median_ms": 2.9},
+        "10000/api search": {"median_ms": 50.0},
+    }
+    assert compare(results, baseline, 0.2) == [
+        "1000/admin changelist: median 100.00 ms -> 130.00 ms",
+        "1000/admin changelist: 8 -> 9 queries",
+    ]
+
+
+def test_benchmark_command_writes_results(db, user_statuses, tmp_path):
+    output = tmp_path / "results.json"
+    # More profiles than a changelist page, so that every page paginates.
+    call_command(
+        "benchmark", "--sizes", "120", "--rounds", "1", "--no-api",
+        "--output", str(output), stdout=io.StringIO(),
+    )
+    results = json.loads(output.read_text())
+    assert results["rounds"] == 1
+    assert set(results["results"]) == {
+        "120/admin changelist",
+        "120/admin search",
+        "120/admin filter status",
+        "120/admin filter post",
+        "120/admin filter department",
+        "120/admin directory",
+        "120/profile create",
+    }
+    assert results["results"]["120/admin directory"]["profiles"] >= 120
+    assert not User.objects.filter(
+        username__startswith=factories.USERNAME_PREFIX,
+    ).exists()
@@ -0,0 +1,91 @@
+from django.contrib.admin.models import LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.account.models import OrgUnit, UserDepartment, UserProfile
+
+CHANGELIST = "admin:account_userprofile_changelist"
+
+
+def create_profiles(create_profile, count: int, departments: list) -> list:
+    return [
+        create_profile(
+            f"bulk_user_{count}_{number}",
+            department=departments[number % len(departments)],
+        )
+        for number in range(count)
+    ]
+
+
+def run_action(client, action: str, profiles: list, **values):
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(reverse(CHANGELIST), {
+            "action": action,
+            "_selected_action": [profile.pk for profile in profiles],
+            "index": 0,
+            **values,
+        })
+    assert response.status_code == 302
+    return len(context.captured_queries)
+
+
+def test_change_department_keeps_headcounts(admin_client, create_profile,
+                                            headcounts):
+    retail = UserDepartment.objects.create(
+        title="Retail", block="Commerce", department="Sales", group="Retail",
+    )
+    wholesale = UserDepartment.objects.create(
+        title="Wholesale", block="Commerce", department="Sales",
+    )
+    hr = UserDepartment.objects.create(title="HR", block="Staff")
+    profiles = create_profiles(create_profile, 6, [retail, wholesale, hr])
+
+    run_action(admin_client, "change_department", profiles[:5],
+               department=wholesale.pk)
+    assert UserProfile.objects.filter(department=wholesale).count() == 5
+    counts = headcounts()
+    assert counts == {
+        "Commerce": 5, "Sales": 5, "Retail": 0, "Staff": 1,
+    }
+    OrgUnit.recount()
+    assert headcounts() == counts
+    assert LogEntry.objects.filter(
+        object_id__in=[str(profile.pk) for profile in profiles[:5]],
+    ).count() == 5
+
+
+def test_bulk_action_queries_do_not_depend_on_selection(
+    admin_client, user_statuses, user_departments, create_profile,
+):
+    profiles = create_profiles(create_profile, 5, user_departments)
+    # The first request loads the lookups.
+    run_action(admin_client, "change_status", profiles,
+               status=user_statuses[0].pk)
+    small = run_action(admin_client, "change_status", profiles,
+                       status=user_statuses[1].pk)
+    profiles = create_profiles(create_profile, 25, user_departments)
+    large = run_action(admin_client, "change_status", profiles,
+                       status=user_statuses[0].pk)
+    assert small == large
+    assert not UserProfile.objects.filter(
+        pk__in=[profile.pk for profile in profiles],
+    ).exclude(status=user_statuses[0]).exists()
+
+
+def test_set_post_requires_a_value(admin_client, create_profile):
+    profiles = create_profiles(create_profile, 2, [None])
+    UserProfile.objects.filter(pk=profiles[0].pk).update(
+        last_name="Ivanov", first_name="Ivan", middle_name=None,
+    )
+    run_action(admin_client, "set_post", profiles, post="")
+    assert not LogEntry.objects.exists()
+
+    run_action(admin_client, "set_post", profiles, post="Engineer")
+    assert set(
+        UserProfile.objects.filter(
+            pk__in=[profile.pk for profile in profiles],
+        ).values_list("post", flat=True),
+    ) == {"Engineer"}
+    assert LogEntry.objects.get(
+        object_id=str(profiles[0].pk),
+    ).object_repr == "Ivanov Ivan"
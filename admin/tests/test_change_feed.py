@@ -0,0 +1,154 @@
+import json
+from importlib import import_module
+
+import psycopg2
+import pytest
+
+from django.db import connection
+
+change_feed = import_module("apps.account.migrations.0010_change_feed")
+
+BLOCK = "Change feed"
+USERNAME_PREFIX = "change_feed_"
+
+
+class Feed:
+    """
+        Writes with its own connection in autocommit mode and collects the
+        change events of those writes. The events are only sent on commit,
+        which the transaction of a test never does.
+    """
+    def __init__(self, listener):
+        self.listener = listener
+        self.received = []
+
+    def execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self.listener.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else []
+
+    def events(self, kind: str) -> list[dict]:
+        self.listener.poll()
+        while self.listener.notifies:
+            notify = self.listener.notifies.pop(0)
+            self.received.append(json.loads(notify.payload))
+        return [event for event in self.received if event["type"] == kind]
+
+    def create_department(self, title: str) -> int:
+        return self.execute(
+            "INSERT INTO content.user_department (title, block) "
+            "VALUES (%s, %s) RETURNING id",
+            (title, BLOCK),
+        )[0][0]
+
+    def create_profile(self, username: str) -> str:
+        return self.execute(
+            """
+            WITH account AS (
+                INSERT INTO auth_user (password, is_superuser, username,
+                                       first_name, last_name, email,
+                                       is_staff, is_active, date_joined)
+                VALUES ('', false, %s, '', '', '', false, true, now())
+                RETURNING id
+            )
+            INSERT INTO content.user_profile (uuid, avatar,
+                                              avatar_thumbnails, user_id,
+                                              created_time, updated_time)
+            SELECT gen_random_uuid(), '', '{}', id, now(), now()
+            FROM account
+            RETURNING uuid::text
+            """,
+            (USERNAME_PREFIX + username,),
+        )[0][0]
+
+
+@pytest.fixture
+def feed(db):
+    listener = psycopg2.connect(**connection.get_connection_params())
+    listener.autocommit = True
+    feed = Feed(listener)
+    feed.execute(f"LISTEN {change_feed.CHANNEL}")
+    yield feed
+    users = "SELECT id FROM auth_user WHERE username LIKE %s"
+    pattern = USERNAME_PREFIX + "%"
+    feed.execute(
+        "DELETE FROM content.profile_change WHERE profile_id IN ("
+        f"SELECT uuid FROM content.user_profile WHERE user_id IN ({users}))",
+        (pattern,),
+    )
+    feed.execute(
+        f"DELETE FROM content.user_profile WHERE user_id IN ({users})",
+        (pattern,),
+    )
+    feed.execute("DELETE FROM auth_user WHERE username LIKE %s", (pattern,))
+    feed.execute(
+        "DELETE FROM content.user_department WHERE block = %s", (BLOCK,),
+    )
+    listener.close()
+
+
+def test_profile_events_carry_departments(feed):
+    sales = feed.create_department("Sales")
+    support = feed.create_department("Support")
+    profile_id = feed.create_profile("mover")
+    move = "UPDATE content.user_profile SET department_id = %s WHERE uuid = %s"
+    feed.execute(move, (sales, profile_id))
+    feed.execute(move, (support, profile_id))
+    feed.execute(
+        "DELETE FROM content.user_profile WHERE uuid = %s", (profile_id,),
+    )
+
+    assert feed.events("profile") == [
+        {"type": "profile", "op": "insert", "id": profile_id},
+        {
+            "type": "profile", "op": "update", "id": profile_id,
+            "department": sales,
+        },
+        {
+            "type": "profile", "op": "update", "id": profile_id,
+            "department": support, "previous_department": sales,
+        },
+        {
+            "type": "profile", "op": "delete", "id": profile_id,
+            "department": support,
+        },
+    ]
+
+
+def test_unchanged_rows_send_no_events(feed):
+    department = feed.create_department("Sales")
+    profile_id = feed.create_profile("idle")
+    feed.events("profile")
+    feed.received.clear()
+
+    feed.execute(
+        "UPDATE content.user_profile SET updated_time = now() "
+        "WHERE uuid = %s",
+        (profile_id,),
+    )
+    feed.execute(
+        "UPDATE content.user_department SET title = title WHERE id = %s",
+        (department,),
+    )
+
+    assert feed.events("profile") == []
+    assert feed.events("department") == []
+
+
+def test_large_statement_sends_one_summary(feed):
+    count = change_feed.ROW_LIMIT + 1
+    feed.execute(
+        "INSERT INTO content.user_department (title, block) "
+        "SELECT 'Unit ' || number, %s FROM generate_series(1, %s) number",
+        (BLOCK, count),
+    )
+    feed.execute(
+        "UPDATE content.user_department SET title = title || '!' "
+        "WHERE block = %s AND title IN ('Unit 1', 'Unit 2')",
+        (BLOCK,),
+    )
+
+    summary, *updates = feed.events("department")
+    assert summary == {"type": "department", "op": "insert", "count": count}
+    assert [event["op"] for event in updates] == ["update", "update"]
+    assert all("id" in event for event in updates)
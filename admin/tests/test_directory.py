@@ -0,0 +1,86 @@
+import io
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.urls import reverse
+from apps.account.importer import UserImporter, read_csv
+from apps.account.models import DirectoryEntry, UserDepartment, UserProfile
+
+
+def test_directory_follows_profiles(db, user_statuses):
+    department = UserDepartment.objects.create(
+        title="Sales", block="Commerce", department="Sales",
+    )
+    user = User.objects.create(username="directory_user")
+    profile = user.user_profile
+    profile.last_name = "Ivanov"
+    profile.first_name = "Ivan"
+    profile.middle_name = "Petrovich"
+    profile.phone = "+79123456789"
+    profile.department = department
+    profile.save()
+
+    entry = DirectoryEntry.objects.get(pk=profile.pk)
+    assert entry.username == "directory_user"
+    assert entry.full_name == "Ivanov Ivan Petrovich"
+    assert entry.abbreviation == "Ivanov I.P."
+    assert entry.phone_e164 == "+79123456789"
+    assert entry.status_title == profile.status.title
+    assert entry.department_path == "Commerce / Sales"
+    assert entry.org_unit_path == department.org_unit.path
+
+    department.title = "Retail"
+    department.save()
+    profile.status.title = "On leave"
+    profile.status.save()
+    user.username = "renamed_user"
+    user.save()
+    entry.refresh_from_db()
+    assert entry.department_title == "Retail"
+    assert entry.status_title == "On leave"
+    assert entry.username == "renamed_user"
+
+    user.delete()
+    assert not DirectoryEntry.objects.filter(pk=profile.pk).exists()
+
+
+def test_directory_follows_bulk_import(db):
+    importer = UserImporter()
+    importer.run(read_csv(io.StringIO(
+        "username,last_name,first_name\n"
+        "bulk_one,Petrov,Petr\n"
+        "bulk_two,Sidorov,\n",
+    )))
+
+    entries = dict(
+        DirectoryEntry.objects.filter(
+            username__in=["bulk_one", "bulk_two"],
+        ).values_list("username", "abbreviation"),
+    )
+    assert entries == {"bulk_one": "Petrov P..", "bulk_two": "Sidorov .."}
+    assert DirectoryEntry.objects.count() == UserProfile.objects.count()
+
+
+def test_directory_changelist_walks_keyset_pages(admin_client, monkeypatch):
+    for number in range(7):
+        User.objects.create(username=f"directory_page_{number}")
+    model_admin = admin.site._registry[DirectoryEntry]
+    monkeypatch.setattr(model_admin, "list_per_page", 3)
+    url = reverse("admin:account_directoryentry_changelist")
+
+    seen = []
+    response = admin_client.get(url)
+    while True:
+        assert response.status_code == 200
+        page = list(response.context["cl"].result_list)
+        seen.extend(entry.pk for entry in page)
+        next_url = response.context["cl"].next_page_url
+        if not next_url:
+            break
+        response = admin_client.get(f"{url}{next_url}")
+    assert len(seen) == len(set(seen)) == DirectoryEntry.objects.count()
+    assert len(seen) > 6
+
+    previous_url = response.context["cl"].previous_page_url
+    assert previous_url
+    assert admin_client.get(f"{url}{previous_url}").status_code == 200
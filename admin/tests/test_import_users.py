@@ -0,0 +1,153 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from apps.account.importer import UserImporter, read_csv, read_json
+from apps.account.models import OrgUnit, UserDepartment, UserProfile
+
+CSV_HEADER = (
+    "username,last_name,first_name,post,mobile_phone,department,status\n"
+)
+
+
+def csv_rows(count, department, start=0):
+    lines = [
+        f"import_{number},Last {number},First,Engineer,,{department},"
+        for number in range(start, start + count)
+    ]
+    return CSV_HEADER + "\n".join(lines)
+
+
+def test_import_csv(db, tmp_path, user_statuses, user_departments):
+    department = user_departments[0]
+    path = tmp_path / "users.csv"
+    path.write_text(
+        CSV_HEADER
+        + f"anna,Ivanova,Anna,Lawyer,+447911123456,{department.title},"
+        f"{user_statuses[1].title}\n"
+        + "bob,Smith,Bob,,,,\n",
+    )
+    out = io.StringIO()
+    call_command("import_users", str(path), "--chunk-size", "1", stdout=out)
+
+    profile = UserProfile.objects.select_related("user").get(
+        user__username="anna",
+    )
+    assert profile.last_name == "Ivanova"
+    assert profile.user.last_name == "Ivanova"
+    assert not profile.user.has_usable_password()
+    assert profile.department == department
+    assert profile.status == user_statuses[1]
+    assert profile.mobile_phone.as_e164 == "+447911123456"
+    assert UserProfile.objects.get(user__username="bob").status_id == 1
+    assert "Imported 2 users" in out.getvalue()
+
+
+def test_import_json_lines_and_array(db, user_statuses):
+    records = [{"username": f"json_{number}"} for number in range(3)]
+    lines = io.StringIO("\n".join(json.dumps(record) for record in records))
+    array = io.StringIO(json.dumps(records, indent=2))
+    assert list(read_json(lines, buffer_size=7)) == [
+        (number, record) for number, record in enumerate(records, 1)
+    ]
+    assert list(read_json(array, buffer_size=7)) == [
+        (2, records[0]), (5, records[1]), (8, records[2]),
+    ]
+
+
+def test_errors_carry_file_lines(db, user_statuses):
+    importer = UserImporter()
+    importer.run(read_csv(io.StringIO(
+        "username,description,status\n"
+        "\n"
+        'multiline,"first\nsecond",\n'
+        "badstatus,,nope\n",
+    )))
+    importer.run(read_json(io.StringIO(
+        '{"username": "object"}\n'
+        "42\n"
+        '"text"\n'
+        '{"username": "unknown", "status": "nope"}\n',
+    )))
+
+    assert importer.imported == 2
+    assert importer.errors == [
+        (5, "unknown status 'nope'"),
+        (2, "not an object"),
+        (3, "not an object"),
+        (4, "unknown status 'nope'"),
+    ]
+
+
+def test_existing_and_invalid_rows_are_skipped(db, user_statuses):
+    User.objects.create(username="taken")
+    rows = read_csv(io.StringIO(
+        "username,department,status,phone\n"
+        "taken,,,\n"
+        "new,,,\n"
+        "new,,,\n"
+        ",,,\n"
+        "nodep,Unknown,,\n"
+        "badstatus,,nope,\n"
+        "badphone,,,abc\n",
+    ))
+    importer = UserImporter()
+    importer.run(rows)
+
+    assert importer.imported == 1
+    assert importer.skipped == 2
+    assert [number for number, _ in importer.errors] == [5, 6, 7, 8]
+    assert UserProfile.objects.filter(user__username="new").exists()
+
+
+def test_create_departments(db, user_statuses):
+    importer = UserImporter(create_departments=True)
+    importer.run(read_csv(io.StringIO(
+        "username,department\nfirst,New branch\nsecond,new branch\n",
+    )))
+    profiles = UserProfile.objects.filter(
+        user__username__in=["first", "second"],
+    )
+    assert {profile.department.title for profile in profiles} == {
+        "New branch",
+    }
+
+
+def test_failed_chunk_forgets_created_departments(db, user_statuses,
+                                                  monkeypatch):
+    move_profiles = OrgUnit.move_profiles
+
+    def fail_once(*args):
+        monkeypatch.setattr(OrgUnit, "move_profiles", move_profiles)
+        raise DatabaseError("connection lost")
+
+    monkeypatch.setattr(OrgUnit, "move_profiles", fail_once)
+    importer = UserImporter(create_departments=True)
+    rows = [(2, {"username": "retried", "department": "Night shift"})]
+    with pytest.raises(DatabaseError):
+        importer.run(rows)
+    assert not UserDepartment.objects.filter(title="Night shift").exists()
+
+    importer.run(rows)
+    profile = UserProfile.objects.get(user__username="retried")
+    assert profile.department.title == "Night shift"
+    assert importer.imported == 1
+
+
+def test_queries_do_not_depend_on_rows(db, user_statuses, user_departments):
+    department = user_departments[0].title
+
+    def import_queries(count, start):
+        rows = read_csv(io.StringIO(csv_rows(count, department, start)))
+        with CaptureQueriesContext(connection) as context:
+            UserImporter(chunk_size=50).run(rows)
+        return len(context.captured_queries)
+
+    assert import_queries(5, 0) == import_queries(40, 100)
+    assert UserProfile.objects.filter(
+        user__username__startswith="import_",
+    ).count() == 45
@@ -0,0 +1,66 @@
+import pytest
+import redis
+from apps.account import cache
+from apps.account.models import status_lookup
+
+
+class FakeRedis:
+    """
+        The redis-py calls of the lookup cache over a dict, every call
+        raises `error` while it is set.
+    """
+    def __init__(self):
+        self.data = {}
+        self.error = None
+
+    def check(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    def get(self, key):
+        self.check()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None) -> None:
+        self.check()
+        self.data[key] = value
+
+    def incr(self, key) -> int:
+        self.check()
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(cache, "get_redis", lambda: client)
+    monkeypatch.setattr(cache, "pending_bumps", set())
+    return client
+
+
+def test_failed_bump_is_made_by_the_next_read(
+    fake_redis, settings, user_statuses,
+):
+    settings.LOOKUP_CACHE_LOCAL_TTL = 0
+    status_lookup.all()
+    fake_redis.error = redis.ConnectionError("connection refused")
+
+    status_lookup._bump_version()
+    while_down = status_lookup.all()
+    fake_redis.error = None
+    after = status_lookup.all()
+
+    assert cache.pending_bumps == set()
+    assert fake_redis.data[status_lookup.version_key] == 1
+    assert status_lookup.data_key(1) in fake_redis.data
+    assert len(while_down) == len(after) == len(user_statuses)
+
+
+def test_bump_clears_a_pending_one(fake_redis):
+    cache.pending_bumps.add(status_lookup.name)
+
+    status_lookup._bump_version()
+
+    assert cache.pending_bumps == set()
+    assert fake_redis.data[status_lookup.version_key] == 1
@@ -0,0 +1,115 @@
+import io
+
+from django.core.management import call_command
+from apps.account.models import OrgUnit, UserDepartment, UserProfile
+
+
+def create_department(title: str, **levels) -> UserDepartment:
+    return UserDepartment.objects.create(title=title, **levels)
+
+
+def test_departments_build_tree(db):
+    sales = create_department(
+        "Sales", block="Commerce", department="Sales", group="Retail",
+    )
+    marketing = create_department(
+        "Marketing", block="Commerce", department="Marketing",
+    )
+
+    commerce = OrgUnit.objects.get(level="block", name="Commerce")
+    assert commerce.parent is None
+    assert commerce.path == f"/{commerce.pk}/"
+    assert sales.org_unit.level == "group"
+    assert sales.org_unit.parent.parent == commerce
+    assert sales.org_unit.path.startswith(commerce.path)
+    assert marketing.org_unit.parent == commerce
+
+
+def test_headcounts_follow_profiles(db, create_profile, headcounts):
+    retail = create_department(
+        "Retail", block="Commerce", department="Sales", group="Retail",
+    )
+    wholesale = create_department(
+        "Wholesale", block="Commerce", department="Sales", group="Wholesale",
+    )
+    hr = create_department("HR", block="Staff")
+    profiles = [
+        create_profile(f"tree_user_{n}", department=retail)
+        for n in range(3)
+    ]
+    assert headcounts() == {
+        "Commerce": 3, "Sales": 3, "Retail": 3, "Wholesale": 0, "Staff": 0,
+    }
+
+    profiles[0].department = wholesale
+    profiles[0].save()
+    profiles[1].department = hr
+    profiles[1].save()
+    profiles[2].delete()
+    assert headcounts() == {
+        "Commerce": 1, "Sales": 1, "Retail": 0, "Wholesale": 1, "Staff": 1,
+    }
+
+    hr.block = "Commerce"
+    hr.department = "People"
+    hr.save()
+    # The "Staff" block is left empty and deleted.
+    expected = {
+        "Commerce": 2, "Sales": 1, "Retail": 0, "Wholesale": 1, "People": 1,
+    }
+    assert headcounts() == expected
+    OrgUnit.recount()
+    assert headcounts() == expected
+
+
+def test_subtree_members(db, create_profile):
+    retail = create_department(
+        "Retail", block="Commerce", department="Sales", group="Retail",
+    )
+    hr = create_department("HR", block="Staff")
+    member = create_profile("subtree_member", department=retail)
+    create_profile("subtree_other", department=hr)
+
+    sales = OrgUnit.objects.get(name="Sales")
+    assert list(
+        UserProfile.objects.filter(
+            department__org_unit__path__startswith=sales.path,
+        ),
+    ) == [member]
+
+
+def test_moves_delete_empty_units(db, create_profile, headcounts):
+    retail = create_department(
+        "Retail", block="Commerce", department="Sales", group="Retail",
+    )
+    create_department("Wholesale", block="Commerce", department="Sales")
+    create_profile("moved_member", department=retail)
+
+    retail.department = "Trade"
+    retail.group = None
+    retail.save()
+    assert headcounts() == {"Commerce": 1, "Sales": 0, "Trade": 1}
+
+    retail.block = "Shops"
+    retail.save()
+    assert headcounts() == {
+        "Commerce": 0, "Sales": 0, "Shops": 1, "Trade": 1,
+    }
+    assert OrgUnit.objects.get(name="Trade").parent.name == "Shops"
+
+
+def test_rebuild_deletes_empty_units(db, create_profile, headcounts):
+    retail = create_department(
+        "Retail", block="Commerce", department="Sales", group="Retail",
+    )
+    hr = create_department("HR", block="Staff")
+    create_profile("rebuilt_member", department=retail)
+    UserDepartment.objects.filter(pk=retail.pk).update(
+        department=None, group=None,
+    )
+    hr.delete()
+
+    out = io.StringIO()
+    call_command("rebuild_org_tree", stdout=out)
+    assert headcounts() == {"Commerce": 1}
+    assert "deleted 3 empty ones" in out.getvalue()
@@ -0,0 +1,54 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.account.models import UserProfile
+from apps.account.search import phone_condition
+
+
+def test_phone_formats_are_stored(db, settings, create_profile):
+    settings.PHONE_NUMBERS_REGION = "GB"
+    profile = create_profile(
+        "phone_user",
+        mobile_phone="+7 912 345-67-89",
+        phone="020 7946 0018",
+    )
+
+    profile = UserProfile.objects.get(pk=profile.pk)
+    assert profile.mobile_phone_e164 == "+79123456789"
+    assert profile.mobile_phone_national == "8 (912) 345-67-89"
+    assert profile.phone_e164 == "+442079460018"
+    assert profile.phone_national == "020 7946 0018"
+    assert profile.show_phone() == "+442079460018"
+
+    profile.phone = None
+    profile.save(update_fields=["phone"])
+    profile.refresh_from_db()
+    assert profile.phone_e164 is None
+    assert profile.phone_national is None
+
+
+def test_reverse_phone_lookup(db, settings, create_profile):
+    settings.PHONE_NUMBERS_REGION = "GB"
+    profile = create_profile("caller_user", phone="020 7946 0018")
+
+    condition = phone_condition("+44 (20) 7946-0018")
+    with CaptureQueriesContext(connection) as context:
+        found = list(UserProfile.objects.filter(condition))
+    assert found == [profile]
+    assert '"phone_e164" = ' in context.captured_queries[0]["sql"]
+    assert phone_condition("Ivanov") is None
+
+
+def test_backfill_phones(db, settings, create_profile):
+    settings.PHONE_NUMBERS_REGION = "GB"
+    profile = create_profile("backfill_user", mobile_phone="+79123456789")
+    UserProfile.objects.filter(pk=profile.pk).update(
+        mobile_phone_e164=None,
+        mobile_phone_national=None,
+    )
+
+    call_command("backfill_phones", chunk_size=1, verbosity=0)
+
+    profile.refresh_from_db()
+    assert profile.mobile_phone_e164 == "+79123456789"
+    assert profile.mobile_phone_national == "8 (912) 345-67-89"
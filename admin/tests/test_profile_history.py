@@ -0,0 +1,91 @@
+import pytest
+
+from django.db import DatabaseError, connection, transaction
+from apps.account.bulk import update_profiles
+from apps.account.models import ProfileHistory, UserDepartment, UserProfile
+
+
+def moment():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT clock_timestamp()")
+        return cursor.fetchone()[0]
+
+
+@pytest.fixture
+def departments():
+    return (
+        UserDepartment.objects.create(title="Sales", block="Commerce"),
+        UserDepartment.objects.create(title="Support", block="Commerce"),
+    )
+
+
+def test_history_keeps_changed_fields_only(db, departments, create_profile):
+    sales, support = departments
+    profile = create_profile("history_changes", last_name="Ivanov",
+                             department=sales)
+    profile.save()
+    profile.post = "Manager"
+    profile.save()
+
+    entries = list(ProfileHistory.objects.filter(profile_id=profile.pk))
+    assert [entry.operation for entry in entries] == ["I", "U", "U"]
+    assert entries[1].changes == {
+        "last_name": "Ivanov", "department_id": sales.pk,
+    }
+    assert entries[2].changes == {"post": "Manager"}
+
+
+def test_profile_as_of(db, departments, create_profile):
+    sales, support = departments
+    before = moment()
+    profile = create_profile("history_as_of", last_name="Petrov",
+                             department=sales, post="Clerk")
+    in_sales = moment()
+    profile.department = support
+    profile.post = None
+    profile.save()
+    in_support = moment()
+    profile_id = profile.pk
+    profile.delete()
+
+    assert ProfileHistory.profile_as_of(profile_id, before) is None
+    fields = ProfileHistory.profile_as_of(profile_id, in_sales)
+    assert fields["department_id"] == sales.pk
+    assert fields["post"] == "Clerk"
+    fields = ProfileHistory.profile_as_of(profile_id, in_support)
+    assert fields["department_id"] == support.pk
+    assert fields["post"] is None
+    assert ProfileHistory.profile_as_of(profile_id, moment()) is None
+
+
+def test_department_as_of_follows_bulk_moves(db, departments,
+                                             create_profile):
+    sales, support = departments
+    profiles = [
+        create_profile(f"history_department_{number}", department=sales)
+        for number in range(3)
+    ]
+    all_in_sales = moment()
+    update_profiles(
+        UserProfile.objects.filter(pk__in=[p.pk for p in profiles[:2]]),
+        department=support,
+    )
+    moved = moment()
+
+    assert set(ProfileHistory.department_as_of(sales.pk, all_in_sales)) == {
+        profile.pk for profile in profiles
+    }
+    assert ProfileHistory.department_as_of(sales.pk, moved) == [
+        profiles[2].pk,
+    ]
+    assert set(ProfileHistory.department_as_of(support.pk, moved)) == {
+        profile.pk for profile in profiles[:2]
+    }
+
+
+def test_history_is_append_only(db, create_profile):
+    create_profile("history_append_only", post="Clerk")
+    with pytest.raises(DatabaseError), transaction.atomic():
+        ProfileHistory.objects.update(changes={})
+    with pytest.raises(DatabaseError), transaction.atomic():
+        ProfileHistory.objects.all().delete()
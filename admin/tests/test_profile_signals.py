@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from apps.account.models import UserProfile
+
+
+def test_department_change_touches_profiles(db, user_departments):
+    department, other = user_departments[:2]
+    for number in range(2):
+        user = User.objects.create(username=f"signal_user_{number}")
+        UserProfile.objects.filter(user=user).update(
+            department=department if number == 0 else other,
+        )
+    before = dict(UserProfile.objects.values_list("uuid", "updated_time"))
+
+    department.title = "Renamed"
+    department.save()
+
+    after = dict(UserProfile.objects.values_list("uuid", "updated_time"))
+    changed = [uuid for uuid in after if after[uuid] != before[uuid]]
+    assert changed == list(
+        UserProfile.objects.filter(department=department)
+        .values_list("uuid", flat=True),
+    )
+
+
+def test_login_does_not_write_profile(client, django_user_model):
+    django_user_model.objects.create_user(
+        username="login_user",
+        password="login-password",
+        is_staff=True,
+    )
+    updated_time = UserProfile.objects.get(
+        user__username="login_user",
+    ).updated_time
+
+    with CaptureQueriesContext(connection) as context:
+        response = client.post(
+            reverse("admin:login"),
+            {"username": "login_user", "password": "login-password"},
+        )
+    assert response.status_code == 302
+    queries = [
+        query["sql"] for query in context.captured_queries
+        if "SAVEPOINT" not in query["sql"]
+    ]
+    assert not [sql for sql in queries if "user_profile" in sql]
+    # The user, last_login and three session queries, no profile queries.
+    assert len(queries) == 5, queries
+    assert UserProfile.objects.get(
+        user__username="login_user",
+    ).updated_time == updated_time
+
+
+def test_user_save_writes_only_changed_profile(db):
+    user = User.objects.create(username="profile_owner")
+    user = User.objects.select_related("user_profile").get(pk=user.pk)
+    updated_time = user.user_profile.updated_time
+
+    with CaptureQueriesContext(connection) as context:
+        user.save()
+    assert len(context.captured_queries) == 1
+
+    user.user_profile.post = "Engineer"
+    with CaptureQueriesContext(connection) as context:
+        user.save()
+    profile_update = context.captured_queries[-1]["sql"]
+    assert "user_profile" in profile_update
+    assert '"last_name"' not in profile_update
+    profile = UserProfile.objects.get(user=user)
+    assert profile.post == "Engineer"
+    assert profile.updated_time > updated_time
@@ -0,0 +1,92 @@
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from apps.account.database import (
+    check_connections,
+    is_pinned,
+    release_connections,
+    reset_pinning,
+)
+from apps.account.middleware import ReplicaPinningMiddleware
+from apps.account.models import OrgUnit, UserProfile, UserStatus
+
+COOKIE = ReplicaPinningMiddleware.cookie_name
+
+
+def test_reads_go_to_replicas_until_a_write(settings):
+    settings.DATABASE_REPLICAS = ["replica_1"]
+    reset_pinning()
+    try:
+        assert router.db_for_read(UserProfile) == "replica_1"
+        assert router.db_for_read(UserStatus) == "replica_1"
+        assert router.db_for_read(User) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(OrgUnit) == DEFAULT_DB_ALIAS
+
+        assert router.db_for_write(UserStatus) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(UserProfile) == DEFAULT_DB_ALIAS
+    finally:
+        reset_pinning()
+
+
+def test_without_replicas_everything_reads_the_primary(settings):
+    settings.DATABASE_REPLICAS = []
+    reset_pinning()
+    assert router.db_for_read(UserProfile) == DEFAULT_DB_ALIAS
+    assert router.allow_migrate("replica_1", "account") is False
+
+
+def test_middleware_pins_clients_after_a_write(settings):
+    settings.DATABASE_REPLICAS = ["replica_1"]
+    factory = RequestFactory()
+    reads = []
+
+    def view(request):
+        reads.append(router.db_for_read(UserProfile))
+        if request.method == "POST":
+            router.db_for_write(UserProfile)
+        return HttpResponse()
+
+    middleware = ReplicaPinningMiddleware(view)
+    response = middleware(factory.post("/"))
+    assert response.cookies[COOKIE]["max-age"] == (
+        settings.DATABASE_REPLICA_PIN_SECONDS
+    )
+    assert COOKIE not in middleware(factory.get("/")).cookies
+
+    request = factory.get("/")
+    request.COOKIES[COOKIE] = "1"
+    middleware(request)
+    assert reads == ["replica_1", "replica_1", DEFAULT_DB_ALIAS]
+    assert not is_pinned()
+
+
+class FakeConnection:
+    def __init__(self, alias: str, usable: bool):
+        self.alias = alias
+        self.usable = usable
+        self.connection = object()
+        self.in_atomic_block = False
+
+    def is_usable(self) -> bool:
+        return self.usable
+
+    def close(self) -> None:
+        self.connection = None
+
+
+def test_unusable_idle_connections_are_closed(settings, monkeypatch):
+    usable = FakeConnection("default", True)
+    dropped = FakeConnection("replica_1", False)
+    monkeypatch.setattr(
+        "apps.account.database.connections.all", lambda: [usable, dropped],
+    )
+    settings.DATABASE_HEALTH_CHECK_INTERVAL = 60
+    release_connections()
+    check_connections()
+    assert dropped.connection is not None
+
+    settings.DATABASE_HEALTH_CHECK_INTERVAL = 0
+    check_connections()
+    assert usable.connection is not None
+    assert dropped.connection is None
@@ -0,0 +1,59 @@
+import logging
+
+import pytest
+from django.urls import reverse
+
+CHANGELIST = "admin:account_userprofile_changelist"
+
+
+def request_records(caplog, level):
+    return [
+        record for record in caplog.records
+        if record.name == "apps.account.middleware"
+        and record.levelno == level
+    ]
+
+
+@pytest.mark.django_db
+def test_request_is_logged_with_queries_and_cache(
+    admin_client, caplog, settings, user_statuses,
+):
+    settings.REQUEST_SLOW_THRESHOLD = 60
+    with caplog.at_level(logging.INFO, logger="apps.account.middleware"):
+        response = admin_client.get(reverse(CHANGELIST))
+    assert response.status_code == 200
+    [record] = request_records(caplog, logging.INFO)
+    fields = record.request_metrics
+    assert fields["view"] == CHANGELIST
+    assert fields["status"] == 200
+    assert fields["queries"] > 0
+    assert fields["cache_hits"] + fields["cache_misses"] > 0
+    assert fields["size"] == len(response.content)
+    assert f"queries={fields['queries']}" in record.getMessage()
+    assert not request_records(caplog, logging.WARNING)
+
+
+@pytest.mark.django_db
+def test_slow_request_logs_sql(admin_client, caplog, settings):
+    settings.REQUEST_SLOW_THRESHOLD = 0
+    with caplog.at_level(logging.INFO, logger="apps.account.middleware"):
+        admin_client.get(reverse(CHANGELIST))
+    [record] = request_records(caplog, logging.WARNING)
+    assert "Slow request GET" in record.getMessage()
+    assert 'FROM "content"."user_profile"' in record.getMessage()
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint(admin_client, client):
+    admin_client.get(reverse(CHANGELIST))
+    response = client.get(reverse("metrics"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        f'http_requests_total{{method="GET",view="{CHANGELIST}",'
+        f'status="200"}}'
+    ) in body
+    assert 'http_request_db_queries_bucket{method="GET"' in body
+    assert 'cache_requests_total{cache="lookup",result=' in body
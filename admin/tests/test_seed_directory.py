@@ -0,0 +1,79 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from apps.account import factories
+from apps.account.models import (
+    DirectoryEntry,
+    OrgUnit,
+    UserDepartment,
+    UserProfile,
+)
+from apps.account.seeding import DirectorySeeder, clear
+
+
+def seeded_profiles() -> list:
+    return list(
+        UserProfile.objects.filter(
+            user__username__startswith=factories.USERNAME_PREFIX,
+        ).order_by("user__username").values_list(
+            "uuid", "last_name", "status_id", "mobile_phone_national",
+        ),
+    )
+
+
+def test_seed_directory(db):
+    call_command(
+        "seed_directory", "--users", "120", "--chunk-size", "50",
+        stdout=io.StringIO(),
+    )
+    profiles = UserProfile.objects.filter(
+        user__username__startswith=factories.USERNAME_PREFIX,
+    )
+    assert profiles.count() == 120
+    assert profiles.filter(status__isnull=False).count() == 120
+    assert not profiles.filter(department__isnull=True).exists()
+    assert not profiles.filter(mobile_phone_e164__isnull=True).exists()
+    assert DirectoryEntry.objects.filter(
+        username__startswith=factories.USERNAME_PREFIX,
+    ).count() == 120
+    assert sum(
+        OrgUnit.objects.filter(parent=None).values_list(
+            "headcount", flat=True,
+        ),
+    ) == 120
+    profile = profiles.select_related("user").first()
+    assert profile.user.last_name == profile.last_name
+    assert not profile.user.has_usable_password()
+
+
+def test_seed_is_repeatable_and_topped_up(db):
+    DirectorySeeder(seed=7, chunk_size=40).run(80)
+    profiles = seeded_profiles()
+    DirectorySeeder(seed=7, chunk_size=40).run(80)
+    assert seeded_profiles() == profiles
+
+    clear()
+    assert not User.objects.filter(
+        username__startswith=factories.USERNAME_PREFIX,
+    ).exists()
+    assert not UserDepartment.objects.filter(
+        title__startswith=factories.DEPARTMENT_PREFIX,
+    ).exists()
+
+    DirectorySeeder(seed=7, chunk_size=40).run(40)
+    DirectorySeeder(seed=7, chunk_size=40).run(80)
+    assert seeded_profiles() == profiles
+
+
+def test_clear_without_users_only_clears(db):
+    DirectorySeeder(seed=7, chunk_size=40).run(40)
+    call_command(
+        "seed_directory", "--clear", "--users", "0", stdout=io.StringIO(),
+    )
+    assert not User.objects.filter(
+        username__startswith=factories.USERNAME_PREFIX,
+    ).exists()
+    assert not UserDepartment.objects.filter(
+        title__startswith=factories.DEPARTMENT_PREFIX,
+    ).exists()
@@ -0,0 +1,54 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from apps.account.models import UserStatus
+from apps.account.startup import parse_importtime, summarize_imports
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |     django.utils.version
+import time:       200 |       1100 |   django.utils
+import time:       500 |       1600 | django
+import time:      2000 |       2000 | redis
+"""
+
+
+def prepare_service() -> str:
+    stdout = io.StringIO()
+    call_command("prepare_service", stdout=stdout, stderr=io.StringIO())
+    return stdout.getvalue()
+
+
+def test_prepare_service_skips_done_steps(db, settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STARTUP_LOCALES = []
+    UserStatus.objects.filter(pk=1).update(title="Changed")
+
+    output = prepare_service()
+    assert "collectstatic: done" in output
+    assert "loaddata: done" in output
+    assert "superuser: done" in output
+    assert (tmp_path / "admin").is_dir()
+    assert UserStatus.objects.get(pk=1).title != "Changed"
+    assert User.objects.get(username=settings.STARTUP_SUPERUSER).is_superuser
+
+    output = prepare_service()
+    assert "done" not in output
+    assert "migrate: up to date" in output
+
+
+def test_parse_importtime():
+    imports = parse_importtime(IMPORTTIME)
+    assert [row["name"] for row in imports] == [
+        "_io", "django.utils.version", "django.utils", "django", "redis",
+    ]
+    assert [row["depth"] for row in imports] == [1, 2, 1, 0, 0]
+    assert imports[3]["cumulative"] == 1.6
+
+    summary = summarize_imports(imports, limit=2)
+    assert summary["total"] == 3.6
+    assert [row["name"] for row in summary["imports"]] == ["redis", "django"]
+    assert summary["packages"][0] == {"name": "redis", "self": 2.0}
+    assert summary["packages"][1]["name"] == "django"
@@ -0,0 +1,70 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from apps.account.models import TableVersion, UserDepartment, UserStatus
+
+
+def commit_bumps() -> None:
+    """
+        Runs the deferred version bumps as the commit would, the test stays
+        in its transaction.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+
+
+def versions() -> dict:
+    commit_bumps()
+    return dict(TableVersion.objects.values_list("name", "version"))
+
+
+def test_writes_bump_table_versions(db, user_statuses):
+    before = versions()
+    department = UserDepartment.objects.create(
+        title="Sales", block="Commerce",
+    )
+    after_create = versions()
+    assert after_create["user_department"] > before["user_department"]
+    assert after_create["org_unit"] > before["org_unit"]
+    assert after_create["directory_entry"] == before["directory_entry"]
+
+    UserStatus.objects.filter(pk=user_statuses[0].pk).update(title="Busy")
+    assert versions()["user_status"] == after_create["user_status"] + 1
+
+    department.title = "Retail"
+    department.save()
+    commit_bumps()
+    updated = TableVersion.objects.get(name="user_department")
+    assert updated.version > after_create["user_department"]
+    assert updated.updated_time is not None
+
+
+def test_profile_changes_bump_directory_version(db, user_statuses):
+    before = versions()["directory_entry"]
+    user = User.objects.create(username="versioned_user")
+    created = versions()["directory_entry"]
+    assert created > before
+
+    profile = user.user_profile
+    profile.post = "Analyst"
+    profile.save()
+    assert versions()["directory_entry"] > created
+
+
+def test_versions_are_bumped_at_commit(db, user_statuses):
+    before = versions()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT now()")
+        (started,) = cursor.fetchone()
+
+    UserStatus.objects.filter(pk=user_statuses[0].pk).update(title="Busy")
+    UserStatus.objects.filter(pk=user_statuses[0].pk).update(title="Away")
+    UserStatus.objects.filter(pk=-1).update(title="Nobody")
+    assert TableVersion.objects.get(name="user_status").version == (
+        before["user_status"]
+    )
+
+    commit_bumps()
+    bumped = TableVersion.objects.get(name="user_status")
+    assert bumped.version == before["user_status"] + 1
+    assert bumped.updated_time > started
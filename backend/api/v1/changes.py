@@ -0,0 +1,59 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, WebSocket, status
+
+from services.changes import ChangeFeed, get_change_feed
+
+router = APIRouter()
+
+
+async def wait_disconnect(websocket: WebSocket) -> None:
+    """
+        Messages from the client, text or binary, are ignored, reading them
+        is how a closed connection is noticed while no event is sent.
+    """
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/")
+async def change_stream(
+    websocket: WebSocket,
+    department: Optional[list[int]] = Query(
+        None,
+        description="Only profile events of these departments.",
+    ),
+    feed: ChangeFeed = Depends(get_change_feed),
+) -> None:
+    """
+        Stream of directory change events as JSON text messages, for
+        example `{"type": "profile", "op": "update", "id": "<uuid>",
+        "department": 3, "status": 2}`. Profile events carry the department
+        the person is in and the one they left, status and department
+        events carry the id of the row. An event without `id` reports a
+        bulk change and a `resync` event lost events, the client reloads
+        what it shows in both cases. A client too slow to keep up is
+        closed with code 1013.
+    """
+    await websocket.accept()
+    async with feed.subscribe(set(department or ())) as subscription:
+        disconnected = asyncio.create_task(wait_disconnect(websocket))
+        try:
+            while True:
+                event = asyncio.create_task(subscription.get())
+                await asyncio.wait(
+                    {event, disconnected},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected.done():
+                    event.cancel()
+                    return
+                if event.result() is None:
+                    await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                    return
+                await websocket.send_text(event.result())
+        finally:
+            disconnected.cancel()
@@ -0,0 +1,67 @@
+from datetime import datetime
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from core.conditional import validators
+from models.profile import Department, ProfileAsOf
+from services.history import HistoryService, get_history_service
+from services.lookup import (
+    DEPARTMENT_LOOKUP,
+    LookupService,
+    get_lookup_service,
+)
+
+router = APIRouter()
+
+department_validators = Depends(validators(lookups=(DEPARTMENT_LOOKUP,)))
+
+
+@router.get(
+    "/",
+    response_model=list[Department],
+    dependencies=[department_validators],
+    summary="Departments list",
+    description="Company structure units.",
+)
+async def department_list(
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> list[Department]:
+    departments = await lookup_service.departments()
+    return [Department(**row) for row in departments.values()]
+
+
+@router.get(
+    "/{department_id}",
+    response_model=Department,
+    dependencies=[department_validators],
+    summary="Department details",
+)
+async def department_details(
+    department_id: int,
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> Department:
+    departments = await lookup_service.departments()
+    if department_id not in departments:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="department not found",
+        )
+    return Department(**departments[department_id])
+
+
+@router.get(
+    "/{department_id}/profiles/as-of",
+    response_model=list[ProfileAsOf],
+    summary="Department members as of a moment",
+    description=(
+        "Profiles that were in the department at the given time, as they "
+        "were then."
+    ),
+)
+async def department_profiles_as_of(
+    department_id: int,
+    at: datetime = Query(..., description="ISO 8601 time."),
+    history_service: HistoryService = Depends(get_history_service),
+) -> list[ProfileAsOf]:
+    return await history_service.get_department_as_of(department_id, at)
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from core.conditional import table_version, validators
+from models.org_unit import OrgUnit
+from models.profile import ProfilePage
+from services.org_unit import OrgUnitService, get_org_unit_service
+from services.pagination import InvalidCursor
+from services.lookup import DEPARTMENT_LOOKUP, STATUS_LOOKUP
+from services.profile import ProfileService, get_profile_service
+from services.version import DIRECTORY_TABLE, ORG_UNIT_TABLE
+
+router = APIRouter()
+
+org_unit_validators = Depends(validators(tables=(ORG_UNIT_TABLE,)))
+member_validators = Depends(validators(
+    tables=(ORG_UNIT_TABLE, DIRECTORY_TABLE),
+    lookups=(STATUS_LOOKUP, DEPARTMENT_LOOKUP),
+))
+directory_version = Depends(table_version(DIRECTORY_TABLE))
+
+
+async def get_unit(
+    unit_id: int,
+    org_unit_service: OrgUnitService = Depends(get_org_unit_service),
+) -> OrgUnit:
+    unit = await org_unit_service.get_by_id(unit_id)
+    if not unit:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="structure unit not found",
+        )
+    return unit
+
+
+@router.get(
+    "/",
+    response_model=list[OrgUnit],
+    dependencies=[org_unit_validators],
+    summary="Company structure",
+    description="Structure units in tree order with their headcounts.",
+)
+async def org_unit_tree(
+    org_unit_service: OrgUnitService = Depends(get_org_unit_service),
+) -> list[OrgUnit]:
+    return await org_unit_service.get_tree()
+
+
+@router.get(
+    "/{unit_id}",
+    response_model=OrgUnit,
+    dependencies=[org_unit_validators],
+    summary="Structure unit details",
+)
+async def org_unit_details(unit: OrgUnit = Depends(get_unit)) -> OrgUnit:
+    return unit
+
+
+@router.get(
+    "/{unit_id}/profiles",
+    response_model=ProfilePage,
+    dependencies=[member_validators],
+    summary="Structure unit members",
+    description="Profiles of the unit and of all units below it.",
+)
+async def org_unit_profiles(
+    unit: OrgUnit = Depends(get_unit),
+    page_size: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    version: Optional[int] = directory_version,
+    profile_service: ProfileService = Depends(get_profile_service),
+) -> ProfilePage:
+    try:
+        return await profile_service.get_list(
+            page_size, cursor, org_unit_path=unit.path, version=version,
+        )
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="invalid cursor",
+        )
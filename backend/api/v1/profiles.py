@@ -0,0 +1,196 @@
+from datetime import datetime
+from http import HTTPStatus
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from core.conditional import table_version, validators
+from core.export import WRITERS
+from core.phone import to_e164
+from models.profile import (
+    Profile,
+    ProfileAsOf,
+    ProfileChange,
+    ProfilePage,
+    ProfileSearchResult,
+)
+from services.export import (
+    EXPORT_RETRY_AFTER,
+    ExportService,
+    get_export_service,
+)
+from services.history import HistoryService, get_history_service
+from services.lookup import DEPARTMENT_LOOKUP, STATUS_LOOKUP
+from services.pagination import InvalidCursor
+from services.profile import ProfileService, get_profile_service
+from services.search import ProfileSearchService, get_search_service
+from services.version import DIRECTORY_TABLE
+
+router = APIRouter()
+
+directory_validators = Depends(validators(
+    tables=(DIRECTORY_TABLE,),
+    lookups=(STATUS_LOOKUP, DEPARTMENT_LOOKUP),
+))
+directory_version = Depends(table_version(DIRECTORY_TABLE))
+
+
+@router.get(
+    "/",
+    response_model=ProfilePage,
+    dependencies=[directory_validators],
+    summary="Profiles list",
+    description="Company directory ordered by last and first name.",
+)
+async def profile_list(
+    page_size: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    version: Optional[int] = directory_version,
+    profile_service: ProfileService = Depends(get_profile_service),
+) -> ProfilePage:
+    try:
+        return await profile_service.get_list(
+            page_size, cursor, version=version,
+        )
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="invalid cursor",
+        )
+
+
+@router.get(
+    "/search",
+    response_model=ProfileSearchResult,
+    summary="Profiles search",
+    description=(
+        "Prefix and fuzzy search by names, post and department with "
+        "facet counts by status and department."
+    ),
+)
+async def profile_search(
+    query: str = Query(..., min_length=1, max_length=100),
+    status: Optional[int] = Query(None),
+    department: Optional[int] = Query(None),
+    page: int = Query(1, ge=1, le=100),
+    page_size: int = Query(20, ge=1, le=100),
+    search_service: ProfileSearchService = Depends(get_search_service),
+) -> ProfileSearchResult:
+    return await search_service.search(
+        query,
+        status=status,
+        department=department,
+        page=page,
+        page_size=page_size,
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary="Profiles export",
+    description=(
+        "Whole directory as a CSV or XLSX file, streamed. Answered with a "
+        "503 while too many exports are running."
+    ),
+)
+async def profile_export(
+    file_format: str = Query("csv", alias="format", regex="^(csv|xlsx)$"),
+    export_service: ExportService = Depends(get_export_service),
+) -> StreamingResponse:
+    if export_service.busy():
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail="too many exports running",
+            headers={"Retry-After": str(EXPORT_RETRY_AFTER)},
+        )
+    writer = WRITERS[file_format]
+    filename = f"directory-{datetime.utcnow():%Y%m%d-%H%M%S}.{file_format}"
+    return StreamingResponse(
+        export_service.stream(file_format),
+        headers={
+            # Given as it is, starlette adds a second charset to a text
+            # `media_type`.
+            "Content-Type": writer.content_type,
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
+
+
+@router.get(
+    "/phone/{phone}",
+    response_model=list[Profile],
+    dependencies=[directory_validators],
+    summary="Profiles by phone number",
+    description=(
+        "Reverse lookup of a mobile or other phone number in any format, "
+        "for caller ID."
+    ),
+)
+async def profile_by_phone(
+    phone: str,
+    profile_service: ProfileService = Depends(get_profile_service),
+) -> list[Profile]:
+    e164 = to_e164(phone)
+    if e164 is None:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail="invalid phone number",
+        )
+    return await profile_service.get_by_phone(e164)
+
+
+@router.get(
+    "/{profile_id}",
+    response_model=Profile,
+    dependencies=[directory_validators],
+    summary="Profile details",
+    description="User profile with status and department.",
+)
+async def profile_details(
+    profile_id: UUID,
+    version: Optional[int] = directory_version,
+    profile_service: ProfileService = Depends(get_profile_service),
+) -> Profile:
+    profile = await profile_service.get_by_id(profile_id, version)
+    if not profile:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="profile not found",
+        )
+    return profile
+
+
+@router.get(
+    "/{profile_id}/history",
+    response_model=list[ProfileChange],
+    summary="Profile history",
+    description="Changes of the profile fields, newest first.",
+)
+async def profile_history(
+    profile_id: UUID,
+    history_service: HistoryService = Depends(get_history_service),
+) -> list[ProfileChange]:
+    return await history_service.get_changes(profile_id)
+
+
+@router.get(
+    "/{profile_id}/as-of",
+    response_model=ProfileAsOf,
+    summary="Profile as of a moment",
+    description="User profile as it was at the given time.",
+)
+async def profile_as_of(
+    profile_id: UUID,
+    at: datetime = Query(..., description="ISO 8601 time."),
+    history_service: HistoryService = Depends(get_history_service),
+) -> ProfileAsOf:
+    profile = await history_service.get_as_of(profile_id, at)
+    if not profile:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="profile did not exist",
+        )
+    return profile
@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from core.conditional import validators
+from models.profile import Status
+from services.lookup import (
+    STATUS_LOOKUP,
+    LookupService,
+    get_lookup_service,
+)
+
+router = APIRouter()
+
+status_validators = Depends(validators(lookups=(STATUS_LOOKUP,)))
+
+
+@router.get(
+    "/",
+    response_model=list[Status],
+    dependencies=[status_validators],
+    summary="Statuses list",
+    description="User statuses in the system.",
+)
+async def status_list(
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> list[Status]:
+    statuses = await lookup_service.statuses()
+    return [Status(**row) for row in statuses.values()]
+
+
+@router.get(
+    "/{status_id}",
+    response_model=Status,
+    dependencies=[status_validators],
+    summary="Status details",
+)
+async def status_details(
+    status_id: int,
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> Status:
+    statuses = await lookup_service.statuses()
+    if status_id not in statuses:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail="status not found",
+        )
+    return Status(**statuses[status_id])
@@ -0,0 +1,36 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from core.metrics import COALESCED_REQUESTS
+
+
+class SingleFlight:
+    """
+        Runs one call per key at a time, callers asking for a key that is
+        already being loaded wait for that call and share its result or
+        its exception. The call runs in its own task, so a caller that is
+        cancelled, for example when its client disconnects, does not
+        cancel it for the others. Only for reads, the result is shared as
+        it is and must not be changed by the callers.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.flights: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable,
+                 function: Callable[..., Awaitable[Any]], *args) -> Any:
+        task = self.flights.get(key)
+        if task is None:
+            task = asyncio.create_task(function(*args))
+            self.flights[key] = task
+            task.add_done_callback(lambda done: self.landed(key, done))
+        else:
+            COALESCED_REQUESTS.inc(self.name)
+        return await asyncio.shield(task)
+
+    def landed(self, key: Hashable, task: asyncio.Task) -> None:
+        if self.flights.get(key) is task:
+            del self.flights[key]
+        if not task.cancelled():
+            # Retrieved here in case every caller was cancelled.
+            task.exception()
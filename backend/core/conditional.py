@@ -0,0 +1,119 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+from typing import Callable, Optional
+
+from fastapi import Depends, Request, Response
+
+from core import config
+from services.lookup import LookupService, get_lookup_service
+from services.version import VersionService, get_version_service
+
+# Browsers revalidate every time, nginx keeps a response for
+# `HTTP_CACHE_MAX_AGE` seconds and then revalidates it.
+CACHE_CONTROL = f"public, max-age=0, s-maxage={config.HTTP_CACHE_MAX_AGE}"
+
+
+class NotModified(Exception):
+    """
+        The copy the client has is current. Answered with an empty 304 by
+        `not_modified_handler`.
+    """
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+
+async def not_modified_handler(request: Request,
+                               exc: NotModified) -> Response:
+    return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=exc.headers)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+        Weak comparison of `If-None-Match`, nginx turns strong ETags weak
+        when it compresses a response.
+    """
+    if header.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag.removeprefix("W/")
+        for tag in header.split(",")
+    )
+
+
+def not_modified(request: Request, etag: str,
+                 updated_time: Optional[datetime]) -> bool:
+    """
+        `If-None-Match` takes precedence, `If-Modified-Since` is only used
+        without it. The header has whole seconds, a change in the same
+        second as the one the client saw is not told apart from it, so the
+        copy is only current when the change is strictly older.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or updated_time is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return updated_time < since
+
+
+def validators(tables: tuple[str, ...] = (),
+               lookups: tuple[str, ...] = ()) -> Callable:
+    """
+        Route dependency for conditional GET. The `ETag` is a digest of the
+        versions of `tables` and of the rows of `lookups` the response is
+        built from, `Last-Modified` is the time the latest of the tables
+        changed. A client or nginx holding the current copy gets a 304
+        before the endpoint runs its query, otherwise the headers are added
+        to the response and the versions are kept for `table_version`.
+        Route dependencies run before the endpoint's own.
+    """
+    async def check(
+        request: Request,
+        response: Response,
+        version_service: VersionService = Depends(get_version_service),
+        lookup_service: LookupService = Depends(get_lookup_service),
+    ) -> None:
+        parts = []
+        updated_time = None
+        if tables:
+            versions, updated_time = await version_service.get(tables)
+            request.state.table_versions = versions
+            parts += [f"{table}:{versions.get(table, 0)}" for table in tables]
+        for name in lookups:
+            parts.append(f"{name}:{await lookup_service.fingerprint(name)}")
+        digest = hashlib.blake2b(
+            "|".join(parts).encode(), digest_size=8,
+        ).hexdigest()
+        headers = {"ETag": f'W/"{digest}"', "Cache-Control": CACHE_CONTROL}
+        if updated_time is not None:
+            headers["Last-Modified"] = format_datetime(
+                updated_time.astimezone(timezone.utc), usegmt=True,
+            )
+        if not_modified(request, headers["ETag"], updated_time):
+            raise NotModified(headers)
+        response.headers.update(headers)
+
+    return check
+
+
+def table_version(table: str) -> Callable:
+    """
+        Dependency giving the version of `table` the `ETag` of the response
+        was computed from, `None` without `validators` on the route. A read
+        shared between requests is keyed by it, so a request never gets
+        rows read before the change its `ETag` already describes.
+    """
+    def version(request: Request) -> Optional[int]:
+        versions = getattr(request.state, "table_versions", {})
+        return versions.get(table)
+
+    return version
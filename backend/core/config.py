@@ -9,8 +9,62 @@ PROJECT_NAME = os.getenv("PROJECT_NAME", "SCC")
 
 REDIS_HOST = os.getenv("REDIS_HOST", "127.0.0.1")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_POOL_MIN_SIZE = int(os.getenv("REDIS_POOL_MIN_SIZE", 5))
+REDIS_POOL_MAX_SIZE = int(os.getenv("REDIS_POOL_MAX_SIZE", 20))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 1))
+# Seconds between attempts to open the pool while Redis is unreachable.
+REDIS_RECONNECT_INTERVAL = float(os.getenv("REDIS_RECONNECT_INTERVAL", 5))
+
+LOOKUP_CACHE_TIMEOUT = int(os.getenv("LOOKUP_CACHE_TIMEOUT", 86400))
+LOOKUP_CACHE_LOCAL_TTL = float(os.getenv("LOOKUP_CACHE_LOCAL_TTL", 5))
+LOOKUP_CACHE_LOCAL_SIZE = int(os.getenv("LOOKUP_CACHE_LOCAL_SIZE", 128))
 
 ELASTIC_HOST = os.getenv("ELASTIC_HOST", "127.0.0.1")
 ELASTIC_PORT = int(os.getenv("ELASTIC_PORT", 9200))
+ELASTIC_PROFILES_INDEX = os.getenv("ELASTIC_PROFILES_INDEX", "profiles")
+
+SEARCH_CACHE_TIMEOUT = int(os.getenv("SEARCH_CACHE_TIMEOUT", 30))
+
+# Seconds nginx may serve a directory response before revalidating it.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 30))
+
+PHONE_NUMBERS_REGION = os.getenv("PHONE_NUMBERS_REGION", "RU")
+
+POSTGRES_DB = os.getenv("POSTGRES_DB", "scc_db")
+POSTGRES_USER = os.getenv("POSTGRES_USER", "scc_user")
+POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "scc_password")
+POSTGRES_HOST = os.getenv("POSTGRES_HOST", "127.0.0.1")
+POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", 5432))
+POSTGRES_POOL_MIN_SIZE = int(os.getenv("POSTGRES_POOL_MIN_SIZE", 5))
+POSTGRES_POOL_MAX_SIZE = int(os.getenv("POSTGRES_POOL_MAX_SIZE", 20))
+# Exports streamed at once by a process, each holds a pool connection until
+# the file is downloaded. More export requests are answered with a 503.
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", 2))
+
+# Postgres channel the change feed triggers notify, see the admin
+# migration `0010_change_feed`.
+CHANGE_FEED_CHANNEL = os.getenv("CHANGE_FEED_CHANNEL", "directory_changes")
+# Events kept for a slow websocket client before it is disconnected.
+CHANGE_FEED_QUEUE_SIZE = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", 1000))
+CHANGE_FEED_RECONNECT_DELAY = float(
+    os.getenv("CHANGE_FEED_RECONNECT_DELAY", 1),
+)
+
+# Requests taking at least this many seconds are logged with their SQL.
+REQUEST_SLOW_THRESHOLD = float(os.getenv("REQUEST_SLOW_THRESHOLD", 1))
+REQUEST_SQL_CAPTURE_LIMIT = int(os.getenv("REQUEST_SQL_CAPTURE_LIMIT", 100))
+
+# Token bucket per client: requests per second on average and the largest
+# burst, a rate of 0 turns the limiter off. Clients sending one of
+# `RATE_LIMIT_API_KEYS` in `X-API-Key` get a bucket of their own, the
+# others one per address.
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", 20))
+RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", 40))
+RATE_LIMIT_API_KEYS = frozenset(os.getenv("RATE_LIMIT_API_KEYS", "").split())
+# Redis answering slower than this many seconds counts as down, it is
+# tried again after `RATE_LIMIT_REDIS_RETRY` seconds of local buckets.
+RATE_LIMIT_REDIS_TIMEOUT = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", 0.05))
+RATE_LIMIT_REDIS_RETRY = float(os.getenv("RATE_LIMIT_REDIS_RETRY", 5))
+RATE_LIMIT_LOCAL_SIZE = int(os.getenv("RATE_LIMIT_LOCAL_SIZE", 10000))
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
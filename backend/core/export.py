@@ -0,0 +1,213 @@
+# Columns and file writers of the directory export, used by the admin
+# export actions and by the API export. The two are built as separate
+# images, so this module exists twice, as admin/apps/account/export_format.py
+# and backend/core/export.py. Change both, the admin tests check that they
+# are the same.
+import csv
+import re
+import zipfile
+from typing import Sequence
+from xml.sax.saxutils import escape
+
+FLUSH_SIZE = 64 * 1024
+
+# Profile columns are named after the `user_profile` columns, `username`
+# comes from `auth_user`.
+PROFILE_COLUMNS = (
+    ("uuid", "UUID"),
+    ("username", "Username"),
+    ("last_name", "Last name"),
+    ("first_name", "First name"),
+    ("middle_name", "Middle name"),
+    ("post", "Post"),
+    ("mobile_phone", "Mobile phone"),
+    ("phone", "Phone"),
+    ("experience_start", "Experience start"),
+    ("created_time", "Created"),
+    ("updated_time", "Updated"),
+)
+STATUS_COLUMNS = (("title", "Status"),)
+DEPARTMENT_COLUMNS = (
+    ("title", "Department"),
+    ("block", "Block"),
+    ("department", "Department unit"),
+    ("group", "Group"),
+    ("branch", "Branch"),
+)
+HEADER = [
+    title
+    for columns in (PROFILE_COLUMNS, STATUS_COLUMNS, DEPARTMENT_COLUMNS)
+    for _, title in columns
+]
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'content-types">'
+        '<Default Extension="rels" ContentType="application/'
+        'vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+        '2006/main" xmlns:r="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships">'
+        '<sheets><sheet name="Directory" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/'
+        '2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+        'officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+    '2006/main"><sheetData>'
+)
+XLSX_SHEET_END = "</sheetData></worksheet>"
+XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class StreamBuffer:
+    """
+        Write-only file object that keeps what was written until it is
+        drained. It can not seek, so `zipfile` writes data descriptors and
+        never goes back in the stream.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        self.size = 0
+        return data
+
+
+class CsvWriter:
+    """
+        CSV with a byte order mark, so that spreadsheet applications detect
+        UTF-8.
+    """
+    content_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def __init__(self):
+        self.buffer = StreamBuffer()
+        self.writer = csv.writer(self)
+
+    def write(self, line: str) -> None:
+        self.buffer.write(line.encode())
+
+    def start(self) -> bytes:
+        return "\ufeff".encode()
+
+    def write_row(self, values: list) -> None:
+        self.writer.writerow(values)
+
+    def finish(self) -> bytes:
+        return self.buffer.drain()
+
+
+class XlsxWriter:
+    """
+        Single sheet workbook with inline strings, compressed while it is
+        written. Only the current chunk of the archive is kept in memory.
+    """
+    content_type = (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    extension = "xlsx"
+
+    def __init__(self):
+        self.buffer = StreamBuffer()
+        self.archive = zipfile.ZipFile(
+            self.buffer, "w", compression=zipfile.ZIP_DEFLATED,
+        )
+        self.sheet = None
+
+    def start(self) -> bytes:
+        for name, content in XLSX_PARTS.items():
+            self.archive.writestr(name, content)
+        self.sheet = self.archive.open(
+            "xl/worksheets/sheet1.xml", "w", force_zip64=True,
+        )
+        self.sheet.write(XLSX_SHEET_START.encode())
+        return self.buffer.drain()
+
+    def write_row(self, values: list) -> None:
+        cells = "".join(
+            '<c t="inlineStr"><is><t xml:space="preserve">'
+            f"{escape(XML_INVALID_CHARS.sub('', value))}</t></is></c>"
+            for value in values
+        )
+        self.sheet.write(f"<row>{cells}</row>".encode())
+
+    def finish(self) -> bytes:
+        self.sheet.write(XLSX_SHEET_END.encode())
+        self.sheet.close()
+        self.archive.close()
+        return self.buffer.drain()
+
+
+WRITERS = {
+    writer.extension: writer for writer in (CsvWriter, XlsxWriter)
+}
+
+
+def cell(value) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def export_row(values: Sequence, status: dict, department: dict) -> list:
+    """
+        Cells of one profile from its `values` in the order of
+        `PROFILE_COLUMNS` and the lookup rows of its status and department,
+        empty dicts when it has none.
+    """
+    return [
+        *(cell(value) for value in values),
+        *(cell(status.get(field)) for field, _ in STATUS_COLUMNS),
+        *(cell(department.get(field)) for field, _ in DEPARTMENT_COLUMNS),
+    ]
@@ -1,57 +1,193 @@
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-LOG_DEFAULT_HANDLERS = ["console", ]
+import atexit
+import copy
+import logging
+import os
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from typing import Optional
+
+import orjson
+
+from core.metrics import LOG_RECORDS_DROPPED
+
+# Share of successful requests whose access lines are kept, 1 keeps all.
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", 1))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+# Seconds to wait at shutdown for the queue to make room for the stop mark.
+LOG_FLUSH_TIMEOUT = 5
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+client_ip: ContextVar[Optional[str]] = ContextVar("client_ip", default=None)
+
+listener: Optional[QueueListener] = None
+
+
+class RequestContextFilter(logging.Filter):
+    """
+        Copies the correlation id and the client address of the current
+        request to the record. It runs in the thread that logs, before the
+        record is queued.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        record.client_ip = client_ip.get()
+        return True
+
+
+def response_status(record: logging.LogRecord) -> int:
+    metrics = getattr(record, "request_metrics", None)
+    if metrics:
+        return metrics["status"]
+    # uvicorn.access: (client, method, path, http version, status)
+    if isinstance(record.args, tuple) and len(record.args) == 5:
+        return record.args[4]
+    return 0
+
+
+class AccessLogSampler(logging.Filter):
+    """
+        Keeps `rate` of the access lines. Warnings, errors and requests
+        answered with 4xx or 5xx are always kept.
+    """
+    def __init__(self, rate: float = 1):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno > logging.INFO:
+            return True
+        if response_status(record) >= 400:
+            return True
+        return random.random() < self.rate  # noqa: S311
+
+
+class JsonFormatter(logging.Formatter):
+    """
+        One JSON object per line. The fields of `request_metrics` records
+        are merged into the object.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc,
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "client_ip": getattr(record, "client_ip", None),
+        }
+        entry.update(getattr(record, "request_metrics", None) or {})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class LogQueueHandler(QueueHandler):
+    """
+        Puts records on a bounded queue and never waits: when the listener
+        falls behind, records are dropped and counted in
+        `log_records_dropped_total`. Only the message is rendered here, JSON
+        encoding and the write to stdout happen in the listener thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info,
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class LogQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel, timeout=LOG_FLUSH_TIMEOUT)
+
+
+def queue_handler() -> LogQueueHandler:
+    """
+        Handler factory for `LOGGING`. Starts the listener thread that
+        writes the queued records, replacing the one of a previous
+        configuration.
+    """
+    global listener
+    stop_listener()
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+    queue = Queue(LOG_QUEUE_SIZE)
+    listener = LogQueueListener(queue, output)
+    listener.start()
+    return LogQueueHandler(queue)
+
+
+def stop_listener() -> None:
+    """
+        Writes out what is still queued and stops the listener thread. If
+        stdout does not take anything for `LOG_FLUSH_TIMEOUT` seconds, the
+        queued records are given up.
+    """
+    global listener
+    if listener is not None:
+        try:
+            listener.stop()
+        except Full:
+            pass
+        listener = None
+
+
+atexit.register(stop_listener)
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "formatters": {
-        "verbose": {
-            "format": LOG_FORMAT
-        },
-        "default": {
-            "()": "uvicorn.logging.DefaultFormatter",
-            "fmt": "%(levelprefix)s %(message)s",
-            "use_colors": None,
-        },
-        "access": {
-            "()": "uvicorn.logging.AccessFormatter",
-            "fmt": "%(levelprefix)s %(client_addr)s - '%(request_line)s' %(status_code)s",
+    "filters": {
+        "request_context": {"()": RequestContextFilter},
+        "access_sample": {
+            "()": AccessLogSampler,
+            "rate": ACCESS_LOG_SAMPLE_RATE,
         },
     },
     "handlers": {
-        "console": {
-            "level": "DEBUG",
-            "class": "logging.StreamHandler",
-            "formatter": "verbose",
-        },
-        "default": {
-            "formatter": "default",
-            "class": "logging.StreamHandler",
-            "stream": "ext://sys.stdout",
-        },
-        "access": {
-            "formatter": "access",
-            "class": "logging.StreamHandler",
-            "stream": "ext://sys.stdout",
+        "queue": {
+            "()": queue_handler,
+            "filters": ["request_context"],
         },
     },
     "loggers": {
-        "": {
-            "handlers": LOG_DEFAULT_HANDLERS,
-            "level": "INFO",
-        },
         "uvicorn.error": {
             "level": "INFO",
         },
         "uvicorn.access": {
-            "handlers": ["access"],
+            "handlers": ["queue"],
+            "filters": ["access_sample"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "core.middleware": {
+            "handlers": ["queue"],
+            "filters": ["access_sample"],
             "level": "INFO",
             "propagate": False,
         },
     },
     "root": {
         "level": "INFO",
-        "formatter": "verbose",
-        "handlers": LOG_DEFAULT_HANDLERS,
+        "handlers": ["queue"],
     },
 }
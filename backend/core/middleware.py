@@ -0,0 +1,231 @@
+import hashlib
+import logging
+import math
+import re
+from time import perf_counter
+from typing import Optional
+from uuid import uuid4
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core import config
+from core.logger import client_ip, request_id
+from core.metrics import (
+    RATE_LIMITED_REQUESTS,
+    REQUEST_DB_DURATION,
+    REQUEST_DURATION,
+    REQUEST_QUERIES,
+    REQUESTS,
+    RESPONSE_SIZE,
+    RequestStats,
+    request_stats,
+)
+from core.ratelimit import RateLimiter
+from db import redis
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_PATTERN = re.compile(r"[\w.-]{1,128}")
+# Not rate limited, scraped by monitoring or read by the docs page.
+RATE_LIMIT_EXEMPT_PATHS = ("/metrics", "/api/openapi")
+
+route_paths = {}
+
+
+def route_path(scope: Scope) -> str:
+    """
+        Path template of the matched route, so that metrics are labelled
+        with `/api/v1/profiles/{profile_id}` rather than every profile id.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    if endpoint not in route_paths:
+        route_paths.update(
+            (route.endpoint, route.path)
+            for route in scope["app"].routes
+            if hasattr(route, "endpoint")
+        )
+    return route_paths.get(endpoint, "unmatched")
+
+
+def client_address(scope: Scope, headers: Headers) -> Optional[str]:
+    """
+        nginx passes the client address as `X-Real-IP` and appends it to
+        `X-Forwarded-For`. Without a proxy the peer of the socket is used.
+    """
+    address = headers.get("x-real-ip")
+    if not address and headers.get("x-forwarded-for"):
+        address = headers["x-forwarded-for"].split(",")[0].strip()
+    if not address and scope.get("client"):
+        address = scope["client"][0]
+    return address or None
+
+
+class RequestContextMiddleware:
+    """
+        Sets the correlation id and the client address that every log
+        record of the request carries. The id comes from the `X-Request-ID`
+        header set by nginx, or is generated, and is returned in the same
+        response header.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        correlation_id = headers.get("x-request-id", "")
+        if not REQUEST_ID_PATTERN.fullmatch(correlation_id):
+            correlation_id = uuid4().hex
+        id_token = request_id.set(correlation_id)
+        ip_token = client_ip.set(client_address(scope, headers))
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "X-Request-ID", correlation_id,
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            client_ip.reset(ip_token)
+            request_id.reset(id_token)
+
+
+class RequestMetricsMiddleware:
+    """
+        Plain ASGI middleware, so that streamed responses are measured
+        until their last chunk. Records the duration, number and time of
+        the database queries, cache hits and misses and the response size
+        in the Prometheus metrics and in one `key=value` log line, also
+        passed as the `request_metrics` record attribute. Requests slower
+        than `REQUEST_SLOW_THRESHOLD` seconds are logged again as a warning
+        with their SQL, slowest statement first.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(config.REQUEST_SQL_CAPTURE_LIMIT)
+        token = request_stats.set(stats)
+        status = 500
+        started = perf_counter()
+
+        async def send_measured(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                stats.size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_measured)
+        finally:
+            request_stats.reset(token)
+            self.record(scope, status, stats, perf_counter() - started)
+
+    @staticmethod
+    def record(scope: Scope, status: int, stats: RequestStats,
+               duration: float) -> None:
+        method = scope["method"]
+        route = route_path(scope)
+        REQUESTS.inc(method, route, status)
+        REQUEST_DURATION.observe(duration, method, route)
+        REQUEST_QUERIES.observe(stats.queries, method, route)
+        REQUEST_DB_DURATION.observe(stats.db_time, method, route)
+        RESPONSE_SIZE.observe(stats.size, method, route)
+        fields = {
+            "method": method,
+            "path": scope["path"],
+            "route": route,
+            "status": status,
+            "duration_ms": round(duration * 1000, 1),
+            "queries": stats.queries,
+            "db_ms": round(stats.db_time * 1000, 1),
+            "cache_hits": stats.cache_hits,
+            "cache_misses": stats.cache_misses,
+            "size": stats.size,
+        }
+        logger.info(
+            " ".join(f"{key}={value}" for key, value in fields.items()),
+            extra={"request_metrics": fields},
+        )
+        if duration < config.REQUEST_SLOW_THRESHOLD:
+            return
+        statements = "\n".join(
+            f"{elapsed * 1000:.1f}ms {' '.join(sql.split())}"
+            for elapsed, sql in sorted(stats.statements, reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s took %.1fms with %d queries:\n%s",
+            method, scope["path"], duration * 1000, stats.queries,
+            statements,
+            extra={"request_metrics": fields},
+        )
+
+
+def rate_limit_key(scope: Scope, headers: Headers) -> str:
+    """
+        Known integration clients are told apart by their `X-API-Key`,
+        stored hashed. Anything else shares the bucket of its address, an
+        unknown key does not buy a fresh bucket.
+    """
+    api_key = headers.get("x-api-key")
+    if api_key and api_key in config.RATE_LIMIT_API_KEYS:
+        digest = hashlib.blake2b(api_key.encode(), digest_size=8)
+        return f"key:{digest.hexdigest()}"
+    return f"ip:{client_address(scope, headers)}"
+
+
+class RateLimitMiddleware:
+    """
+        Answers 429 with `Retry-After` once a client has spent its token
+        bucket, before the request reaches a route and its connection from
+        the Postgres pool. Added inside `RequestMetricsMiddleware`, so the
+        rejected requests are still counted and logged. Websockets are not
+        limited, the change feed holds no database connection.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiter = RateLimiter(
+            config.RATE_LIMIT_RATE,
+            config.RATE_LIMIT_BURST,
+            config.RATE_LIMIT_REDIS_TIMEOUT,
+            config.RATE_LIMIT_REDIS_RETRY,
+            config.RATE_LIMIT_LOCAL_SIZE,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or config.RATE_LIMIT_RATE <= 0
+            or scope["path"].startswith(RATE_LIMIT_EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+        key = rate_limit_key(scope, Headers(scope=scope))
+        decision = await self.limiter.take(await redis.get_redis(), key)
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+        RATE_LIMITED_REQUESTS.inc(decision.store)
+        response = JSONResponse(
+            {"detail": "too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(decision.retry_after))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,23 @@
+from typing import Optional
+
+import phonenumbers
+
+from core import config
+
+
+def to_e164(value: str) -> Optional[str]:
+    """
+        E.164 form of a phone number written in any format, numbers without
+        a country code are read in `PHONE_NUMBERS_REGION`. None if the
+        number is invalid.
+    """
+    try:
+        number = phonenumbers.parse(value, config.PHONE_NUMBERS_REGION)
+    except phonenumbers.NumberParseException:
+        return None
+    if not phonenumbers.is_valid_number(number):
+        return None
+    return phonenumbers.format_number(
+        number,
+        phonenumbers.PhoneNumberFormat.E164,
+    )
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from typing import NamedTuple, Optional
+
+from aioredis import Redis, RedisError, ReplyError
+
+from core.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ratelimit"
+
+# Token bucket kept in a Redis hash. The time comes from the Redis
+# server, so every API process refills the bucket by the same clock.
+# Floats are returned as strings, Redis would truncate Lua numbers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "time")
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "time",
+           tostring(now))
+redis.call("PEXPIRE", KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float
+    store: str
+
+
+class LocalBuckets:
+    """
+        The same token buckets in the memory of the process, for when Redis
+        can not be reached. The least recently used buckets are dropped
+        past `maxsize`, a dropped bucket starts full again.
+    """
+    def __init__(self, maxsize: int):
+        self.buckets = LRUCache(maxsize)
+
+    def take(self, key: str, rate: float, burst: int) -> Decision:
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+        retry_after = 0.0
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self.buckets.set(key, (tokens, now))
+        return Decision(allowed, int(tokens), retry_after, "local")
+
+
+class RateLimiter:
+    """
+        Token bucket per client, `rate` requests per second on average and
+        bursts of up to `burst`. Buckets live in Redis, so all API
+        processes share them, one `EVALSHA` per request. When Redis fails
+        or answers slower than `timeout` seconds the process-local buckets
+        are used, and Redis is tried again `retry_interval` seconds later
+        rather than on every request.
+    """
+    def __init__(self, rate: float, burst: int, timeout: float,
+                 retry_interval: float, local_size: int):
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.local = LocalBuckets(local_size)
+        self.digest: Optional[str] = None
+        self.redis_down_until = 0.0
+
+    async def take(self, redis: Optional[Redis], key: str) -> Decision:
+        if redis is not None and time.monotonic() >= self.redis_down_until:
+            try:
+                return await asyncio.wait_for(
+                    self._take_redis(redis, key), self.timeout,
+                )
+            except (RedisError, OSError, asyncio.TimeoutError) as error:
+                logger.warning(
+                    "Rate limiter falls back to local buckets: %r", error,
+                )
+                self.redis_down_until = (
+                    time.monotonic() + self.retry_interval
+                )
+        return self.local.take(key, self.rate, self.burst)
+
+    async def _take_redis(self, redis: Redis, key: str) -> Decision:
+        keys = [f"{KEY_PREFIX}:{key}"]
+        args = [self.rate, self.burst]
+        if self.digest is None:
+            self.digest = await redis.script_load(TOKEN_BUCKET_SCRIPT)
+        try:
+            reply = await redis.evalsha(self.digest, keys, args)
+        except ReplyError as error:
+            if not str(error).startswith("NOSCRIPT"):
+                raise
+            # The script cache was flushed or Redis restarted.
+            reply = await redis.eval(TOKEN_BUCKET_SCRIPT, keys, args)
+        allowed, tokens, retry_after = reply
+        return Decision(
+            bool(allowed), int(float(tokens)), float(retry_after), "redis",
+        )
@@ -0,0 +1,9 @@
+from typing import Optional
+
+from elasticsearch import AsyncElasticsearch
+
+es: Optional[AsyncElasticsearch] = None
+
+
+async def get_elastic() -> AsyncElasticsearch:
+    return es
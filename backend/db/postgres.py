@@ -0,0 +1,53 @@
+from typing import Optional
+
+import orjson
+from asyncpg import Connection, Pool
+
+from core.metrics import track_query, untracked
+
+pool: Optional[Pool] = None
+
+
+class InstrumentedConnection(Connection):
+    """
+        Connection that adds the time of every query to the statistics of
+        the current request. Pool methods and connections taken with
+        `acquire()` both end up here, rows read through a cursor are not
+        counted. The reset the pool runs on release is left out.
+    """
+    async def reset(self, **kwargs) -> None:
+        with untracked():
+            await super().reset(**kwargs)
+
+    async def execute(self, query: str, *args, **kwargs):
+        with track_query(query):
+            return await super().execute(query, *args, **kwargs)
+
+    async def executemany(self, command: str, args, **kwargs):
+        with track_query(command):
+            return await super().executemany(command, args, **kwargs)
+
+    async def fetch(self, query: str, *args, **kwargs):
+        with track_query(query):
+            return await super().fetch(query, *args, **kwargs)
+
+    async def fetchrow(self, query: str, *args, **kwargs):
+        with track_query(query):
+            return await super().fetchrow(query, *args, **kwargs)
+
+    async def fetchval(self, query: str, *args, **kwargs):
+        with track_query(query):
+            return await super().fetchval(query, *args, **kwargs)
+
+
+async def init_connection(connection: Connection) -> None:
+    await connection.set_type_codec(
+        "jsonb",
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog",
+    )
+
+
+async def get_postgres() -> Pool:
+    return pool
@@ -0,0 +1,41 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from aioredis import Redis, RedisError
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+redis: Optional[Redis] = None
+# Opens the pool, set at startup.
+connect: Optional[Callable[[], Awaitable[Redis]]] = None
+next_attempt = 0.0
+
+
+async def get_redis() -> Optional[Redis]:
+    """
+        The Redis pool, `None` while Redis could not be reached. Redis only
+        holds caches and rate limit buckets, so the API starts and serves
+        without it, and the pool is opened again on demand at most every
+        `REDIS_RECONNECT_INTERVAL` seconds. Once open, the pool replaces
+        the connections it loses by itself.
+    """
+    global redis, next_attempt
+    if redis is None and connect is not None:
+        now = time.monotonic()
+        if now >= next_attempt:
+            next_attempt = now + config.REDIS_RECONNECT_INTERVAL
+            try:
+                redis = await connect()
+            except (RedisError, OSError, asyncio.TimeoutError) as error:
+                logger.warning("Redis unavailable: %r", error)
+    return redis
+
+
+async def close() -> None:
+    if redis is not None:
+        redis.close()
+        await redis.wait_closed()
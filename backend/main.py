@@ -1,11 +1,24 @@
 import logging
+from functools import partial
 
+import aioredis
+import asyncpg
 import uvicorn
+from elasticsearch import AsyncElasticsearch
 from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 
-from core import config
+from api.v1 import changes, departments, org_units, profiles, statuses
+from core import config, metrics
+from core.conditional import NotModified, not_modified_handler
 from core.logger import LOGGING
+from core.middleware import (
+    RateLimitMiddleware,
+    RequestContextMiddleware,
+    RequestMetricsMiddleware,
+)
+from db import elastic, postgres, redis
+from services import changes as change_feed
 
 app = FastAPI(
     title=config.PROJECT_NAME,
@@ -13,10 +26,95 @@ app = FastAPI(
     openapi_url="/api/openapi.json",
     default_response_class=ORJSONResponse,
 )
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
+app.add_exception_handler(NotModified, not_modified_handler)
+
+
+POSTGRES_OPTIONS = {
+    "database": config.POSTGRES_DB,
+    "user": config.POSTGRES_USER,
+    "password": config.POSTGRES_PASSWORD,
+    "host": config.POSTGRES_HOST,
+    "port": config.POSTGRES_PORT,
+}
+
+
+@app.on_event("startup")
+async def startup():
+    postgres.pool = await asyncpg.create_pool(
+        **POSTGRES_OPTIONS,
+        min_size=config.POSTGRES_POOL_MIN_SIZE,
+        max_size=config.POSTGRES_POOL_MAX_SIZE,
+        init=postgres.init_connection,
+        connection_class=postgres.InstrumentedConnection,
+    )
+    redis.connect = partial(
+        aioredis.create_redis_pool,
+        (config.REDIS_HOST, config.REDIS_PORT),
+        minsize=config.REDIS_POOL_MIN_SIZE,
+        maxsize=config.REDIS_POOL_MAX_SIZE,
+        timeout=config.REDIS_CONNECT_TIMEOUT,
+    )
+    await redis.get_redis()
+    elastic.es = AsyncElasticsearch(
+        hosts=[f"http://{config.ELASTIC_HOST}:{config.ELASTIC_PORT}"],
+    )
+    change_feed.feed = change_feed.ChangeFeed(
+        partial(asyncpg.connect, **POSTGRES_OPTIONS),
+    )
+    await change_feed.feed.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await change_feed.feed.stop()
+    await postgres.pool.close()
+    await redis.close()
+    await elastic.es.close()
+
+
+app.include_router(
+    profiles.router,
+    prefix="/api/v1/profiles",
+    tags=["profiles"],
+)
+app.include_router(
+    departments.router,
+    prefix="/api/v1/departments",
+    tags=["departments"],
+)
+app.include_router(
+    org_units.router,
+    prefix="/api/v1/org-units",
+    tags=["org-units"],
+)
+app.include_router(
+    statuses.router,
+    prefix="/api/v1/statuses",
+    tags=["statuses"],
+)
+app.include_router(
+    changes.router,
+    prefix="/api/v1/changes",
+    tags=["changes"],
+)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    """
+        Prometheus text exposition, scraped on the internal network. nginx
+        only proxies `/api`.
+    """
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8086,
+        log_config=None,
     )
@@ -0,0 +1,15 @@
+import orjson
+from pydantic import BaseModel
+
+
+def orjson_dumps(value, *, default) -> str:
+    return orjson.dumps(value, default=default).decode()
+
+
+class BaseOrjsonModel(BaseModel):
+    """
+        Base model serialized with orjson.
+    """
+    class Config:
+        json_loads = orjson.loads
+        json_dumps = orjson_dumps
@@ -0,0 +1,16 @@
+from typing import Optional
+
+from models.base import BaseOrjsonModel
+
+
+class OrgUnit(BaseOrjsonModel):
+    """
+        Company structure node, `content.org_unit` table. `headcount`
+        counts the profiles of the whole subtree.
+    """
+    id: int
+    parent_id: Optional[int]
+    level: str
+    name: str
+    path: str
+    headcount: int
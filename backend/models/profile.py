@@ -0,0 +1,114 @@
+from datetime import date, datetime
+from typing import Optional
+from uuid import UUID
+
+from models.base import BaseOrjsonModel
+
+
+class Status(BaseOrjsonModel):
+    """
+        User status, `content.user_status` table.
+    """
+    id: int
+    status: str
+    title: str
+    description: Optional[str]
+
+
+class Department(BaseOrjsonModel):
+    """
+        Company structure unit, `content.user_department` table.
+    """
+    id: int
+    title: str
+    block: Optional[str]
+    department: Optional[str]
+    group: Optional[str]
+    branch: Optional[str]
+    description: Optional[str]
+
+
+class Profile(BaseOrjsonModel):
+    """
+        User profile, `content.directory_entry` table with the status and
+        the department taken from the lookup cache.
+    """
+    uuid: UUID
+    last_name: Optional[str]
+    first_name: Optional[str]
+    middle_name: Optional[str]
+    full_name: Optional[str]
+    abbreviation: Optional[str]
+    post: Optional[str]
+    mobile_phone: Optional[str]
+    phone: Optional[str]
+    mobile_phone_national: Optional[str]
+    phone_national: Optional[str]
+    avatar: Optional[str]
+    # {"<size>": {"webp": <path>, "jpeg": <path>}}, empty until resized.
+    avatar_thumbnails: dict[str, dict[str, str]] = {}
+    status: Optional[Status]
+    department: Optional[Department]
+    updated_time: datetime
+
+
+class ProfilePage(BaseOrjsonModel):
+    """
+        Keyset paginated slice of the directory. Cursors are opaque and are
+        passed back as the `cursor` query parameter.
+    """
+    items: list[Profile]
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+class Facet(BaseOrjsonModel):
+    """
+        Number of matching profiles with the given status or department.
+    """
+    id: int
+    title: Optional[str]
+    count: int
+
+
+class ProfileSearchResult(BaseOrjsonModel):
+    """
+        One page of search results ordered by relevance, with facet counts
+        by status and department.
+    """
+    items: list[Profile]
+    total: int
+    statuses: list[Facet]
+    departments: list[Facet]
+
+
+class ProfileChange(BaseOrjsonModel):
+    """
+        Entry of `content.profile_history`, `changes` holds the fields set
+        at creation or the fields that changed, by column name.
+    """
+    changed_time: datetime
+    operation: str
+    changes: dict
+
+
+class ProfileAsOf(BaseOrjsonModel):
+    """
+        User profile as it was at `at`, rebuilt from its history. The
+        status and the department are the current rows of those ids.
+    """
+    uuid: UUID
+    at: datetime
+    last_name: Optional[str]
+    first_name: Optional[str]
+    middle_name: Optional[str]
+    post: Optional[str]
+    mobile_phone: Optional[str]
+    phone: Optional[str]
+    description: Optional[str]
+    avatar: Optional[str]
+    experience_start: Optional[date]
+    experience_now: Optional[date]
+    experience_description: Optional[str]
+    status: Optional[Status]
+    department: Optional[Department]
@@ -0,0 +1,141 @@
+import asyncio
+import contextlib
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+import orjson
+from asyncpg import Connection, InterfaceError, PostgresError
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+# Sent to every subscriber after the listening connection came back,
+# events committed while it was down are lost and clients reload.
+RESYNC_EVENT = orjson.dumps({"type": "resync"}).decode()
+CONNECTION_ERRORS = (
+    OSError, asyncio.TimeoutError, InterfaceError, PostgresError,
+)
+
+
+class Subscription:
+    """
+        Queue of the events of one websocket client. `departments` limits
+        profile events to the people entering, leaving or staying in those
+        departments, status and department events always pass.
+    """
+    def __init__(self, departments: Optional[set[int]], maxsize: int):
+        self.departments = departments
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def wants(self, event: dict) -> bool:
+        if not self.departments or event.get("type") != "profile":
+            return True
+        if "id" not in event:
+            # A bulk change, any department may be affected.
+            return True
+        return (
+            event.get("department") in self.departments
+            or event.get("previous_department") in self.departments
+        )
+
+    def put(self, payload: str) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # The client does not keep up, it is disconnected rather than
+            # buffered without a limit.
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[str]:
+        """
+            The next event as JSON text, `None` once the subscription has
+            overflowed.
+        """
+        return await self.queue.get()
+
+
+class ChangeFeed:
+    """
+        Fans the change events the database triggers notify on
+        `CHANGE_FEED_CHANNEL` out to the websocket subscriptions of this
+        process. One dedicated connection listens, pool connections are
+        reset on release and would lose the `LISTEN`. The payload is parsed
+        once for filtering and passed on as it came.
+    """
+    def __init__(self, connect: Callable[[], Awaitable[Connection]]):
+        self.connect = connect
+        self.subscriptions: set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self.task = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+
+    async def listen(self) -> None:
+        """
+            Keep a listening connection open, connecting again after
+            `CHANGE_FEED_RECONNECT_DELAY` seconds whenever it is lost.
+        """
+        connected_before = False
+        while True:
+            lost = asyncio.Event()
+            connection = None
+            try:
+                connection = await self.connect()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(
+                    config.CHANGE_FEED_CHANNEL, self.notified,
+                )
+                if connected_before:
+                    self.publish(RESYNC_EVENT)
+                connected_before = True
+                await lost.wait()
+                logger.warning("Change feed connection lost")
+            except CONNECTION_ERRORS as error:
+                logger.warning("Change feed cannot listen: %s", error)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(config.CHANGE_FEED_RECONNECT_DELAY)
+
+    def notified(self, connection: Connection, pid: int, channel: str,
+                 payload: str) -> None:
+        self.publish(payload)
+
+    def publish(self, payload: str) -> None:
+        event = orjson.loads(payload)
+        for subscription in self.subscriptions:
+            if subscription.wants(event):
+                subscription.put(payload)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(
+        self, departments: Optional[set[int]] = None,
+    ) -> AsyncIterator[Subscription]:
+        subscription = Subscription(
+            departments, config.CHANGE_FEED_QUEUE_SIZE,
+        )
+        self.subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self.subscriptions.discard(subscription)
+
+
+feed: Optional[ChangeFeed] = None
+
+
+async def get_change_feed() -> ChangeFeed:
+    return feed
@@ -0,0 +1,87 @@
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator
+
+from asyncpg import Pool
+from fastapi import Depends
+
+from core import config
+from core.export import (
+    FLUSH_SIZE,
+    HEADER,
+    PROFILE_COLUMNS,
+    WRITERS,
+    export_row,
+)
+from db.postgres import get_postgres
+from services.lookup import LookupService, get_lookup_service
+from services.pagination import KEYSET_ORDER_ASC
+
+EXPORT_CHUNK_SIZE = 2000
+# Seconds a client turned away for too many running exports should wait.
+EXPORT_RETRY_AFTER = 30
+
+# Export columns are named after the `user_profile` columns except these.
+COLUMN_SOURCES = {"username": "u.username"}
+PROFILE_SELECT = ", ".join(
+    COLUMN_SOURCES.get(field, f"p.{field}") for field, _ in PROFILE_COLUMNS
+)
+EXPORT_QUERY = f"""
+    SELECT {PROFILE_SELECT}, p.status_id, p.department_id
+    FROM content.user_profile p
+    JOIN public.auth_user u ON u.id = p.user_id
+    ORDER BY {KEYSET_ORDER_ASC}
+"""
+
+
+class ExportService:
+    """
+        Whole directory export, same columns as the admin export actions.
+        Rows are read through a server-side cursor in the keyset order, so
+        the first rows come back without sorting the table and memory does
+        not grow with the directory. The pool connection is held until the
+        client has downloaded the file, so at most `concurrency` exports
+        run at once. The endpoint turns requests away while all slots are
+        taken, a request that got past it just before waits for one.
+    """
+    def __init__(self, postgres: Pool, lookup_service: LookupService,
+                 concurrency: int):
+        self.postgres = postgres
+        self.lookup_service = lookup_service
+        self.slots = asyncio.Semaphore(concurrency)
+
+    def busy(self) -> bool:
+        return self.slots.locked()
+
+    async def stream(self, file_format: str) -> AsyncIterator[bytes]:
+        async with self.slots:
+            statuses = await self.lookup_service.statuses()
+            departments = await self.lookup_service.departments()
+            writer = WRITERS[file_format]()
+            data = writer.start()
+            writer.write_row(HEADER)
+            yield data + writer.buffer.drain()
+            async with self.postgres.acquire() as connection:
+                async with connection.transaction(readonly=True):
+                    async for record in connection.cursor(
+                        EXPORT_QUERY,
+                        prefetch=EXPORT_CHUNK_SIZE,
+                    ):
+                        writer.write_row(export_row(
+                            [record[field] for field, _ in PROFILE_COLUMNS],
+                            statuses.get(record["status_id"], {}),
+                            departments.get(record["department_id"], {}),
+                        ))
+                        if writer.buffer.size >= FLUSH_SIZE:
+                            yield writer.buffer.drain()
+            yield writer.finish()
+
+
+@lru_cache()
+def get_export_service(
+    postgres: Pool = Depends(get_postgres),
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> ExportService:
+    return ExportService(
+        postgres, lookup_service, config.EXPORT_CONCURRENCY,
+    )
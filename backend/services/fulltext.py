@@ -0,0 +1,180 @@
+import re
+from typing import Optional
+
+from asyncpg import Connection, Pool, Record
+
+from services.pagination import KEYSET_ORDER_ASC
+from services.profile import PROFILE_QUERY
+
+TRIGRAM_COLUMNS = ("last_name", "first_name", "middle_name", "post")
+
+
+def escape_like(value: str) -> str:
+    return re.sub(r"([\\%_])", r"\\\1", value)
+
+
+def prefix_tsquery(query: str) -> str:
+    return " & ".join(f"{part}:*" for part in re.findall(r"\w+", query))
+
+
+def matching_ids(lookup: dict[int, dict], word: str) -> list[int]:
+    word = word.casefold()
+    return [
+        row["id"]
+        for row in lookup.values()
+        if word in (row["title"] or "").casefold()
+    ]
+
+
+def build_where(
+    query: str,
+    statuses: dict[int, dict],
+    departments: dict[int, dict],
+    status: Optional[int] = None,
+    department: Optional[int] = None,
+) -> tuple[str, list]:
+    """
+        Same matching as the admin database search: every word has to match
+        the generated `search_vector` column by prefix, a trigram indexed
+        column as a substring, or a status or department title.
+    """
+    params = []
+
+    def param(value) -> str:
+        params.append(value)
+        return f"${len(params)}"
+
+    conditions = []
+    for word in query.split():
+        clauses = []
+        tsquery = prefix_tsquery(word)
+        if tsquery:
+            clauses.append(
+                f"p.search_vector @@ to_tsquery('simple', {param(tsquery)})",
+            )
+        pattern = param(f"%{escape_like(word)}%")
+        clauses.extend(
+            f"p.{column} ILIKE {pattern}" for column in TRIGRAM_COLUMNS
+        )
+        status_ids = matching_ids(statuses, word)
+        if status_ids:
+            clauses.append(f"p.status_id = ANY({param(status_ids)})")
+        department_ids = matching_ids(departments, word)
+        if department_ids:
+            clauses.append(f"p.department_id = ANY({param(department_ids)})")
+        conditions.append(f"({' OR '.join(clauses)})")
+    if status:
+        conditions.append(f"p.status_id = {param(status)}")
+    if department:
+        conditions.append(f"p.department_id = {param(department)}")
+    return " AND ".join(conditions) or "TRUE", params
+
+
+class PostgresProfileSearch:
+    """
+        Profile search over the trigram and full-text indexes of
+        `content.user_profile`, used when Elasticsearch is unavailable.
+        The page, the total and both facets are read one after another on
+        a single connection of the pool, in one read-only snapshot, so a
+        search holds one connection however busy the pool is. The page is
+        matched on the profiles and read from the directory.
+    """
+    def __init__(self, postgres: Pool):
+        self.postgres = postgres
+
+    async def search(
+        self,
+        query: str,
+        statuses: dict[int, dict],
+        departments: dict[int, dict],
+        status: Optional[int],
+        department: Optional[int],
+        page: int,
+        page_size: int,
+    ) -> tuple[list[Record], int, list[tuple], list[tuple]]:
+        async with self.postgres.acquire() as connection:
+            async with connection.transaction(
+                isolation="repeatable_read", readonly=True,
+            ):
+                return (
+                    await self.fetch_page(
+                        connection, query, statuses, departments, status,
+                        department, page, page_size,
+                    ),
+                    await self.fetch_total(
+                        connection, query, statuses, departments, status,
+                        department,
+                    ),
+                    await self.fetch_facet(
+                        connection, "status_id", *build_where(
+                            query, statuses, departments, None, department,
+                        ),
+                    ),
+                    await self.fetch_facet(
+                        connection, "department_id", *build_where(
+                            query, statuses, departments, status, None,
+                        ),
+                    ),
+                )
+
+    @staticmethod
+    async def fetch_page(
+        connection: Connection,
+        query: str,
+        statuses: dict[int, dict],
+        departments: dict[int, dict],
+        status: Optional[int],
+        department: Optional[int],
+        page: int,
+        page_size: int,
+    ) -> list[Record]:
+        where, params = build_where(
+            query, statuses, departments, status, department,
+        )
+        order = KEYSET_ORDER_ASC
+        tsquery = prefix_tsquery(query)
+        if tsquery:
+            params.append(tsquery)
+            order = (
+                f"ts_rank(p.search_vector, to_tsquery('simple', "
+                f"${len(params)})) DESC, {order}"
+            )
+        params.extend([page_size, (page - 1) * page_size])
+        return await connection.fetch(
+            f"WITH page AS ("
+            f"SELECT p.uuid, row_number() OVER (ORDER BY {order}) AS position "
+            f"FROM content.user_profile p WHERE {where} ORDER BY {order} "
+            f"LIMIT ${len(params) - 1} OFFSET ${len(params)}) "
+            f"{PROFILE_QUERY} JOIN page ON page.uuid = p.uuid "
+            f"ORDER BY page.position",
+            *params,
+        )
+
+    @staticmethod
+    async def fetch_total(
+        connection: Connection,
+        query: str,
+        statuses: dict[int, dict],
+        departments: dict[int, dict],
+        status: Optional[int],
+        department: Optional[int],
+    ) -> int:
+        where, params = build_where(
+            query, statuses, departments, status, department,
+        )
+        return await connection.fetchval(
+            f"SELECT count(*) FROM content.user_profile p WHERE {where}",
+            *params,
+        )
+
+    @staticmethod
+    async def fetch_facet(connection: Connection, column: str, where: str,
+                          params: list) -> list[tuple]:
+        rows = await connection.fetch(
+            f"SELECT p.{column} AS id, count(*) AS count "
+            f"FROM content.user_profile p "
+            f"WHERE {where} AND p.{column} IS NOT NULL "
+            f"GROUP BY p.{column} ORDER BY count DESC",
+            *params,
+        )
+        return [(row["id"], row["count"]) for row in rows]
@@ -0,0 +1,109 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+from uuid import UUID
+
+from asyncpg import Pool
+from fastapi import Depends
+
+from db.postgres import get_postgres
+from models.profile import Department, ProfileAsOf, ProfileChange, Status
+from services.lookup import LookupService, get_lookup_service
+
+# The longest history returned for one profile, newest entries first.
+HISTORY_LIMIT = 500
+
+
+def build_profile_as_of(
+    profile_id: UUID,
+    at: datetime,
+    fields: dict,
+    statuses: dict[int, dict],
+    departments: dict[int, dict],
+) -> ProfileAsOf:
+    status = statuses.get(fields.get("status_id"))
+    department = departments.get(fields.get("department_id"))
+    return ProfileAsOf(
+        uuid=profile_id,
+        at=at,
+        **{
+            key: value for key, value in fields.items()
+            if key in ProfileAsOf.__fields__
+        },
+        status=status and Status(**status),
+        department=department and Department(**department),
+    )
+
+
+class HistoryService:
+    """
+        Time travel over `content.profile_history`, the append-only log of
+        profile changes the admin database triggers write. The state at a
+        moment is folded by `content.profile_as_of` and
+        `content.department_profiles_as_of` in the database, on the
+        `(profile_id, changed_time)` and department indexes.
+    """
+    def __init__(self, postgres: Pool, lookup_service: LookupService):
+        self.postgres = postgres
+        self.lookup_service = lookup_service
+
+    async def get_changes(self, profile_id: UUID) -> list[ProfileChange]:
+        rows = await self.postgres.fetch(
+            "SELECT changed_time, operation, changes "
+            "FROM content.profile_history WHERE profile_id = $1 "
+            "ORDER BY changed_time DESC, id DESC LIMIT $2",
+            profile_id,
+            HISTORY_LIMIT,
+        )
+        return [ProfileChange(**row) for row in rows]
+
+    async def get_as_of(
+        self, profile_id: UUID, at: datetime,
+    ) -> Optional[ProfileAsOf]:
+        fields = await self.postgres.fetchval(
+            "SELECT content.profile_as_of($1, $2)", profile_id, at,
+        )
+        if fields is None:
+            return None
+        statuses = await self.lookup_service.statuses()
+        departments = await self.lookup_service.departments()
+        return build_profile_as_of(
+            profile_id, at, fields, statuses, departments,
+        )
+
+    async def get_department_as_of(
+        self, department_id: int, at: datetime,
+    ) -> list[ProfileAsOf]:
+        """
+            Profiles that were in the department at `at` with their fields
+            of that moment, ordered by last and first name.
+        """
+        rows = await self.postgres.fetch(
+            "SELECT d.profile_id, content.profile_as_of(d.profile_id, $2) "
+            "AS fields FROM content.department_profiles_as_of($1, $2) d",
+            department_id,
+            at,
+        )
+        statuses = await self.lookup_service.statuses()
+        departments = await self.lookup_service.departments()
+        profiles = [
+            build_profile_as_of(
+                row["profile_id"], at, row["fields"], statuses, departments,
+            )
+            for row in rows
+        ]
+        return sorted(
+            profiles,
+            key=lambda profile: (
+                profile.last_name or "", profile.first_name or "",
+                str(profile.uuid),
+            ),
+        )
+
+
+@lru_cache()
+def get_history_service(
+    postgres: Pool = Depends(get_postgres),
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> HistoryService:
+    return HistoryService(postgres, lookup_service)
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import time
+from functools import lru_cache
+from typing import Optional
+
+import orjson
+from aioredis import Redis, RedisError
+from asyncpg import Pool
+from fastapi import Depends
+
+from core import config
+from core.cache import LRUCache
+from core.coalesce import SingleFlight
+from core.metrics import record_cache
+from db.postgres import get_postgres
+from db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "lookup"
+STATUS_LOOKUP = "user_status"
+DEPARTMENT_LOOKUP = "user_department"
+
+LOOKUP_QUERIES = {
+    STATUS_LOOKUP: """
+        SELECT id, status, title, description
+        FROM content.user_status
+        ORDER BY id
+    """,
+    DEPARTMENT_LOOKUP: """
+        SELECT id, title, block, department, "group", branch, description
+        FROM content.user_department
+        ORDER BY id
+    """,
+}
+
+local_cache = LRUCache(config.LOOKUP_CACHE_LOCAL_SIZE)
+fingerprints = {}
+flights = SingleFlight(KEY_PREFIX)
+
+
+class LookupService:
+    """
+        Read-through cache of the status and department reference tables,
+        shared with the admin (`apps.account.cache.LookupCache`). Rows are
+        stored in Redis under `lookup:<name>:<version>`, and the admin bumps
+        `lookup:<name>:version` whenever a row changes. The process-local
+        copy is trusted for `LOOKUP_CACHE_LOCAL_TTL` seconds, past it the
+        requests that find it stale wait for a single reload. Without
+        Redis the rows are read from Postgres.
+    """
+    def __init__(self, redis: Optional[Redis], postgres: Pool):
+        self.redis = redis
+        self.postgres = postgres
+
+    async def load(self, name: str) -> list[dict]:
+        rows = await self.postgres.fetch(LOOKUP_QUERIES[name])
+        return [dict(row) for row in rows]
+
+    async def rows(self, name: str) -> dict[int, dict]:
+        entry = local_cache.get(name)
+        now = time.monotonic()
+        if entry and now - entry[2] < config.LOOKUP_CACHE_LOCAL_TTL:
+            record_cache(KEY_PREFIX, True)
+            return entry[1]
+        return await flights.do(name, self._reload, name, entry)
+
+    async def _reload(self, name: str, entry: Optional[tuple]) -> dict:
+        if self.redis is None:
+            version, rows = None, await self._load_uncached(name)
+        else:
+            try:
+                version, rows = await self._fetch(name, entry)
+            except (RedisError, OSError) as error:
+                logger.warning("Lookup cache %s unavailable: %s", name, error)
+                version, rows = None, await self._load_uncached(name)
+        rows = {row["id"]: row for row in rows}
+        local_cache.set(name, (version, rows, time.monotonic()))
+        return rows
+
+    async def _load_uncached(self, name: str) -> list[dict]:
+        record_cache(KEY_PREFIX, False)
+        return await self.load(name)
+
+    async def _fetch(self, name: str, entry: Optional[tuple]) -> tuple:
+        version = int(
+            await self.redis.get(f"{KEY_PREFIX}:{name}:version") or 0,
+        )
+        if entry and entry[0] == version:
+            record_cache(KEY_PREFIX, True)
+            return version, entry[1].values()
+        data_key = f"{KEY_PREFIX}:{name}:{version}"
+        payload = await self.redis.get(data_key)
+        record_cache(KEY_PREFIX, payload is not None)
+        if payload is not None:
+            return version, orjson.loads(payload)
+        rows = await self.load(name)
+        await self.redis.set(
+            data_key,
+            orjson.dumps(rows),
+            expire=config.LOOKUP_CACHE_TIMEOUT,
+        )
+        return version, rows
+
+    async def fingerprint(self, name: str) -> str:
+        """
+            Digest of the rows of a lookup, computed again only when the
+            rows are reloaded. Responses built from a lookup include it in
+            their `ETag`.
+        """
+        rows = await self.rows(name)
+        cached = fingerprints.get(name)
+        if cached is None or cached[0] is not rows:
+            digest = hashlib.blake2b(
+                orjson.dumps(list(rows.values())), digest_size=8,
+            ).hexdigest()
+            cached = fingerprints[name] = (rows, digest)
+        return cached[1]
+
+    async def statuses(self) -> dict[int, dict]:
+        return await self.rows(STATUS_LOOKUP)
+
+    async def departments(self) -> dict[int, dict]:
+        return await self.rows(DEPARTMENT_LOOKUP)
+
+
+@lru_cache()
+def get_lookup_service(
+    redis: Redis = Depends(get_redis),
+    postgres: Pool = Depends(get_postgres),
+) -> LookupService:
+    return LookupService(redis, postgres)
@@ -0,0 +1,43 @@
+from functools import lru_cache
+from typing import Optional
+
+from asyncpg import Pool
+from fastapi import Depends
+
+from db.postgres import get_postgres
+from models.org_unit import OrgUnit
+
+ORG_UNIT_QUERY = """
+    SELECT id, parent_id, level, name, path, headcount
+    FROM content.org_unit
+"""
+
+
+class OrgUnitService:
+    """
+        Company structure built by the admin from the departments. Every
+        node carries its subtree headcount, so neither method counts
+        profiles.
+    """
+    def __init__(self, postgres: Pool):
+        self.postgres = postgres
+
+    async def get_tree(self) -> list[OrgUnit]:
+        rows = await self.postgres.fetch(f"{ORG_UNIT_QUERY} ORDER BY path")
+        return [OrgUnit(**row) for row in rows]
+
+    async def get_by_id(self, unit_id: int) -> Optional[OrgUnit]:
+        row = await self.postgres.fetchrow(
+            f"{ORG_UNIT_QUERY} WHERE id = $1",
+            unit_id,
+        )
+        if row is None:
+            return None
+        return OrgUnit(**row)
+
+
+@lru_cache()
+def get_org_unit_service(
+    postgres: Pool = Depends(get_postgres),
+) -> OrgUnitService:
+    return OrgUnitService(postgres)
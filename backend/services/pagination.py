@@ -0,0 +1,51 @@
+import base64
+from typing import Optional
+from uuid import UUID
+
+import orjson
+
+CURSOR_NEXT = "n"
+CURSOR_PREVIOUS = "p"
+
+KEYSET_COLUMNS = (
+    "(COALESCE(p.last_name, ''), COALESCE(p.first_name, ''), p.uuid)"
+)
+KEYSET_ORDER_ASC = (
+    "COALESCE(p.last_name, ''), COALESCE(p.first_name, ''), p.uuid"
+)
+KEYSET_ORDER_DESC = (
+    "COALESCE(p.last_name, '') DESC, COALESCE(p.first_name, '') DESC, "
+    "p.uuid DESC"
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction: str, last_name: Optional[str],
+                  first_name: Optional[str], uuid: UUID) -> str:
+    """
+        Same format as `apps.account.pagination.encode_cursor` in the admin,
+        so a cursor can be handed over between both services.
+    """
+    payload = orjson.dumps(
+        [direction, last_name or "", first_name or "", str(uuid)],
+    )
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, tuple[str, str, UUID]]:
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        direction, last_name, first_name, uuid = orjson.loads(
+            base64.urlsafe_b64decode(cursor + padding),
+        )
+        key = (last_name, first_name, UUID(uuid))
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidCursor(cursor)
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or not all(
+        isinstance(name, str) for name in (last_name, first_name)
+    ):
+        raise InvalidCursor(cursor)
+    return direction, key
@@ -0,0 +1,232 @@
+from functools import lru_cache
+from typing import Optional
+from uuid import UUID
+
+from asyncpg import Pool, Record
+from fastapi import Depends
+
+from core.coalesce import SingleFlight
+from db.postgres import get_postgres
+from models.profile import Department, Profile, ProfilePage, Status
+from services.lookup import LookupService, get_lookup_service
+from services.pagination import (
+    CURSOR_NEXT,
+    CURSOR_PREVIOUS,
+    KEYSET_COLUMNS,
+    KEYSET_ORDER_ASC,
+    KEYSET_ORDER_DESC,
+    decode_cursor,
+    encode_cursor,
+)
+
+PROFILE_QUERY = """
+    SELECT
+        p.uuid,
+        p.last_name,
+        p.first_name,
+        p.middle_name,
+        p.full_name,
+        p.abbreviation,
+        p.post,
+        p.mobile_phone_e164 AS mobile_phone,
+        p.phone_e164 AS phone,
+        p.mobile_phone_national,
+        p.phone_national,
+        p.avatar,
+        p.avatar_thumbnails,
+        p.updated_time,
+        p.status_id,
+        p.department_id
+    FROM content.directory_entry p
+"""
+
+SUBTREE_CONDITION = "p.org_unit_path LIKE {}"
+
+# Identical reads running at the same time share one query, keyed by the
+# directory version the caller has read, see `ProfileService`.
+profile_flights = SingleFlight("profile")
+page_flights = SingleFlight("profile_page")
+
+
+def build_profile(
+    row: Record,
+    statuses: dict[int, dict],
+    departments: dict[int, dict],
+) -> Profile:
+    status = statuses.get(row["status_id"])
+    department = departments.get(row["department_id"])
+    return Profile(
+        uuid=row["uuid"],
+        last_name=row["last_name"],
+        first_name=row["first_name"],
+        middle_name=row["middle_name"],
+        full_name=row.get("full_name"),
+        abbreviation=row.get("abbreviation"),
+        post=row["post"],
+        mobile_phone=row["mobile_phone"],
+        phone=row["phone"],
+        mobile_phone_national=row.get("mobile_phone_national"),
+        phone_national=row.get("phone_national"),
+        avatar=row["avatar"],
+        avatar_thumbnails=row.get("avatar_thumbnails") or {},
+        updated_time=row["updated_time"],
+        status=status and Status(**status),
+        department=department and Department(**department),
+    )
+
+
+class ProfileService:
+    """
+        Read-only access to user profiles. Every method runs exactly one
+        query on a connection borrowed from the pool against
+        `content.directory_entry`, the flat copy of the profiles kept up to
+        date by triggers. Statuses and departments come from the lookup
+        cache. Concurrent requests for the same profile or the same page
+        are coalesced into one query. Only requests that read the same
+        `version` of the directory share it: a query started before a
+        change must not answer a request whose `ETag` already has it.
+    """
+    def __init__(self, postgres: Pool, lookup_service: LookupService):
+        self.postgres = postgres
+        self.lookup_service = lookup_service
+
+    async def build_profiles(self, rows: list[Record]) -> list[Profile]:
+        statuses = await self.lookup_service.statuses()
+        departments = await self.lookup_service.departments()
+        return [build_profile(row, statuses, departments) for row in rows]
+
+    async def get_by_id(
+        self, profile_id: UUID, version: Optional[int] = None,
+    ) -> Optional[Profile]:
+        return await profile_flights.do(
+            (profile_id, version), self._get_by_id, profile_id,
+        )
+
+    async def _get_by_id(self, profile_id: UUID) -> Optional[Profile]:
+        row = await self.postgres.fetchrow(
+            f"{PROFILE_QUERY} WHERE p.uuid = $1",
+            profile_id,
+        )
+        if row is None:
+            return None
+        profiles = await self.build_profiles([row])
+        return profiles[0]
+
+    async def get_by_phone(self, phone: str) -> list[Profile]:
+        """
+            Profiles with the given E.164 mobile or other phone number, both
+            columns have their own index.
+        """
+        rows = await self.postgres.fetch(
+            f"{PROFILE_QUERY} "
+            f"WHERE p.mobile_phone_e164 = $1 OR p.phone_e164 = $1 "
+            f"ORDER BY {KEYSET_ORDER_ASC}",
+            phone,
+        )
+        return await self.build_profiles(rows)
+
+    async def get_list(
+        self,
+        page_size: int,
+        cursor: Optional[str] = None,
+        org_unit_path: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> ProfilePage:
+        return await page_flights.do(
+            (page_size, cursor, org_unit_path, version),
+            self._get_list, page_size, cursor, org_unit_path,
+        )
+
+    async def _get_list(
+        self,
+        page_size: int,
+        cursor: Optional[str] = None,
+        org_unit_path: Optional[str] = None,
+    ) -> ProfilePage:
+        """
+            Keyset pagination over `(last_name, first_name, uuid)`, backed by
+            the `directory_entry_keyset_idx` index. One extra row is fetched to
+            know whether there is a page after this one. With
+            `org_unit_path` only the profiles of that structure subtree are
+            listed.
+        """
+        scope = "TRUE"
+        params = []
+        if org_unit_path is not None:
+            scope = SUBTREE_CONDITION.format("$1")
+            params.append(f"{org_unit_path}%")
+        first = len(params) + 1
+        if not cursor:
+            rows = await self.postgres.fetch(
+                f"{PROFILE_QUERY} WHERE {scope} "
+                f"ORDER BY {KEYSET_ORDER_ASC} LIMIT ${first}",
+                *params,
+                page_size + 1,
+            )
+            return await self._build_page(rows, page_size, False)
+
+        direction, key = decode_cursor(cursor)
+        keyset = f"(${first}, ${first + 1}, ${first + 2})"
+        if direction == CURSOR_NEXT:
+            rows = await self.postgres.fetch(
+                f"{PROFILE_QUERY} WHERE {scope} "
+                f"AND {KEYSET_COLUMNS} > {keyset} "
+                f"ORDER BY {KEYSET_ORDER_ASC} LIMIT ${first + 3}",
+                *params,
+                *key,
+                page_size + 1,
+            )
+            return await self._build_page(rows, page_size, True)
+
+        rows = await self.postgres.fetch(
+            f"{PROFILE_QUERY} WHERE {scope} "
+            f"AND {KEYSET_COLUMNS} < {keyset} "
+            f"ORDER BY {KEYSET_ORDER_DESC} LIMIT ${first + 3}",
+            *params,
+            *key,
+            page_size + 1,
+        )
+        if len(rows) < page_size:
+            return await self._get_list(
+                page_size, org_unit_path=org_unit_path,
+            )
+        has_previous = len(rows) > page_size
+        rows = list(reversed(rows[:page_size]))
+        return await self._build_page(rows, page_size, has_previous, True)
+
+    async def _build_page(
+        self,
+        rows: list[Record],
+        page_size: int,
+        has_previous: bool,
+        has_next: Optional[bool] = None,
+    ) -> ProfilePage:
+        if has_next is None:
+            has_next = len(rows) > page_size
+            rows = rows[:page_size]
+        items = await self.build_profiles(rows)
+        next_cursor = None
+        previous_cursor = None
+        if items and has_next:
+            last = items[-1]
+            next_cursor = encode_cursor(
+                CURSOR_NEXT, last.last_name, last.first_name, last.uuid,
+            )
+        if items and has_previous:
+            first = items[0]
+            previous_cursor = encode_cursor(
+                CURSOR_PREVIOUS, first.last_name, first.first_name, first.uuid,
+            )
+        return ProfilePage(
+            items=items,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+
+
+@lru_cache()
+def get_profile_service(
+    postgres: Pool = Depends(get_postgres),
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> ProfileService:
+    return ProfileService(postgres, lookup_service)
@@ -0,0 +1,237 @@
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import orjson
+from aioredis import Redis, RedisError
+from asyncpg import Pool
+from elasticsearch import AsyncElasticsearch, TransportError
+from fastapi import Depends
+
+from core import config
+from core.metrics import record_cache
+from db.elastic import get_elastic
+from db.postgres import get_postgres
+from db.redis import get_redis
+from models.profile import Facet, ProfileSearchResult
+from services.fulltext import PostgresProfileSearch
+from services.lookup import LookupService, get_lookup_service
+from services.profile import build_profile
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "search:profiles"
+FACET_SIZE = 100
+SEARCH_FIELDS = [
+    "last_name^3",
+    "first_name^2",
+    "middle_name",
+    "full_name",
+    "post",
+    "department.title.text",
+]
+
+
+def build_search_body(
+    query: str,
+    status: Optional[int],
+    department: Optional[int],
+    page: int,
+    page_size: int,
+) -> dict:
+    """
+        Name, post and department fields are indexed with edge n-grams, so
+        the first clause matches prefixes. The second one tolerates typos.
+        Status and department filters go to `post_filter`, each facet is
+        filtered by the other one only, so selecting a status still shows
+        the counts of the remaining statuses.
+    """
+    status_filter = {"term": {"status.id": status}} if status else None
+    department_filter = (
+        {"term": {"department.id": department}} if department else None
+    )
+    filters = [item for item in (status_filter, department_filter) if item]
+    return {
+        "query": {
+            "bool": {
+                "should": [
+                    {
+                        "multi_match": {
+                            "query": query,
+                            "fields": SEARCH_FIELDS,
+                            "operator": "and",
+                        },
+                    },
+                    {
+                        "multi_match": {
+                            "query": query,
+                            "fields": SEARCH_FIELDS,
+                            "fuzziness": "AUTO",
+                            "prefix_length": 1,
+                        },
+                    },
+                ],
+                "minimum_should_match": 1,
+            },
+        },
+        "post_filter": {"bool": {"filter": filters}},
+        "aggs": {
+            "statuses": {
+                "filter": department_filter or {"match_all": {}},
+                "aggs": {
+                    "ids": {
+                        "terms": {"field": "status.id", "size": FACET_SIZE},
+                    },
+                },
+            },
+            "departments": {
+                "filter": status_filter or {"match_all": {}},
+                "aggs": {
+                    "ids": {
+                        "terms": {
+                            "field": "department.id",
+                            "size": FACET_SIZE,
+                        },
+                    },
+                },
+            },
+        },
+        "from": (page - 1) * page_size,
+        "size": page_size,
+    }
+
+
+def build_facets(counts: list[tuple],
+                 lookup: dict[int, dict]) -> list[Facet]:
+    return [
+        Facet(
+            id=lookup_id,
+            title=lookup.get(lookup_id, {}).get("title"),
+            count=count,
+        )
+        for lookup_id, count in counts
+    ]
+
+
+def bucket_counts(aggregation: dict) -> list[tuple]:
+    return [
+        (bucket["key"], bucket["doc_count"])
+        for bucket in aggregation["ids"]["buckets"]
+    ]
+
+
+class ProfileSearchService:
+    """
+        Full-text profile search over the `profiles` index filled by the
+        ETL. When the index can not answer, the same search runs on the
+        Postgres trigram and full-text indexes. Results are kept in Redis
+        for `SEARCH_CACHE_TIMEOUT` seconds when Redis is connected,
+        statuses and departments come from the lookup cache.
+    """
+    def __init__(self, elastic: AsyncElasticsearch, redis: Optional[Redis],
+                 postgres: Pool, lookup_service: LookupService):
+        self.elastic = elastic
+        self.redis = redis
+        self.fallback = PostgresProfileSearch(postgres)
+        self.lookup_service = lookup_service
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[int] = None,
+        department: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 20,
+    ) -> ProfileSearchResult:
+        body = build_search_body(query, status, department, page, page_size)
+        key = self.cache_key(body)
+        result = await self._get_cached(key)
+        if result is not None:
+            return result
+        statuses = await self.lookup_service.statuses()
+        departments = await self.lookup_service.departments()
+        try:
+            response = await self.elastic.search(
+                index=config.ELASTIC_PROFILES_INDEX,
+                body=body,
+            )
+        except TransportError as error:
+            logger.warning("Profile search falls back to Postgres: %s", error)
+            rows, total, status_counts, department_counts = (
+                await self.fallback.search(
+                    query, statuses, departments, status, department,
+                    page, page_size,
+                )
+            )
+        else:
+            rows = [
+                self.document_row(hit["_source"])
+                for hit in response["hits"]["hits"]
+            ]
+            total = response["hits"]["total"]["value"]
+            aggregations = response["aggregations"]
+            status_counts = bucket_counts(aggregations["statuses"])
+            department_counts = bucket_counts(aggregations["departments"])
+        result = ProfileSearchResult(
+            items=[build_profile(row, statuses, departments) for row in rows],
+            total=total,
+            statuses=build_facets(status_counts, statuses),
+            departments=build_facets(department_counts, departments),
+        )
+        await self._set_cached(key, result)
+        return result
+
+    @staticmethod
+    def document_row(document: dict) -> dict:
+        return {
+            **document,
+            "uuid": document["id"],
+            "status_id": (document["status"] or {}).get("id"),
+            "department_id": (document["department"] or {}).get("id"),
+        }
+
+    @staticmethod
+    def cache_key(body: dict) -> str:
+        digest = hashlib.sha1(
+            orjson.dumps(body, option=orjson.OPT_SORT_KEYS),
+        ).hexdigest()
+        return f"{CACHE_PREFIX}:{digest}"
+
+    async def _get_cached(self, key: str) -> Optional[ProfileSearchResult]:
+        if self.redis is None:
+            record_cache(CACHE_PREFIX, False)
+            return None
+        try:
+            payload = await self.redis.get(key)
+        except (RedisError, OSError) as error:
+            logger.warning("Search cache unavailable: %s", error)
+            record_cache(CACHE_PREFIX, False)
+            return None
+        record_cache(CACHE_PREFIX, payload is not None)
+        if payload is None:
+            return None
+        return ProfileSearchResult.parse_raw(payload)
+
+    async def _set_cached(self, key: str,
+                          result: ProfileSearchResult) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                key,
+                result.json(),
+                expire=config.SEARCH_CACHE_TIMEOUT,
+            )
+        except (RedisError, OSError) as error:
+            logger.warning("Search cache unavailable: %s", error)
+
+
+@lru_cache()
+def get_search_service(
+    elastic: AsyncElasticsearch = Depends(get_elastic),
+    redis: Redis = Depends(get_redis),
+    postgres: Pool = Depends(get_postgres),
+    lookup_service: LookupService = Depends(get_lookup_service),
+) -> ProfileSearchService:
+    return ProfileSearchService(elastic, redis, postgres, lookup_service)
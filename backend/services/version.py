@@ -0,0 +1,55 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from asyncpg import Pool
+from fastapi import Depends
+
+from core.coalesce import SingleFlight
+from db.postgres import get_postgres
+
+DIRECTORY_TABLE = "directory_entry"
+ORG_UNIT_TABLE = "org_unit"
+
+VERSION_QUERY = """
+    SELECT name, version, updated_time
+    FROM content.table_version
+    WHERE name = ANY($1::text[])
+"""
+
+flights = SingleFlight("table_version")
+
+
+class VersionService:
+    """
+        Change counters of the tables, kept in `content.table_version` by
+        statement triggers. Reading them is one primary key lookup, far
+        cheaper than the query of the response they describe. Requests
+        checking the same tables at the same time share one lookup.
+    """
+    def __init__(self, postgres: Pool):
+        self.postgres = postgres
+
+    async def get(
+        self, tables: tuple[str, ...],
+    ) -> tuple[dict[str, int], Optional[datetime]]:
+        """
+            Versions of `tables` and the time the latest of them changed.
+        """
+        return await flights.do(tables, self._get, tables)
+
+    async def _get(
+        self, tables: tuple[str, ...],
+    ) -> tuple[dict[str, int], Optional[datetime]]:
+        rows = await self.postgres.fetch(VERSION_QUERY, list(tables))
+        return (
+            {row["name"]: row["version"] for row in rows},
+            max((row["updated_time"] for row in rows), default=None),
+        )
+
+
+@lru_cache()
+def get_version_service(
+    postgres: Pool = Depends(get_postgres),
+) -> VersionService:
+    return VersionService(postgres)
@@ -0,0 +1,38 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from core import config
+from main import app
+from services.lookup import get_lookup_service
+from services.version import get_version_service
+from tests.fakes import FakeLookups, FakeVersions
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def lookups():
+    return FakeLookups()
+
+
+@pytest.fixture
+def versions():
+    return FakeVersions()
+
+
+@pytest.fixture
+def client(monkeypatch, lookups, versions):
+    """
+        Client of the API without its startup. The lookup and version
+        services are fakes, tests replace the others they use through
+        `app.dependency_overrides`. Rate limiting is off unless a test
+        turns it on.
+    """
+    monkeypatch.setattr(config, "RATE_LIMIT_RATE", 0)
+    app.dependency_overrides[get_lookup_service] = lambda: lookups
+    app.dependency_overrides[get_version_service] = lambda: versions
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,174 @@
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+from uuid import UUID, uuid4
+
+UPDATED_TIME = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def directory_row(profile_id: Optional[UUID] = None, **values) -> dict:
+    """
+        Row of `content.directory_entry` as `PROFILE_QUERY` selects it.
+    """
+    row = {
+        "uuid": profile_id or uuid4(),
+        "last_name": "Ivanov",
+        "first_name": "Ivan",
+        "middle_name": None,
+        "full_name": "Ivanov Ivan",
+        "abbreviation": "Ivanov I.",
+        "post": "Engineer",
+        "mobile_phone": None,
+        "phone": None,
+        "mobile_phone_national": None,
+        "phone_national": None,
+        "avatar": "",
+        "avatar_thumbnails": {},
+        "updated_time": UPDATED_TIME,
+        "status_id": None,
+        "department_id": None,
+    }
+    row.update(values)
+    return row
+
+
+class Clock:
+    """
+        Stands for the `time` module of the code under test, moved by the
+        test.
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FakeLookups:
+    """
+        Lookup service with fixed statuses and departments.
+    """
+    def __init__(self, statuses: dict = None, departments: dict = None):
+        self.status_rows = statuses or {}
+        self.department_rows = departments or {}
+        self.fingerprints = {}
+
+    async def statuses(self) -> dict[int, dict]:
+        return self.status_rows
+
+    async def departments(self) -> dict[int, dict]:
+        return self.department_rows
+
+    async def fingerprint(self, name: str) -> str:
+        return self.fingerprints.get(name, "")
+
+
+class FakeVersions:
+    """
+        Version service with the table versions set by the test.
+    """
+    def __init__(self, versions: dict = None):
+        self.versions = versions or {}
+        self.updated_time = UPDATED_TIME
+
+    async def get(
+        self, tables: tuple[str, ...],
+    ) -> tuple[dict[str, int], Optional[datetime]]:
+        return (
+            {table: self.versions.get(table, 0) for table in tables},
+            self.updated_time,
+        )
+
+
+class FakeConnection:
+    """
+        Connection of `FakePool.acquire()`, its queries are answered by
+        the pool. The options of its transactions are kept in
+        `pool.transactions`.
+    """
+    def __init__(self, pool: "FakePool"):
+        self.pool = pool
+
+    @contextlib.asynccontextmanager
+    async def transaction(self, **options) -> AsyncIterator[None]:
+        self.pool.transactions.append(options)
+        yield
+
+    async def fetch(self, query: str, *args) -> list[dict]:
+        return await self.pool.fetch(query, *args)
+
+    async def fetchval(self, query: str, *args):
+        return await self.pool.fetchval(query, *args)
+
+    async def cursor(self, query: str, *args,
+                     prefetch: int = 50) -> AsyncIterator[dict]:
+        self.pool.queries.append((query, args))
+        for row in list(self.pool.rows):
+            yield row
+
+
+class FakePool:
+    """
+        asyncpg pool answering every query with `rows` as they were when
+        the query started, like a statement snapshot. While held the
+        queries wait for `release()` before they return.
+    """
+    def __init__(self, rows: list[dict] = None):
+        self.rows = rows or []
+        self.queries = []
+        self.transactions = []
+        self.started = asyncio.Event()
+        self.released = asyncio.Event()
+        self.released.set()
+
+    def hold(self) -> None:
+        self.released.clear()
+
+    def release(self) -> None:
+        self.released.set()
+
+    async def fetch(self, query: str, *args) -> list[dict]:
+        self.queries.append((query, args))
+        rows = list(self.rows)
+        self.started.set()
+        await self.released.wait()
+        return rows
+
+    async def fetchrow(self, query: str, *args) -> Optional[dict]:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query: str, *args):
+        row = await self.fetchrow(query, *args)
+        return None if row is None else next(iter(row.values()))
+
+    @contextlib.asynccontextmanager
+    async def acquire(self) -> AsyncIterator[FakeConnection]:
+        yield FakeConnection(self)
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeRedis:
+    """
+        The aioredis calls of the caches over a dict. With `error` set
+        every call raises it, as when Redis went away.
+    """
+    def __init__(self):
+        self.data = {}
+        self.error: Optional[Exception] = None
+
+    def check(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.check()
+        return self.data.get(key)
+
+    async def set(self, key: str, value, expire: int = 0) -> bool:
+        self.check()
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
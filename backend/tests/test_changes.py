@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import anyio
+import orjson
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from core import config
+from services.changes import (
+    RESYNC_EVENT,
+    ChangeFeed,
+    Subscription,
+    get_change_feed,
+)
+
+URL = "/api/v1/changes/"
+
+
+def event(**values) -> str:
+    return orjson.dumps(values).decode()
+
+
+class FakeListener:
+    """
+        Listening asyncpg connection, `notify` and `terminate` are called
+        by the test.
+    """
+    def __init__(self):
+        self.callbacks = []
+        self.termination_callbacks = []
+        self.closed = False
+
+    def add_termination_listener(self, callback) -> None:
+        self.termination_callbacks.append(callback)
+
+    async def add_listener(self, channel: str, callback) -> None:
+        self.callbacks.append(callback)
+
+    def notify(self, payload: str) -> None:
+        for callback in self.callbacks:
+            callback(self, 1, config.CHANGE_FEED_CHANNEL, payload)
+
+    def terminate(self) -> None:
+        for callback in self.termination_callbacks:
+            callback(self)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def feed(client):
+    """
+        Feed without a listening connection, the test publishes. The
+        websockets share one event loop with it.
+    """
+    feed = ChangeFeed(connect=None)
+    client.app.dependency_overrides[get_change_feed] = lambda: feed
+    with anyio.from_thread.start_blocking_portal() as portal:
+        client.portal = portal
+        yield feed
+        client.portal = None
+
+
+def publish(client, feed: ChangeFeed, *payloads: str) -> None:
+    """
+        Publish in one turn of the event loop, before any websocket has
+        sent one of the events.
+    """
+    def publish_all() -> None:
+        for payload in payloads:
+            feed.publish(payload)
+
+    client.portal.call(publish_all)
+
+
+def wait_subscriptions(feed: ChangeFeed, count: int) -> None:
+    deadline = time.monotonic() + 2
+    while len(feed.subscriptions) != count:
+        assert time.monotonic() < deadline, "subscriptions did not change"
+        time.sleep(0.01)
+
+
+def test_profile_events_only_reach_their_departments():
+    subscription = Subscription({3}, 10)
+
+    assert subscription.wants({"type": "profile", "id": "a", "department": 3})
+    assert subscription.wants({
+        "type": "profile", "id": "a", "department": 4,
+        "previous_department": 3,
+    })
+    assert not subscription.wants(
+        {"type": "profile", "id": "a", "department": 4},
+    )
+    assert subscription.wants({"type": "profile", "count": 500})
+    assert subscription.wants({"type": "status", "id": 1})
+
+
+def test_events_fan_out(client, feed):
+    moved = event(type="profile", op="update", id="a", department=4)
+    renamed = event(type="department", op="update", id=3)
+    with client.websocket_connect(f"{URL}?department=3") as sales:
+        with client.websocket_connect(URL) as everyone:
+            wait_subscriptions(feed, 2)
+            publish(client, feed, moved, renamed)
+
+            assert everyone.receive_text() == moved
+            assert everyone.receive_text() == renamed
+            assert sales.receive_text() == renamed
+
+
+def test_slow_client_is_closed(client, feed, monkeypatch):
+    monkeypatch.setattr(config, "CHANGE_FEED_QUEUE_SIZE", 2)
+    with client.websocket_connect(URL) as websocket:
+        wait_subscriptions(feed, 1)
+        publish(
+            client, feed, *(event(type="status", id=n) for n in range(3)),
+        )
+
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+
+    assert closed.value.code == 1013
+    wait_subscriptions(feed, 0)
+
+
+def test_client_messages_are_ignored(client, feed):
+    renamed = event(type="status", op="update", id=1)
+    with client.websocket_connect(URL) as websocket:
+        wait_subscriptions(feed, 1)
+        websocket.send_bytes(b"\x00ping")
+        websocket.send_text("ping")
+        publish(client, feed, renamed)
+
+        assert websocket.receive_text() == renamed
+
+    wait_subscriptions(feed, 0)
+
+
+@pytest.mark.anyio
+async def test_reconnect_sends_resync(monkeypatch):
+    monkeypatch.setattr(config, "CHANGE_FEED_RECONNECT_DELAY", 0)
+    listeners = []
+    attempts = 0
+
+    async def connect() -> FakeListener:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 2:
+            raise OSError("connection refused")
+        listeners.append(FakeListener())
+        return listeners[-1]
+
+    async def listening(count: int) -> None:
+        while len(listeners) < count or not listeners[-1].callbacks:
+            await asyncio.sleep(0)
+
+    renamed = event(type="status", op="update", id=1)
+    feed = ChangeFeed(connect)
+    async with feed.subscribe() as subscription:
+        await feed.start()
+        await asyncio.wait_for(listening(1), 1)
+        listeners[0].notify(renamed)
+        listeners[0].terminate()
+        await asyncio.wait_for(listening(2), 1)
+        await feed.stop()
+
+    assert subscription.queue.get_nowait() == renamed
+    assert subscription.queue.get_nowait() == RESYNC_EVENT
+    assert attempts == 3
+    assert listeners[0].closed
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from core.coalesce import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+class Load:
+    """
+        Read that waits for `done` and counts how often it ran.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.done = asyncio.Event()
+        self.error = None
+
+    async def __call__(self, value):
+        self.calls += 1
+        await self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return [value, self.calls]
+
+
+async def started(flights: SingleFlight, *keys) -> None:
+    while any(key not in flights.flights for key in keys):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_calls_share_one_load():
+    flights = SingleFlight("test")
+    load = Load()
+    first = asyncio.create_task(flights.do("a", load, "a"))
+    second = asyncio.create_task(flights.do("a", load, "a"))
+    other = asyncio.create_task(flights.do("b", load, "b"))
+    await started(flights, "a", "b")
+    await asyncio.sleep(0)
+    load.done.set()
+
+    results = await asyncio.gather(first, second, other)
+
+    assert results[0] is results[1]
+    assert results[2][0] == "b"
+    assert load.calls == 2
+    assert flights.flights == {}
+
+
+async def test_later_calls_load_again():
+    flights = SingleFlight("test")
+    load = Load()
+    load.done.set()
+
+    assert await flights.do("a", load, "a") == ["a", 1]
+    assert await flights.do("a", load, "a") == ["a", 2]
+
+
+async def test_errors_are_shared_and_not_kept():
+    flights = SingleFlight("test")
+    load = Load()
+    load.error = ValueError("broken")
+    calls = [asyncio.create_task(flights.do("a", load, "a")) for _ in range(2)]
+    await started(flights, "a")
+    load.done.set()
+
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    load.error = None
+
+    assert [str(result) for result in results] == ["broken", "broken"]
+    assert await flights.do("a", load, "a") == ["a", 2]
+
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight("test")
+    load = Load()
+    first = asyncio.create_task(flights.do("a", load, "a"))
+    second = asyncio.create_task(flights.do("a", load, "a"))
+    await started(flights, "a")
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    load.done.set()
+
+    assert await second == ["a", 1]
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_load_finishes_when_every_caller_is_cancelled():
+    flights = SingleFlight("test")
+    load = Load()
+    load.error = ValueError("broken")
+    caller = asyncio.create_task(flights.do("a", load, "a"))
+    await started(flights, "a")
+    task = flights.flights["a"]
+    caller.cancel()
+    load.done.set()
+
+    with pytest.raises(ValueError, match="broken"):
+        await task
+    assert flights.flights == {}
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from email.utils import format_datetime
+from http import HTTPStatus
+
+import pytest
+
+from core.conditional import etag_matches
+from services.lookup import STATUS_LOOKUP
+from services.profile import ProfileService, get_profile_service
+from services.version import DIRECTORY_TABLE
+from tests.fakes import UPDATED_TIME, FakePool, directory_row
+
+
+@pytest.fixture
+def pool():
+    return FakePool([directory_row()])
+
+
+@pytest.fixture
+def profile_url(client, pool, lookups):
+    client.app.dependency_overrides[get_profile_service] = (
+        lambda: ProfileService(pool, lookups)
+    )
+    return f"/api/v1/profiles/{pool.rows[0]['uuid']}"
+
+
+@pytest.mark.parametrize(("header", "matches"), [
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"other", W/"abc"', True),
+    ("*", True),
+    ('W/"other"', False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, 'W/"abc"') is matches
+
+
+def test_validators_are_sent(client, profile_url):
+    response = client.get(profile_url)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["last-modified"] == format_datetime(
+        UPDATED_TIME, usegmt=True,
+    )
+    assert "s-maxage" in response.headers["cache-control"]
+
+
+def test_current_etag_is_not_modified(client, pool, profile_url):
+    etag = client.get(profile_url).headers["etag"]
+    pool.queries.clear()
+
+    response = client.get(profile_url, headers={"If-None-Match": etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert pool.queries == []
+
+
+def test_changes_give_a_new_etag(client, versions, lookups, profile_url):
+    etag = client.get(profile_url).headers["etag"]
+    versions.versions[DIRECTORY_TABLE] = 1
+    after_write = client.get(profile_url, headers={"If-None-Match": etag})
+    lookups.fingerprints[STATUS_LOOKUP] = "renamed"
+    after_rename = client.get(
+        profile_url,
+        headers={"If-None-Match": after_write.headers["etag"]},
+    )
+
+    assert after_write.status_code == HTTPStatus.OK
+    assert after_write.headers["etag"] != etag
+    assert after_rename.status_code == HTTPStatus.OK
+    assert after_rename.headers["etag"] != after_write.headers["etag"]
+
+
+@pytest.mark.parametrize(("headers", "status"), [
+    (
+        {"If-Modified-Since": "Sun, 01 Jan 2023 00:00:01 GMT"},
+        HTTPStatus.NOT_MODIFIED,
+    ),
+    (
+        {"If-Modified-Since": "Sun, 01 Jan 2023 00:00:00 GMT"},
+        HTTPStatus.OK,
+    ),
+    (
+        {"If-Modified-Since": "Sat, 31 Dec 2022 23:59:59 GMT"},
+        HTTPStatus.OK,
+    ),
+    ({"If-Modified-Since": "yesterday"}, HTTPStatus.OK),
+    (
+        {
+            "If-None-Match": 'W/"stale"',
+            "If-Modified-Since": "Mon, 02 Jan 2023 00:00:00 GMT",
+        },
+        HTTPStatus.OK,
+    ),
+])
+def test_if_modified_since(client, profile_url, headers, status):
+    assert client.get(profile_url, headers=headers).status_code == status
+
+
+def test_change_in_the_same_second_is_sent(client, versions, profile_url):
+    last_modified = client.get(profile_url).headers["last-modified"]
+    versions.updated_time = UPDATED_TIME + timedelta(milliseconds=500)
+
+    response = client.get(
+        profile_url, headers={"If-Modified-Since": last_modified},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["last-modified"] == last_modified
+
+
+def test_query_is_keyed_by_the_etag_version(client, versions):
+    """
+        The endpoint reads its rows for the directory version its `ETag`
+        was computed from.
+    """
+    class RecordingProfiles:
+        def __init__(self):
+            self.versions = []
+
+        async def get_by_id(self, profile_id, version=None):
+            self.versions.append(version)
+            return None
+
+    profiles = RecordingProfiles()
+    client.app.dependency_overrides[get_profile_service] = lambda: profiles
+    versions.versions[DIRECTORY_TABLE] = 7
+
+    response = client.get(f"/api/v1/profiles/{directory_row()['uuid']}")
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert profiles.versions == [7]
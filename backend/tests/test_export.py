@@ -0,0 +1,111 @@
+import asyncio
+import csv
+import io
+import zipfile
+from datetime import date
+from http import HTTPStatus
+
+import pytest
+
+from core.export import HEADER
+from services import export
+from services.export import (
+    EXPORT_QUERY,
+    EXPORT_RETRY_AFTER,
+    ExportService,
+    get_export_service,
+)
+from tests.fakes import UPDATED_TIME, FakeLookups, FakePool
+
+STATUSES = {
+    1: {"id": 1, "status": "active", "title": "Active", "description": ""},
+}
+
+
+def profile_record(number: int) -> dict:
+    return {
+        "uuid": f"00000000-0000-0000-0000-{number:012d}",
+        "username": f"user{number}",
+        "last_name": "Ivanov",
+        "first_name": "Ivan",
+        "middle_name": None,
+        "post": "Engineer",
+        "mobile_phone": "+447400123456",
+        "phone": None,
+        "experience_start": date(2020, 1, 1),
+        "created_time": UPDATED_TIME,
+        "updated_time": UPDATED_TIME,
+        "status_id": 1,
+        "department_id": None,
+    }
+
+
+@pytest.fixture
+def pool():
+    return FakePool([profile_record(number) for number in range(3)])
+
+
+@pytest.fixture
+def service(pool):
+    return ExportService(pool, FakeLookups(STATUSES), 1)
+
+
+@pytest.fixture
+def export_client(client, service):
+    client.app.dependency_overrides[get_export_service] = lambda: service
+    return client
+
+
+def test_csv_export(export_client, pool):
+    response = export_client.get("/api/v1/profiles/export")
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"].startswith(
+        'attachment; filename="directory-',
+    )
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert rows[0] == HEADER
+    assert [row[1] for row in rows[1:]] == ["user0", "user1", "user2"]
+    assert rows[1][8:12] == [
+        "2020-01-01", UPDATED_TIME.isoformat(), UPDATED_TIME.isoformat(),
+        "Active",
+    ]
+    assert pool.queries == [(EXPORT_QUERY, ())]
+
+
+def test_xlsx_export(export_client):
+    response = export_client.get(
+        "/api/v1/profiles/export", params={"format": "xlsx"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+    assert sheet.count("<row>") == 4
+    assert "user2" in sheet
+
+
+@pytest.mark.anyio
+async def test_rows_are_sent_in_chunks(monkeypatch, pool, service):
+    pool.rows = [profile_record(number) for number in range(50)]
+    monkeypatch.setattr(export, "FLUSH_SIZE", 1024)
+
+    chunks = [chunk async for chunk in service.stream("csv")]
+
+    assert len(chunks) > 3
+    assert max(len(chunk) for chunk in chunks[1:-1]) < 2 * 1024
+    assert b"".join(chunks).count(b"user") == 50
+
+
+def test_busy_export_is_turned_away(export_client, service):
+    asyncio.run(service.slots.acquire())
+
+    busy = export_client.get("/api/v1/profiles/export")
+    service.slots.release()
+    free = export_client.get("/api/v1/profiles/export")
+
+    assert busy.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert busy.headers["retry-after"] == str(EXPORT_RETRY_AFTER)
+    assert free.status_code == HTTPStatus.OK
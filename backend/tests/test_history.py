@@ -0,0 +1,97 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+
+from services.history import HistoryService, get_history_service
+from tests.fakes import UPDATED_TIME, FakeLookups, FakePool
+
+AT = "2023-01-01T00:00:00+00:00"
+STATUSES = {
+    1: {"id": 1, "status": "active", "title": "Active", "description": ""},
+}
+
+
+@pytest.fixture
+def pool():
+    return FakePool()
+
+
+@pytest.fixture
+def history_client(client, pool):
+    client.app.dependency_overrides[get_history_service] = (
+        lambda: HistoryService(pool, FakeLookups(STATUSES))
+    )
+    return client
+
+
+def test_profile_as_of(history_client, pool):
+    profile_id = uuid4()
+    pool.rows = [{
+        "profile_as_of": {
+            "last_name": "Ivanov", "post": "Engineer", "status_id": 1,
+            "experience_start": "2020-01-01", "avatar_thumbnails": {},
+        },
+    }]
+
+    response = history_client.get(
+        f"/api/v1/profiles/{profile_id}/as-of", params={"at": AT},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    profile = response.json()
+    assert profile["uuid"] == str(profile_id)
+    assert profile["at"] == AT
+    assert profile["last_name"] == "Ivanov"
+    assert profile["experience_start"] == "2020-01-01"
+    assert profile["status"]["title"] == "Active"
+    assert profile["department"] is None
+    assert "avatar_thumbnails" not in profile
+    assert pool.queries == [
+        ("SELECT content.profile_as_of($1, $2)", (profile_id, UPDATED_TIME)),
+    ]
+
+
+def test_profile_that_did_not_exist(history_client, pool):
+    pool.rows = [{"profile_as_of": None}]
+
+    response = history_client.get(
+        f"/api/v1/profiles/{uuid4()}/as-of", params={"at": AT},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {"detail": "profile did not exist"}
+
+
+@pytest.mark.parametrize("params", [{}, {"at": "last week"}])
+def test_moment_is_required(history_client, pool, params):
+    response = history_client.get(
+        f"/api/v1/profiles/{uuid4()}/as-of", params=params,
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert pool.queries == []
+
+
+def test_department_as_of(history_client, pool):
+    names = [("Petrov", "Ivan"), (None, "Anna"), ("Ivanov", "Petr")]
+    pool.rows = [
+        {
+            "profile_id": uuid4(),
+            "fields": {"last_name": last_name, "first_name": first_name},
+        }
+        for last_name, first_name in names
+    ]
+
+    response = history_client.get(
+        "/api/v1/departments/3/profiles/as-of", params={"at": AT},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [
+        (profile["last_name"], profile["first_name"])
+        for profile in response.json()
+    ] == [(None, "Anna"), ("Ivanov", "Petr"), ("Petrov", "Ivan")]
+    (query, args), = pool.queries
+    assert "content.department_profiles_as_of($1, $2)" in query
+    assert args == (3, UPDATED_TIME)
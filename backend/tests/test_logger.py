@@ -0,0 +1,140 @@
+import logging
+from queue import Queue
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+from core import logger
+from core.logger import (
+    AccessLogSampler,
+    LogQueueHandler,
+    RequestContextFilter,
+    client_ip,
+    request_id,
+)
+from core.metrics import LOG_RECORDS_DROPPED
+from core.middleware import RequestContextMiddleware
+
+
+def log_record(level: int = logging.INFO, msg: str = "line",
+               args: tuple = None, **extra) -> logging.LogRecord:
+    record = logging.LogRecord(
+        "test", level, __file__, 1, msg, args, None,
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def access_record(status: int) -> logging.LogRecord:
+    return log_record(
+        msg='%s - "%s %s HTTP/%s" %d',
+        args=("10.0.0.1:5000", "GET", "/api/v1/", "1.1", status),
+    )
+
+
+def dropped() -> float:
+    samples = LOG_RECORDS_DROPPED.samples()
+    return float(samples[0].split()[-1]) if samples else 0
+
+
+@pytest.mark.parametrize("random_value, kept", [(0.05, True), (0.5, False)])
+def test_access_lines_are_sampled(monkeypatch, random_value, kept):
+    monkeypatch.setattr(logger.random, "random", lambda: random_value)
+    sampler = AccessLogSampler(0.1)
+
+    assert sampler.filter(access_record(200)) is kept
+    assert sampler.filter(log_record(request_metrics={"status": 200})) is kept
+
+
+def test_failures_and_warnings_are_always_kept(monkeypatch):
+    monkeypatch.setattr(logger.random, "random", lambda: 0.99)
+    sampler = AccessLogSampler(0.1)
+
+    assert sampler.filter(access_record(404))
+    assert sampler.filter(log_record(request_metrics={"status": 500}))
+    assert sampler.filter(log_record(logging.WARNING))
+    assert AccessLogSampler().filter(access_record(200))
+
+
+def test_full_queue_drops_and_counts():
+    handler = LogQueueHandler(Queue(2))
+    before = dropped()
+
+    for number in range(5):
+        handler.handle(log_record(msg="line %d", args=(number,)))
+
+    assert handler.queue.qsize() == 2
+    assert handler.queue.get_nowait().msg == "line 0"
+    assert dropped() - before == 3
+
+
+def test_queued_record_is_rendered():
+    handler = LogQueueHandler(Queue(1))
+    try:
+        raise ValueError("boom")
+    except ValueError as error:
+        record = log_record(
+            logging.ERROR, "failed %s", ("twice",), exc_info=(
+                type(error), error, error.__traceback__,
+            ),
+        )
+
+    handler.handle(record)
+
+    queued = handler.queue.get_nowait()
+    assert (queued.msg, queued.args) == ("failed twice", None)
+    assert queued.exc_info is None
+    assert "ValueError: boom" in queued.exc_text
+
+
+def test_filter_copies_the_request_context():
+    id_token = request_id.set("abc")
+    ip_token = client_ip.set("10.0.0.1")
+    try:
+        record = log_record()
+        RequestContextFilter().filter(record)
+    finally:
+        client_ip.reset(ip_token)
+        request_id.reset(id_token)
+    outside = log_record()
+    RequestContextFilter().filter(outside)
+
+    assert (record.request_id, record.client_ip) == ("abc", "10.0.0.1")
+    assert (outside.request_id, outside.client_ip) == (None, None)
+
+
+@pytest.fixture
+def context_client():
+    async def app(scope, receive, send):
+        response = JSONResponse({
+            "request_id": request_id.get(), "client_ip": client_ip.get(),
+        })
+        await response(scope, receive, send)
+
+    return TestClient(RequestContextMiddleware(app))
+
+
+def test_request_id_is_passed_on(context_client):
+    response = context_client.get(
+        "/", headers={"X-Request-ID": "nginx-1", "X-Real-IP": "10.0.0.2"},
+    )
+
+    assert response.headers["x-request-id"] == "nginx-1"
+    assert response.json() == {
+        "request_id": "nginx-1", "client_ip": "10.0.0.2",
+    }
+    assert request_id.get() is None
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-Request-ID": "bad id\n"}])
+def test_request_id_is_generated(context_client, headers):
+    response = context_client.get(
+        "/", headers={**headers, "X-Forwarded-For": "10.0.0.3, 10.0.0.4"},
+    )
+
+    generated = response.headers["x-request-id"]
+    assert len(generated) == 32 and generated != headers.get("X-Request-ID")
+    assert response.json() == {
+        "request_id": generated, "client_ip": "10.0.0.3",
+    }
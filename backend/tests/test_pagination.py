@@ -0,0 +1,177 @@
+import asyncio
+import base64
+from http import HTTPStatus
+from uuid import uuid4
+
+import asyncpg
+import orjson
+import pytest
+
+from core import config
+from db.postgres import init_connection
+from services.pagination import (
+    CURSOR_NEXT,
+    CURSOR_PREVIOUS,
+    KEYSET_COLUMNS,
+    KEYSET_ORDER_ASC,
+    KEYSET_ORDER_DESC,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+)
+from services.profile import ProfileService, get_profile_service
+from tests.fakes import FakeLookups, FakePool, directory_row
+
+PROFILE_ID = uuid4()
+
+
+def raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(payload)).decode()
+
+
+@pytest.fixture
+def pool():
+    return FakePool([
+        directory_row(last_name=name, first_name="Ivan")
+        for name in ("Antonov", "Borisov", "Vasiliev")
+    ])
+
+
+@pytest.fixture
+def service(pool):
+    return ProfileService(pool, FakeLookups())
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(CURSOR_NEXT, "Ivanov", None, PROFILE_ID)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (CURSOR_NEXT, ("Ivanov", "", PROFILE_ID))
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    raw_cursor(["x", "Ivanov", "Ivan", str(PROFILE_ID)]),
+    raw_cursor(["n", "Ivanov", "Ivan", "not-a-uuid"]),
+    raw_cursor(["n", "Ivanov", "Ivan", None]),
+    raw_cursor(["n", 1, "Ivan", str(PROFILE_ID)]),
+    raw_cursor(["n", "Ivanov"]),
+    raw_cursor({"n": "Ivanov"}),
+])
+def test_invalid_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+@pytest.mark.anyio
+async def test_first_page(pool, service):
+    page = await service.get_list(2)
+
+    (query, args), = pool.queries
+    assert f"WHERE TRUE ORDER BY {KEYSET_ORDER_ASC} LIMIT $1" in query
+    assert args == (3,)
+    assert [item.last_name for item in page.items] == ["Antonov", "Borisov"]
+    assert page.previous_cursor is None
+    assert decode_cursor(page.next_cursor) == (
+        CURSOR_NEXT, ("Borisov", "Ivan", pool.rows[1]["uuid"]),
+    )
+
+
+@pytest.mark.anyio
+async def test_next_page_of_subtree(pool, service):
+    cursor = encode_cursor(CURSOR_NEXT, "Antonov", "Ivan", PROFILE_ID)
+
+    page = await service.get_list(2, cursor, org_unit_path="/1/")
+
+    (query, args), = pool.queries
+    assert (
+        f"WHERE p.org_unit_path LIKE $1 AND {KEYSET_COLUMNS} > ($2, $3, $4) "
+        f"ORDER BY {KEYSET_ORDER_ASC} LIMIT $5"
+    ) in query
+    assert args == ("/1/%", "Antonov", "Ivan", PROFILE_ID, 3)
+    assert page.previous_cursor is not None
+    assert page.next_cursor is not None
+
+
+@pytest.mark.anyio
+async def test_previous_page(pool, service):
+    pool.rows.reverse()
+    cursor = encode_cursor(CURSOR_PREVIOUS, "Galkin", "Ivan", PROFILE_ID)
+
+    page = await service.get_list(2, cursor)
+
+    (query, args), = pool.queries
+    assert (
+        f"AND {KEYSET_COLUMNS} < ($1, $2, $3) "
+        f"ORDER BY {KEYSET_ORDER_DESC} LIMIT $4"
+    ) in query
+    assert args == ("Galkin", "Ivan", PROFILE_ID, 3)
+    assert [item.last_name for item in page.items] == ["Borisov", "Vasiliev"]
+    assert page.previous_cursor is not None
+    assert decode_cursor(page.next_cursor)[0] == CURSOR_NEXT
+
+
+@pytest.mark.anyio
+async def test_short_previous_page_starts_over(pool, service):
+    pool.rows = pool.rows[:1]
+    cursor = encode_cursor(CURSOR_PREVIOUS, "Borisov", "Ivan", PROFILE_ID)
+
+    page = await service.get_list(2, cursor)
+
+    assert len(pool.queries) == 2
+    assert f"ORDER BY {KEYSET_ORDER_ASC} LIMIT $1" in pool.queries[1][0]
+    assert page.previous_cursor is None
+
+
+def test_invalid_cursor_is_bad_request(client, service):
+    client.app.dependency_overrides[get_profile_service] = lambda: service
+
+    response = client.get("/api/v1/profiles/", params={"cursor": "broken"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {"detail": "invalid cursor"}
+
+
+@pytest.mark.anyio
+async def test_pages_follow_the_directory_order():
+    """
+        The keyset queries on the real `directory_entry` return the same
+        rows as one sorted query, forward and back. Skipped without a
+        database.
+    """
+    try:
+        connection = await asyncpg.connect(
+            database=config.POSTGRES_DB,
+            user=config.POSTGRES_USER,
+            password=config.POSTGRES_PASSWORD,
+            host=config.POSTGRES_HOST,
+            port=config.POSTGRES_PORT,
+            timeout=2,
+        )
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as error:
+        pytest.skip(f"Postgres unavailable: {error}")
+    try:
+        await init_connection(connection)
+        service = ProfileService(connection, FakeLookups())
+        expected = [
+            row["uuid"] for row in await connection.fetch(
+                f"SELECT p.uuid FROM content.directory_entry p "
+                f"ORDER BY {KEYSET_ORDER_ASC} LIMIT 15",
+            )
+        ]
+        pages = [await service.get_list(5)]
+        while pages[-1].next_cursor and len(pages) < 3:
+            pages.append(await service.get_list(5, pages[-1].next_cursor))
+        forward = [item.uuid for page in pages for item in page.items]
+        backward = []
+        page = pages[-1]
+        while page.previous_cursor:
+            page = await service.get_list(5, page.previous_cursor)
+            backward = [item.uuid for item in page.items] + backward
+    finally:
+        await connection.close()
+
+    assert forward == expected
+    assert backward == expected[:len(backward)]
+    assert len(backward) == len(forward) - len(pages[-1].items)
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from services.profile import ProfileService
+from tests.fakes import FakeLookups, FakePool, directory_row
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def pool():
+    return FakePool([directory_row(post="Engineer")])
+
+
+@pytest.fixture
+def service(pool):
+    return ProfileService(pool, FakeLookups())
+
+
+async def test_same_version_reads_share_one_query(pool, service):
+    profile_id = pool.rows[0]["uuid"]
+    pool.hold()
+    first = asyncio.create_task(service.get_by_id(profile_id, 1))
+    second = asyncio.create_task(service.get_by_id(profile_id, 1))
+    await pool.started.wait()
+    pool.release()
+
+    assert await first == await second
+    assert len(pool.queries) == 1
+
+
+async def test_read_after_write_does_not_get_older_rows(pool, service):
+    profile_id = pool.rows[0]["uuid"]
+    pool.hold()
+    before = asyncio.create_task(service.get_by_id(profile_id, 1))
+    await pool.started.wait()
+    # The write commits while the first query runs and bumps the
+    # directory version the next request builds its ETag from.
+    pool.rows = [directory_row(profile_id, post="Team lead")]
+    after = asyncio.create_task(service.get_by_id(profile_id, 2))
+    await asyncio.sleep(0)
+    pool.release()
+
+    assert (await before).post == "Engineer"
+    assert (await after).post == "Team lead"
+    assert len(pool.queries) == 2
+
+
+async def test_pages_of_other_versions_are_read_apart(pool, service):
+    pool.hold()
+    before = asyncio.create_task(service.get_list(10, version=1))
+    await pool.started.wait()
+    pool.rows = [directory_row(post="Team lead")]
+    after = asyncio.create_task(service.get_list(10, version=2))
+    await asyncio.sleep(0)
+    pool.release()
+
+    assert [item.post for item in (await before).items] == ["Engineer"]
+    assert [item.post for item in (await after).items] == ["Team lead"]
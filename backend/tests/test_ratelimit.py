@@ -0,0 +1,206 @@
+import asyncio
+from http import HTTPStatus
+from uuid import uuid4
+
+import aioredis
+import pytest
+from aioredis import RedisError, ReplyError
+from fastapi.testclient import TestClient
+from starlette.responses import PlainTextResponse
+
+from core import config, ratelimit
+from core.middleware import RateLimitMiddleware
+from core.ratelimit import KEY_PREFIX, LocalBuckets, RateLimiter
+from tests.fakes import Clock
+
+
+class ScriptRedis:
+    """
+        Redis that fails, stalls or has lost its scripts, as the test sets.
+    """
+    def __init__(self):
+        self.error = None
+        self.delay = 0.0
+        self.scripts = set()
+        self.calls = []
+
+    async def call(self, name: str, reply):
+        self.calls.append(name)
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return reply
+
+    async def script_load(self, script: str) -> str:
+        return await self.call("script_load", "digest")
+
+    async def evalsha(self, digest: str, keys: list, args: list) -> list:
+        if digest not in self.scripts:
+            await self.call("evalsha", None)
+            raise ReplyError("NOSCRIPT No matching script.")
+        return await self.call("evalsha", [1, "4.5", "0"])
+
+    async def eval(self, script: str, keys: list, args: list) -> list:
+        return await self.call("eval", [1, "4.5", "0"])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def limiter():
+    return RateLimiter(
+        rate=2, burst=3, timeout=0.05, retry_interval=5, local_size=100,
+    )
+
+
+def test_local_bucket(clock):
+    buckets = LocalBuckets(100)
+
+    decisions = [buckets.take("ip:a", 2, 3) for _ in range(4)]
+    other = buckets.take("ip:b", 2, 3)
+    clock.now += 1
+    refilled = buckets.take("ip:a", 2, 3)
+
+    assert [decision.allowed for decision in decisions] == [
+        True, True, True, False,
+    ]
+    assert decisions[2].remaining == 0
+    assert decisions[3].retry_after == pytest.approx(0.5)
+    assert other.allowed
+    assert refilled.allowed and refilled.remaining == 1
+
+
+def test_least_recent_buckets_are_dropped(clock):
+    buckets = LocalBuckets(1)
+    buckets.take("ip:a", 2, 1)
+    buckets.take("ip:b", 2, 1)
+
+    assert buckets.take("ip:a", 2, 1).allowed
+
+
+@pytest.mark.anyio
+async def test_redis_bucket(limiter):
+    redis = ScriptRedis()
+    redis.scripts.add("digest")
+
+    decision = await limiter.take(redis, "ip:a")
+
+    assert decision == (True, 4, 0.0, "redis")
+    assert redis.calls == ["script_load", "evalsha"]
+
+
+@pytest.mark.anyio
+async def test_lost_script_is_sent_again(limiter):
+    redis = ScriptRedis()
+
+    decision = await limiter.take(redis, "ip:a")
+
+    assert decision.store == "redis"
+    assert redis.calls == ["script_load", "evalsha", "eval"]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("failure", ["error", "delay"])
+async def test_local_buckets_while_redis_fails(clock, limiter, failure):
+    redis = ScriptRedis()
+    redis.scripts.add("digest")
+    if failure == "error":
+        redis.error = RedisError("connection lost")
+    else:
+        redis.delay = 1
+
+    failed = await limiter.take(redis, "ip:a")
+    calls = len(redis.calls)
+    skipped = await limiter.take(redis, "ip:a")
+    calls_after_skip = len(redis.calls)
+    redis.error, redis.delay = None, 0
+    clock.now += 5
+    retried = await limiter.take(redis, "ip:a")
+
+    assert (failed.allowed, failed.store) == (True, "local")
+    assert skipped.store == "local" and calls_after_skip == calls
+    assert retried.store == "redis"
+
+
+@pytest.mark.anyio
+async def test_processes_share_the_redis_bucket():
+    """
+        The script on a real Redis, skipped without one.
+    """
+    try:
+        redis = await asyncio.wait_for(
+            aioredis.create_redis_pool(
+                (config.REDIS_HOST, config.REDIS_PORT),
+            ),
+            config.REDIS_CONNECT_TIMEOUT,
+        )
+    except (RedisError, OSError, asyncio.TimeoutError) as error:
+        pytest.skip(f"Redis unavailable: {error}")
+    key = f"test:{uuid4()}"
+    processes = [
+        RateLimiter(
+            rate=0.5, burst=3, timeout=1, retry_interval=5, local_size=10,
+        )
+        for _ in range(2)
+    ]
+    try:
+        decisions = [
+            await processes[number % 2].take(redis, key)
+            for number in range(4)
+        ]
+        ttl = await redis.pttl(f"{KEY_PREFIX}:{key}")
+    finally:
+        await redis.delete(f"{KEY_PREFIX}:{key}")
+        redis.close()
+        await redis.wait_closed()
+
+    assert [decision.allowed for decision in decisions] == [
+        True, True, True, False,
+    ]
+    assert {decision.store for decision in decisions} == {"redis"}
+    assert decisions[2].remaining == 0
+    assert 1.9 < decisions[3].retry_after <= 2
+    assert 0 < ttl <= 7000
+
+
+@pytest.fixture
+def limited_client(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_RATE", 1)
+    monkeypatch.setattr(config, "RATE_LIMIT_BURST", 2)
+    monkeypatch.setattr(config, "RATE_LIMIT_API_KEYS", frozenset({"secret"}))
+
+    async def app(scope, receive, send):
+        await PlainTextResponse("ok")(scope, receive, send)
+
+    return TestClient(RateLimitMiddleware(app))
+
+
+def test_over_the_limit_is_refused(limited_client):
+    statuses = [limited_client.get("/api/v1/").status_code for _ in range(2)]
+    refused = limited_client.get("/api/v1/")
+    with_key = limited_client.get("/api/v1/", headers={"X-API-Key": "secret"})
+    other_key = limited_client.get("/api/v1/", headers={"X-API-Key": "guess"})
+    other_address = limited_client.get(
+        "/api/v1/", headers={"X-Real-IP": "10.0.0.2"},
+    )
+
+    assert statuses == [HTTPStatus.OK, HTTPStatus.OK]
+    assert refused.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert refused.headers["retry-after"] == "1"
+    assert refused.json() == {"detail": "too many requests"}
+    assert with_key.status_code == HTTPStatus.OK
+    assert other_key.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert other_address.status_code == HTTPStatus.OK
+
+
+def test_metrics_are_not_limited(limited_client):
+    responses = [limited_client.get("/metrics") for _ in range(5)]
+
+    assert {response.status_code for response in responses} == {
+        HTTPStatus.OK,
+    }
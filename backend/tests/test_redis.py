@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from aioredis import RedisError
+from fastapi.testclient import TestClient
+
+import main
+from core import config
+from core.cache import LRUCache
+from db import elastic, postgres, redis
+from services import changes, lookup
+from tests.fakes import Clock, FakePool, FakeRedis
+
+STATUS_ROW = {
+    "id": 1, "status": "active", "title": "Active", "description": "",
+}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(redis, "time", clock)
+    monkeypatch.setattr(redis, "redis", None)
+    monkeypatch.setattr(redis, "next_attempt", 0.0)
+    return clock
+
+
+@pytest.fixture
+def fresh_lookups(monkeypatch):
+    monkeypatch.setattr(lookup, "local_cache", LRUCache())
+    monkeypatch.setattr(lookup, "fingerprints", {})
+
+
+@pytest.mark.anyio
+async def test_redis_is_retried_after_the_interval(monkeypatch, clock):
+    pool = FakeRedis()
+    attempts = []
+
+    async def connect():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise ConnectionRefusedError("connection refused")
+        return pool
+
+    monkeypatch.setattr(redis, "connect", connect)
+
+    down = await redis.get_redis()
+    still_down = await redis.get_redis()
+    clock.now += config.REDIS_RECONNECT_INTERVAL
+    back = await redis.get_redis()
+    kept = await redis.get_redis()
+
+    assert (down, still_down) == (None, None)
+    assert back is pool and kept is pool
+    assert len(attempts) == 2
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("broken", [True, False])
+async def test_lookups_without_redis(fresh_lookups, broken):
+    cache = None
+    if broken:
+        cache = FakeRedis()
+        cache.error = RedisError("connection lost")
+    service = lookup.LookupService(cache, FakePool([STATUS_ROW]))
+
+    assert await service.statuses() == {1: STATUS_ROW}
+
+
+def test_api_starts_without_redis(monkeypatch, clock, fresh_lookups):
+    """
+        Startup with Redis and the change feed connection refused, the
+        reference data is then read from Postgres.
+    """
+    pool = FakePool([STATUS_ROW])
+
+    async def create_pool(**options) -> FakePool:
+        return pool
+
+    async def refuse(*args, **kwargs):
+        raise ConnectionRefusedError("connection refused")
+
+    monkeypatch.setattr(main.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(main.asyncpg, "connect", refuse)
+    monkeypatch.setattr(main.aioredis, "create_redis_pool", refuse)
+    for module, name in (
+        (redis, "connect"), (postgres, "pool"), (elastic, "es"),
+        (changes, "feed"),
+    ):
+        monkeypatch.setattr(module, name, None)
+
+    with TestClient(main.app) as client:
+        response = client.get("/api/v1/statuses/")
+        assert redis.redis is None
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == [STATUS_ROW]
@@ -0,0 +1,146 @@
+import pytest
+from aioredis import RedisError
+from elasticsearch import ConnectionError as ElasticConnectionError
+
+from services.fulltext import build_where, escape_like
+from services.search import ProfileSearchService, build_search_body
+from tests.fakes import FakeLookups, FakePool, FakeRedis, directory_row
+
+pytestmark = pytest.mark.anyio
+
+STATUSES = {
+    1: {"id": 1, "status": "active", "title": "Active", "description": ""},
+}
+DEPARTMENTS = {
+    3: {
+        "id": 3, "title": "Sales", "block": None, "department": None,
+        "group": None, "branch": None, "description": None,
+    },
+}
+
+
+class FakeElasticsearch:
+    def __init__(self, response: dict = None):
+        self.response = response
+        self.calls = 0
+
+    async def search(self, index: str, body: dict) -> dict:
+        self.calls += 1
+        if self.response is None:
+            raise ElasticConnectionError("N/A", "connection refused", None)
+        return self.response
+
+
+class SearchPool(FakePool):
+    """
+        The page query gets the rows, the facet queries `facet_rows`.
+    """
+    def __init__(self, rows: list[dict], facet_rows: list[dict]):
+        super().__init__(rows)
+        self.facet_rows = facet_rows
+
+    async def fetch(self, query: str, *args) -> list[dict]:
+        rows = await super().fetch(query, *args)
+        return self.facet_rows if "GROUP BY" in query else rows
+
+    async def fetchval(self, query: str, *args) -> int:
+        self.queries.append((query, args))
+        return len(self.rows)
+
+
+@pytest.fixture
+def pool():
+    return SearchPool(
+        [directory_row(status_id=1, department_id=3)],
+        [{"id": 3, "count": 1}],
+    )
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+def search_service(elastic, redis, pool) -> ProfileSearchService:
+    return ProfileSearchService(
+        elastic, redis, pool, FakeLookups(STATUSES, DEPARTMENTS),
+    )
+
+
+def test_words_match_names_and_lookup_titles():
+    where, params = build_where("iva SAL", STATUSES, DEPARTMENTS, 1, None)
+
+    assert where.count("p.search_vector @@") == 2
+    assert "p.department_id = ANY($5)" in where
+    assert where.endswith("AND p.status_id = $6")
+    assert params == ["iva:*", "%iva%", "SAL:*", "%SAL%", [3], 1]
+
+
+def test_like_wildcards_are_escaped():
+    assert escape_like(r"100%_\ ") == r"100\%\_\\ "
+
+
+def test_facets_are_filtered_by_the_other_facet():
+    body = build_search_body("ivan", 1, 3, 2, 20)
+
+    aggregations = body["aggs"]
+    assert aggregations["statuses"]["filter"] == {
+        "term": {"department.id": 3},
+    }
+    assert aggregations["departments"]["filter"] == {
+        "term": {"status.id": 1},
+    }
+    assert len(body["post_filter"]["bool"]["filter"]) == 2
+    assert body["from"] == 20
+
+
+async def test_index_answers(pool, redis):
+    document = {
+        **directory_row(), "id": str(pool.rows[0]["uuid"]),
+        "status": {"id": 1}, "department": None,
+    }
+    elastic = FakeElasticsearch({
+        "hits": {"hits": [{"_source": document}], "total": {"value": 1}},
+        "aggregations": {
+            "statuses": {"ids": {"buckets": [{"key": 1, "doc_count": 1}]}},
+            "departments": {"ids": {"buckets": []}},
+        },
+    })
+
+    result = await search_service(elastic, redis, pool).search("ivan")
+
+    assert pool.queries == []
+    assert result.items[0].status.title == "Active"
+    assert result.statuses[0].title == "Active"
+    assert result.departments == []
+
+
+async def test_postgres_answers_without_the_index(pool, redis, caplog):
+    elastic = FakeElasticsearch()
+    service = search_service(elastic, redis, pool)
+
+    result = await service.search("ivan", status=1)
+    cached = await service.search("ivan", status=1)
+
+    assert "falls back to Postgres" in caplog.text
+    assert result.total == 1
+    assert result.items[0].department.title == "Sales"
+    assert [(facet.title, facet.count) for facet in result.departments] == [
+        ("Sales", 1),
+    ]
+    assert cached == result
+    assert elastic.calls == 1
+    assert len(pool.queries) == 4
+    assert pool.transactions == [
+        {"isolation": "repeatable_read", "readonly": True},
+    ]
+
+
+async def test_search_works_without_redis(pool, redis):
+    redis.error = RedisError("connection lost")
+    elastic = FakeElasticsearch()
+
+    for cache in (redis, None):
+        result = await search_service(elastic, cache, pool).search("ivan")
+        assert result.total == 1
+    assert elastic.calls == 2
@@ -0,0 +1,31 @@
+import logging
+import time
+from functools import wraps
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(exceptions: tuple, start_sleep_time: float = 0.1,
+            factor: int = 2, border_sleep_time: float = 10):
+    """
+        Retry the function after one of `exceptions` with an exponentially
+        growing pause, capped by `border_sleep_time`.
+    """
+    def func_wrapper(func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            sleep_time = start_sleep_time
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as error:
+                    logger.warning(
+                        "%s failed: %s, retry in %s s",
+                        func.__name__,
+                        error,
+                        sleep_time,
+                    )
+                    time.sleep(sleep_time)
+                    sleep_time = min(sleep_time * factor, border_sleep_time)
+        return inner
+    return func_wrapper
@@ -0,0 +1,28 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+POSTGRES_DSN = {
+    "dbname": os.getenv("POSTGRES_DB", "scc_db"),
+    "user": os.getenv("POSTGRES_USER", "scc_user"),
+    "password": os.getenv("POSTGRES_PASSWORD", "scc_password"),
+    "host": os.getenv("POSTGRES_HOST", "127.0.0.1"),
+    "port": int(os.getenv("POSTGRES_PORT", 5432)),
+    "options": "-c search_path=content,public",
+}
+
+ELASTIC_HOST = os.getenv("ELASTIC_HOST", "127.0.0.1")
+ELASTIC_PORT = int(os.getenv("ELASTIC_PORT", 9200))
+ELASTIC_PROFILES_INDEX = os.getenv("ELASTIC_PROFILES_INDEX", "profiles")
+
+ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", 500))
+ETL_SLEEP_TIME = float(os.getenv("ETL_SLEEP_TIME", 10))
+ETL_STATE_FILE = os.getenv("ETL_STATE_FILE", "state/profiles.json")
+# Documents the index rejected, one JSON object per line.
+ETL_DEAD_LETTER_FILE = os.getenv(
+    "ETL_DEAD_LETTER_FILE", "state/rejected.jsonl",
+)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -0,0 +1,77 @@
+from typing import Iterator
+from uuid import UUID
+
+from psycopg2.extensions import connection as _connection
+from psycopg2.extras import RealDictCursor
+
+# Every transaction with a lower id has finished, its changes are final.
+HORIZON_QUERY = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text"
+
+PROFILES_QUERY = """
+    SELECT
+        c.xid::text AS xid,
+        c.profile_id AS uuid,
+        p.uuid IS NULL AS deleted,
+        p.last_name,
+        p.first_name,
+        p.middle_name,
+        p.post,
+        p.mobile_phone,
+        p.phone,
+        p.avatar,
+        p.avatar_thumbnails,
+        p.description,
+        p.updated_time,
+        s.id AS status_id,
+        s.status AS status_status,
+        s.title AS status_title,
+        d.id AS department_id,
+        d.title AS department_title,
+        d.block AS department_block,
+        d.department AS department_department,
+        d."group" AS department_group,
+        d.branch AS department_branch
+    FROM content.profile_change c
+    LEFT JOIN content.user_profile p ON p.uuid = c.profile_id
+    LEFT JOIN content.user_status s ON s.id = p.status_id
+    LEFT JOIN content.user_department d ON d.id = p.department_id
+    WHERE c.xid < %s::xid8
+      AND (c.xid, c.profile_id) > (%s::xid8, %s)
+    ORDER BY c.xid, c.profile_id
+    LIMIT %s
+"""
+
+
+class PostgresExtractor:
+    """
+        Streams the profiles changed after an `(xid, uuid)` watermark in
+        batches, from `content.profile_change` that the admin triggers keep
+        with the id of the last transaction that changed each profile.
+        Only transactions that had finished when the pass started are
+        read, so a transaction committing late is read by the next pass
+        instead of being skipped, whatever its `updated_time`. Deleted
+        profiles come back as `deleted` rows with their UUID only. Every
+        batch is a range scan of `profile_change_xid_idx` continuing from
+        the last row of the previous one.
+    """
+    def __init__(self, connection: _connection, batch_size: int):
+        self.connection = connection
+        self.batch_size = batch_size
+
+    def extract(self, xid: str, uuid: UUID) -> Iterator[list[dict]]:
+        with self.connection.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(HORIZON_QUERY)
+            horizon = cursor.fetchone()["pg_snapshot_xmin"]
+            while True:
+                cursor.execute(
+                    PROFILES_QUERY,
+                    (horizon, xid, str(uuid), self.batch_size),
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    return
+                yield rows
+                if len(rows) < self.batch_size:
+                    return
+                xid = rows[-1]["xid"]
+                uuid = rows[-1]["uuid"]
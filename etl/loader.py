@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+from elasticsearch import Elasticsearch
+
+logger = logging.getLogger(__name__)
+
+# Item statuses of a bulk response that mean the cluster is busy or
+# failing rather than that the document is wrong.
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class LoadRetry(Exception):
+    """
+        Elasticsearch turned documents away for now, the batch is sent
+        again after a pause.
+    """
+
+
+class ElasticsearchLoader:
+    """
+        Writes documents with the bulk API, one request per batch. Documents
+        are indexed by profile UUID, so loading the same batch twice is
+        harmless.
+    """
+    def __init__(self, client: Elasticsearch, index: str, schema_path: str):
+        self.client = client
+        self.index = index
+        self.schema_path = schema_path
+
+    def create_index(self) -> None:
+        if self.client.indices.exists(index=self.index):
+            return
+        with open(self.schema_path) as schema_file:
+            schema = json.load(schema_file)
+        self.client.indices.create(index=self.index, body=schema)
+        logger.info("Index %s created", self.index)
+
+    def load(self, documents: list[dict],
+             deleted_ids: Sequence[str] = ()) -> list[dict]:
+        """
+            Index `documents` and delete the documents of `deleted_ids`,
+            a document already gone is not an error. Returns the items the
+            index rejected for good, a mapping error for example, each with
+            its `id`, `error` and the `document` if any. Raises `LoadRetry`
+            when any item was only refused for now.
+        """
+        actions = [
+            ("index", document["id"], document) for document in documents
+        ]
+        actions.extend(("delete", id_, None) for id_ in deleted_ids)
+        if not actions:
+            return []
+        body = []
+        for action, id_, document in actions:
+            body.append({action: {"_index": self.index, "_id": id_}})
+            if document is not None:
+                body.append(document)
+        response = self.client.bulk(body=body)
+        if not response["errors"]:
+            return []
+        rejected = []
+        for (action, id_, document), item in zip(actions, response["items"]):
+            result = item[action]
+            if "error" not in result:
+                continue
+            if result.get("status") in RETRY_STATUSES:
+                raise LoadRetry(f"{id_}: {result['error']}")
+            rejected.append({
+                "id": id_, "error": result["error"], "document": document,
+            })
+        return rejected
+
+
+class DeadLetters:
+    """
+        JSON lines file of the documents the index rejected, so that one
+        bad profile is looked at later instead of holding back the others.
+        Without a path the rejected documents are only logged.
+    """
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = file_path
+
+    def add(self, rejected: list[dict]) -> None:
+        for item in rejected:
+            logger.error(
+                "Profile %s rejected by the index: %s",
+                item["id"],
+                item["error"],
+            )
+        if self.file_path is None or not rejected:
+            return
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        rejected_time = datetime.now(timezone.utc).isoformat()
+        with open(self.file_path, "a") as dead_letter_file:
+            for item in rejected:
+                dead_letter_file.write(
+                    json.dumps({"time": rejected_time, **item}) + "\n",
+                )
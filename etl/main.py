@@ -0,0 +1,81 @@
+import argparse
+import logging
+import os
+import time
+from contextlib import closing
+
+import psycopg2
+from elasticsearch import ConnectionError as ElasticConnectionError
+from elasticsearch import Elasticsearch
+
+import config
+from backoff import backoff
+from extractor import PostgresExtractor
+from loader import DeadLetters, ElasticsearchLoader, LoadRetry
+from pipeline import ProfilesETL
+from state import JsonFileStorage, State
+
+logger = logging.getLogger(__name__)
+
+
+@backoff((psycopg2.OperationalError, ElasticConnectionError, LoadRetry))
+def run(state: State, once: bool) -> None:
+    elastic = Elasticsearch(
+        hosts=[f"http://{config.ELASTIC_HOST}:{config.ELASTIC_PORT}"],
+    )
+    with closing(psycopg2.connect(**config.POSTGRES_DSN)) as connection:
+        connection.autocommit = True
+        loader = ElasticsearchLoader(
+            elastic,
+            config.ELASTIC_PROFILES_INDEX,
+            os.path.join(config.BASE_DIR, "index", "profiles.json"),
+        )
+        loader.create_index()
+        etl = ProfilesETL(
+            PostgresExtractor(connection, config.ETL_BATCH_SIZE),
+            loader,
+            state,
+            dead_letters=DeadLetters(config.ETL_DEAD_LETTER_FILE),
+        )
+        while True:
+            started = time.monotonic()
+            loaded = etl.run()
+            if loaded:
+                logger.info(
+                    "%s profiles indexed in %.2f s",
+                    loaded,
+                    time.monotonic() - started,
+                )
+            if once:
+                return
+            time.sleep(config.ETL_SLEEP_TIME)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Index user profiles into Elasticsearch.",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Run a single pass and exit.",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Forget the saved watermark and reindex everything.",
+    )
+    args = parser.parse_args()
+
+    state = State(JsonFileStorage(config.ETL_STATE_FILE))
+    if args.reset:
+        state.reset()
+    run(state, args.once)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    main()
@@ -0,0 +1,58 @@
+import logging
+from typing import Optional
+from uuid import UUID
+
+from extractor import PostgresExtractor
+from loader import DeadLetters, ElasticsearchLoader
+from state import State
+from transformer import transform
+
+logger = logging.getLogger(__name__)
+
+# Watermarks of the `(updated_time, uuid)` format were kept under
+# "profiles", a new key makes the first pass reindex everything.
+WATERMARK_KEY = "profile_changes"
+MIN_XID = "0"
+MIN_UUID = UUID(int=0)
+
+
+class ProfilesETL:
+    """
+        One incremental pass: extract profiles changed since the saved
+        watermark, transform them into documents and bulk load them, and
+        delete the documents of deleted profiles. The watermark is saved
+        after every batch, so a restart resumes from the last loaded batch
+        instead of reindexing everything. Documents the index rejects go to
+        the dead letters and do not stop the pass.
+    """
+    def __init__(self, extractor: PostgresExtractor,
+                 loader: ElasticsearchLoader, state: State,
+                 dead_letters: Optional[DeadLetters] = None):
+        self.extractor = extractor
+        self.loader = loader
+        self.state = state
+        self.dead_letters = dead_letters or DeadLetters()
+
+    def watermark(self) -> tuple[str, UUID]:
+        saved = self.state.get_state(WATERMARK_KEY)
+        if not saved:
+            return MIN_XID, MIN_UUID
+        return saved["xid"], UUID(saved["uuid"])
+
+    def run(self) -> int:
+        xid, uuid = self.watermark()
+        loaded = 0
+        for rows in self.extractor.extract(xid, uuid):
+            rejected = self.loader.load(
+                [transform(row) for row in rows if not row["deleted"]],
+                [str(row["uuid"]) for row in rows if row["deleted"]],
+            )
+            self.dead_letters.add(rejected)
+            last_row = rows[-1]
+            self.state.set_state(WATERMARK_KEY, {
+                "xid": last_row["xid"],
+                "uuid": str(last_row["uuid"]),
+            })
+            loaded += len(rows)
+            logger.info("Loaded %s profiles", loaded)
+        return loaded
@@ -0,0 +1,63 @@
+import abc
+import json
+import os
+from typing import Any, Optional
+
+
+class BaseStorage(abc.ABC):
+    @abc.abstractmethod
+    def save_state(self, state: dict) -> None:
+        """Persist the whole state."""
+
+    @abc.abstractmethod
+    def retrieve_state(self) -> dict:
+        """Load the whole state, an empty dict if nothing was saved."""
+
+
+class JsonFileStorage(BaseStorage):
+    """
+        State kept in a JSON file. The file is replaced atomically, so a
+        crash in the middle of a write never leaves a broken state behind.
+    """
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = file_path
+
+    def save_state(self, state: dict) -> None:
+        if self.file_path is None:
+            return
+        directory = os.path.dirname(self.file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.file_path}.tmp"
+        with open(temporary_path, "w") as state_file:
+            json.dump(state, state_file)
+        os.replace(temporary_path, self.file_path)
+
+    def retrieve_state(self) -> dict:
+        if self.file_path is None or not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path) as state_file:
+            try:
+                return json.load(state_file)
+            except json.JSONDecodeError:
+                return {}
+
+
+class State:
+    """
+        Key-value state of the ETL process on top of a storage.
+    """
+    def __init__(self, storage: BaseStorage):
+        self.storage = storage
+        self.state = storage.retrieve_state()
+
+    def set_state(self, key: str, value: Any) -> None:
+        self.state[key] = value
+        self.storage.save_state(self.state)
+
+    def get_state(self, key: str, default: Any = None) -> Any:
+        return self.state.get(key, default)
+
+    def reset(self) -> None:
+        self.state = {}
+        self.storage.save_state(self.state)
@@ -0,0 +1,264 @@
+import json
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+
+from loader import DeadLetters, ElasticsearchLoader, LoadRetry
+from pipeline import WATERMARK_KEY, ProfilesETL
+from state import JsonFileStorage, State
+from transformer import transform
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeIndices:
+    def __init__(self):
+        self.created = {}
+
+    def exists(self, index):
+        return index in self.created
+
+    def create(self, index, body):
+        self.created[index] = body
+
+
+class FakeElasticsearch:
+    def __init__(self, fail_ids=(), fail_status=400):
+        self.indices = FakeIndices()
+        self.documents = {}
+        self.bulk_calls = 0
+        self.fail_ids = set(fail_ids)
+        self.fail_status = fail_status
+
+    def bulk(self, body):
+        self.bulk_calls += 1
+        items = []
+        body = iter(body)
+        for action in body:
+            (name, meta), = action.items()
+            item = {"_id": meta["_id"], "status": 200}
+            document = next(body) if name == "index" else None
+            if item["_id"] in self.fail_ids:
+                item["status"] = self.fail_status
+                item["error"] = {"type": "mapper_parsing_exception"}
+            elif name == "index":
+                self.documents[item["_id"]] = document
+            elif self.documents.pop(item["_id"], None) is None:
+                item["status"] = 404
+            items.append({name: item})
+        return {
+            "errors": any(
+                "error" in result
+                for item in items for result in item.values()
+            ),
+            "items": items,
+        }
+
+
+class ListExtractor:
+    """
+        Mimics `PostgresExtractor` over an in-memory list of change rows,
+        transactions in `running` have not finished yet.
+    """
+    def __init__(self, rows, batch_size, running=()):
+        self.rows = rows
+        self.batch_size = batch_size
+        self.running = set(running)
+        self.watermarks = []
+
+    def extract(self, xid, uuid):
+        self.watermarks.append((xid, uuid))
+        horizon = min(self.running, default=float("inf"))
+        rows = sorted(
+            (
+                row for row in self.rows
+                if int(row["xid"]) < horizon
+                and (int(row["xid"]), str(row["uuid"])) > (int(xid), str(uuid))
+            ),
+            key=lambda row: (int(row["xid"]), str(row["uuid"])),
+        )
+        for start in range(0, len(rows), self.batch_size):
+            yield rows[start:start + self.batch_size]
+
+
+def make_row(number, **values):
+    row = {
+        "xid": str(100 + number),
+        "deleted": False,
+        "uuid": uuid4(),
+        "last_name": f"Last {number}",
+        "first_name": f"First {number}",
+        "middle_name": None,
+        "post": "Engineer",
+        "mobile_phone": None,
+        "phone": None,
+        "avatar": None,
+        "avatar_thumbnails": {},
+        "description": None,
+        "updated_time": START + timedelta(minutes=number),
+        "status_id": None,
+        "status_status": None,
+        "status_title": None,
+        "department_id": 1,
+        "department_title": "IT",
+        "department_block": None,
+        "department_department": None,
+        "department_group": None,
+        "department_branch": None,
+    }
+    row.update(values)
+    return row
+
+
+@pytest.fixture
+def state(tmp_path):
+    return State(JsonFileStorage(str(tmp_path / "state.json")))
+
+
+@pytest.fixture
+def elastic():
+    return FakeElasticsearch()
+
+
+@pytest.fixture
+def loader(elastic, tmp_path):
+    schema = tmp_path / "schema.json"
+    schema.write_text("{}")
+    return ElasticsearchLoader(elastic, "profiles", str(schema))
+
+
+def test_transform_nests_relations():
+    row = make_row(1, middle_name="Middle", status_id=2, status_title="Ok")
+    document = transform(row)
+    assert document["id"] == str(row["uuid"])
+    assert document["full_name"] == "Last 1 First 1 Middle"
+    assert document["status"] == {"id": 2, "status": None, "title": "Ok"}
+    assert document["department"]["title"] == "IT"
+    assert document["updated_time"] == row["updated_time"].isoformat()
+
+
+def test_transform_without_relations():
+    document = transform(make_row(1, department_id=None))
+    assert document["status"] is None
+    assert document["department"] is None
+
+
+def test_create_index_once(loader, elastic):
+    loader.create_index()
+    loader.create_index()
+    assert elastic.indices.created == {"profiles": {}}
+
+
+def test_load_returns_rejected_documents(tmp_path):
+    rows = [make_row(1), make_row(2)]
+    elastic = FakeElasticsearch(fail_ids=[str(rows[0]["uuid"])])
+    loader = ElasticsearchLoader(elastic, "profiles", "")
+    rejected = loader.load([transform(row) for row in rows])
+    assert [item["document"]["id"] for item in rejected] == [
+        str(rows[0]["uuid"]),
+    ]
+    assert rejected[0]["error"]["type"] == "mapper_parsing_exception"
+    assert list(elastic.documents) == [str(rows[1]["uuid"])]
+
+
+def test_load_raises_when_the_cluster_is_busy():
+    row = make_row(1)
+    elastic = FakeElasticsearch(fail_ids=[str(row["uuid"])], fail_status=429)
+    loader = ElasticsearchLoader(elastic, "profiles", "")
+    with pytest.raises(LoadRetry):
+        loader.load([transform(row)])
+
+
+def test_run_loads_in_batches_and_saves_watermark(loader, elastic, state):
+    rows = [make_row(number) for number in range(5)]
+    etl = ProfilesETL(ListExtractor(rows, batch_size=2), loader, state)
+
+    assert etl.run() == 5
+    assert elastic.bulk_calls == 3
+    assert len(elastic.documents) == 5
+    assert state.get_state(WATERMARK_KEY) == {
+        "xid": rows[-1]["xid"],
+        "uuid": str(rows[-1]["uuid"]),
+    }
+
+
+def test_run_resumes_from_saved_watermark(loader, elastic, state):
+    rows = [make_row(number) for number in range(4)]
+    extractor = ListExtractor(list(rows), batch_size=10)
+    ProfilesETL(extractor, loader, state).run()
+
+    updated = make_row(10)
+    extractor.rows.append(updated)
+    etl = ProfilesETL(extractor, loader, state)
+    assert etl.run() == 1
+    assert extractor.watermarks[-1] == (rows[-1]["xid"], rows[-1]["uuid"])
+
+
+def test_late_commit_is_read_by_the_next_pass(loader, elastic, state):
+    # Transaction 101 started first and commits after 102 and 103.
+    rows = [make_row(number) for number in range(4)]
+    extractor = ListExtractor(rows, batch_size=10, running=[101])
+    etl = ProfilesETL(extractor, loader, state)
+
+    assert etl.run() == 1
+    assert state.get_state(WATERMARK_KEY)["xid"] == "100"
+    extractor.running.clear()
+    assert etl.run() == 3
+    assert len(elastic.documents) == 4
+
+
+def test_deleted_profiles_are_removed(loader, elastic, state):
+    rows = [make_row(number) for number in range(3)]
+    extractor = ListExtractor(rows, batch_size=10)
+    etl = ProfilesETL(extractor, loader, state)
+    etl.run()
+
+    deleted = dict(rows[1], xid="200", deleted=True)
+    extractor.rows = [deleted, make_row(101, uuid=uuid4())]
+    assert etl.run() == 2
+    assert str(rows[1]["uuid"]) not in elastic.documents
+    assert len(elastic.documents) == 3
+    # Deleting a document that is already gone is not an error.
+    assert loader.load([], [str(rows[1]["uuid"])]) == []
+
+
+def test_rejected_documents_go_to_dead_letters(tmp_path, state):
+    rows = [make_row(number) for number in range(4)]
+    elastic = FakeElasticsearch(fail_ids=[str(rows[1]["uuid"])])
+    loader = ElasticsearchLoader(elastic, "profiles", "")
+    dead_letters = DeadLetters(str(tmp_path / "rejected.jsonl"))
+    etl = ProfilesETL(
+        ListExtractor(rows, batch_size=2), loader, state,
+        dead_letters=dead_letters,
+    )
+
+    assert etl.run() == 4
+    assert len(elastic.documents) == 3
+    assert state.get_state(WATERMARK_KEY)["uuid"] == str(rows[-1]["uuid"])
+    lines = (tmp_path / "rejected.jsonl").read_text().splitlines()
+    assert [json.loads(line)["document"]["id"] for line in lines] == [
+        str(rows[1]["uuid"]),
+    ]
+
+
+def test_busy_cluster_does_not_move_watermark(tmp_path, state):
+    rows = [make_row(number) for number in range(4)]
+    elastic = FakeElasticsearch(
+        fail_ids=[str(rows[3]["uuid"])], fail_status=429,
+    )
+    loader = ElasticsearchLoader(elastic, "profiles", "")
+    etl = ProfilesETL(ListExtractor(rows, batch_size=2), loader, state)
+
+    with pytest.raises(LoadRetry):
+        etl.run()
+    saved = state.get_state(WATERMARK_KEY)
+    assert saved["uuid"] == str(rows[1]["uuid"])
+
+    state = State(JsonFileStorage(state.storage.file_path))
+    assert state.get_state(WATERMARK_KEY) == saved
+
+
+def test_empty_state_starts_from_beginning(loader, state):
+    etl = ProfilesETL(ListExtractor([], 10), loader, state)
+    assert etl.watermark() == ("0", UUID(int=0))
@@ -0,0 +1,48 @@
+from typing import Optional
+
+
+def full_name(*parts: Optional[str]) -> str:
+    return " ".join(part for part in parts if part)
+
+
+def transform(row: dict) -> dict:
+    """
+        Denormalized profile document for the `profiles` index.
+    """
+    status = None
+    if row["status_id"] is not None:
+        status = {
+            "id": row["status_id"],
+            "status": row["status_status"],
+            "title": row["status_title"],
+        }
+    department = None
+    if row["department_id"] is not None:
+        department = {
+            "id": row["department_id"],
+            "title": row["department_title"],
+            "block": row["department_block"],
+            "department": row["department_department"],
+            "group": row["department_group"],
+            "branch": row["department_branch"],
+        }
+    return {
+        "id": str(row["uuid"]),
+        "last_name": row["last_name"],
+        "first_name": row["first_name"],
+        "middle_name": row["middle_name"],
+        "full_name": full_name(
+            row["last_name"],
+            row["first_name"],
+            row["middle_name"],
+        ),
+        "post": row["post"],
+        "mobile_phone": row["mobile_phone"],
+        "phone": row["phone"],
+        "avatar": row["avatar"],
+        "avatar_thumbnails": row["avatar_thumbnails"],
+        "description": row["description"],
+        "status": status,
+        "department": department,
+        "updated_time": row["updated_time"].isoformat(),
+    }